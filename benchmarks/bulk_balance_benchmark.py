@@ -0,0 +1,150 @@
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+
+from fair.db import DBAdapter, DBError
+from fair.db.models import PurchaseRecord, RewardRecord
+
+from benchmarks.common import define_arg_parser, setup_db, add_players, get_balances, latency_stats
+
+
+# Fires concurrent bulk purchases and rewards of a manager at random overlapping groups of players,
+# the groups have duplicate and missing player ids and some players start with no money, thus can't afford.
+# Every operation has its own amount, so its history rows are told apart from the others and checked against
+# the returned count: each listed player is charged or rewarded at most once, the missing ones are skipped,
+# and every balance equals the initial one minus the purchases plus the rewards of the history.
+# Usage: python -m benchmarks.bulk_balance_benchmark <config path> [--operations 2000 --threads 32 --players 50]
+
+
+def add_manager(db_adapter: DBAdapter, tg_user_id: int) -> int:
+    # manager on a location with a shop, thus can both reward and charge the players
+    db_adapter.add_role('manager')
+    db_adapter.add_telegram_account(tg_user_id, tg_user_id)
+    db_adapter.add_user('manager', tg_user_id)
+    db_adapter.add_manager(tg_user_id, 'manager')
+    manager_id = db_adapter.get_manager_by_tg_id(tg_user_id).id
+    db_adapter.add_location('benchmark location', 1000, False)
+    location_id = db_adapter.get_all_locations(0, 1)[0][0].id
+    db_adapter.add_shop(location_id, 'benchmark shop')
+    db_adapter.update_manager_location_by_id(manager_id, location_id)
+    return manager_id
+
+
+def make_operations(player_ids: list[int], count: int, max_group: int, reward_ratio: float) -> list[tuple]:
+    missing_player_id = max(player_ids) + 1
+    # unique amounts, the history rows of an operation are the ones with its kind and amount
+    amounts = random.sample(range(1, 2 * count + 1), count)
+    operations = []
+    for amount in amounts:
+        group = random.choices(player_ids, k=random.randint(1, max_group))
+        group += random.choices(group, k=random.randint(0, 2))
+        if random.random() < 0.05:
+            group.append(missing_player_id)
+        random.shuffle(group)
+        kind = 'reward' if random.random() < reward_ratio else 'purchase'
+        operations.append((kind, group, amount))
+    return operations
+
+
+def run_operation(db_adapter: DBAdapter, manager_id: int, kind: str, group: list[int], amount: int) -> tuple:
+    started_at = time.perf_counter()
+    try:
+        if kind == 'reward':
+            result = db_adapter.reward_by_player_ids(group, manager_id, amount)
+        else:
+            result = db_adapter.purchase_by_player_ids(group, manager_id, amount)
+    except DBError as e:
+        result = f'error: {str(e).splitlines()[0]}'
+    return result, time.perf_counter() - started_at
+
+
+def check(
+        db_adapter: DBAdapter,
+        initial_balances: dict[int, int],
+        operations: list[tuple],
+        results: list) -> list[str]:
+    errors = []
+    balances = get_balances(db_adapter)
+    with db_adapter.session_maker() as session:
+        purchases = session.execute(select(PurchaseRecord.customer_player_id, PurchaseRecord.amount)).all()
+        rewards = session.execute(select(RewardRecord.recipient_player_id, RewardRecord.amount)).all()
+    rows = {'purchase': {}, 'reward': {}}
+    for kind, records in (('purchase', purchases), ('reward', rewards)):
+        for player_id, amount in records:
+            rows[kind].setdefault(amount, []).append(player_id)
+    for (kind, group, amount), result in zip(operations, results):
+        if not isinstance(result, int):
+            continue
+        player_ids = rows[kind].get(amount, [])
+        existing = set(group) & set(initial_balances)
+        if len(player_ids) != result:
+            errors.append(f'{kind} of {amount} returned {result} != {len(player_ids)} history rows')
+        if len(set(player_ids)) != len(player_ids):
+            errors.append(f'{kind} of {amount} made several records for the same player')
+        if not set(player_ids) <= existing:
+            errors.append(f'{kind} of {amount} made records for the players out of the group')
+        if kind == 'reward' and result != len(existing):
+            errors.append(f'reward of {amount} returned {result} != {len(existing)} distinct existing players')
+    for player_id, balance in initial_balances.items():
+        expected = (
+            balance
+            - sum(amount for customer_id, amount in purchases if customer_id == player_id)
+            + sum(amount for recipient_id, amount in rewards if recipient_id == player_id)
+        )
+        if balances[player_id] != expected:
+            errors.append(f'player {player_id} balance {balances[player_id]} != {expected} from the history')
+        if balances[player_id] < 0:
+            errors.append(f'player {player_id} balance {balances[player_id]} is negative')
+    return errors
+
+
+def main():
+    parser = define_arg_parser('Concurrent bulk purchases and rewards benchmark.')
+    parser.add_argument('--operations', type=int, default=2000, help='number of bulk operations')
+    parser.add_argument('--max-group', type=int, default=20, help='max number of players in an operation')
+    parser.add_argument('--reward-ratio', type=float, default=0.3, help='share of rewards among the operations')
+    parser.add_argument('--poor-ratio', type=float, default=0.2, help='share of the players with no money')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    db_adapter = setup_db(args.config_path, args.use_env_vars, args.config_env_mapping_path, args.threads)
+    player_ids = add_players(db_adapter, args.players, args.balance)
+    for player_id in random.sample(player_ids, int(len(player_ids) * args.poor_ratio)):
+        db_adapter.update_player_balance_by_id(player_id, 0)
+    manager_id = add_manager(db_adapter, args.players + 1)
+    initial_balances = get_balances(db_adapter)
+    operations = make_operations(player_ids, args.operations, args.max_group, args.reward_ratio)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as executor:
+        outcomes = list(executor.map(lambda entry: run_operation(db_adapter, manager_id, *entry), operations))
+    elapsed = time.perf_counter() - started_at
+
+    results = [result for result, _ in outcomes]
+    print(f'{args.operations} bulk operations on {args.players} players by {args.threads} threads in {elapsed:.2f} s')
+    print(f'throughput {args.operations / elapsed:.0f} operations/s')
+    print(f'latency {latency_stats([latency for _, latency in outcomes])}')
+    totals = Counter()
+    for (kind, group, _), result in zip(operations, results):
+        if isinstance(result, int):
+            totals[f'{kind} operations'] += 1
+            totals[f'{kind} listed ids'] += len(group)
+            totals[f'{kind} players updated'] += result
+    for name, count in sorted(totals.items()):
+        print(f'{name}: {count}')
+
+    errors = check(db_adapter, initial_balances, operations, results)
+    failures = Counter(result for result in results if not isinstance(result, int))
+    errors += [f'{count} operations failed with {result}' for result, count in failures.items()]
+    for error in errors:
+        print(f'FAILED: {error}')
+    if errors:
+        raise SystemExit(1)
+    print('OK: returned counts and history rows match the balance changes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import logging
+import statistics
+from typing import Optional
+
+from sqlalchemy import select, func
+
+from fair.config import load_config
+from fair.db import DBAdapter, setup_adapter
+from fair.db.models import BaseModel, Player
+
+
+# Shared setup of the benchmarks: they are run against a scratch Postgres database, the schema is created
+# if it is missing and the database must have no players, as the checks compare every balance and history row
+
+
+def define_arg_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('config_path', metavar='Config path', type=str, help='path to the config file')
+    parser.add_argument('-e', '--use-env-vars', action='store_true', help='override config with env vars')
+    parser.add_argument(
+        '-m',
+        dest='config_env_mapping_path',
+        metavar='<mapping path>',
+        type=str,
+        help='path to the config env mapping file'
+    )
+    parser.add_argument('--players', type=int, default=50, help='number of players, fewer means more contention')
+    parser.add_argument('--balance', type=int, default=1000, help='initial balance of each player')
+    parser.add_argument('--threads', type=int, default=16, help='number of concurrent workers')
+    parser.add_argument('--seed', type=int, default=2023, help='random seed')
+    return parser
+
+
+def setup_db(config_path: str, use_env_vars: bool, config_env_mapping_path: Optional[str], threads: int) -> DBAdapter:
+    cfg = load_config(config_path, use_env_vars, config_env_mapping_path)
+    # every worker holds a connection, thus none of them waits for the pool
+    cfg.db.pool_size = threads
+    cfg.db.max_overflow = 0
+    logger = logging.getLogger('benchmark.db')
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    db_adapter = setup_adapter(cfg.db, logger)
+    engine = db_adapter.session_maker.kw['bind']
+    BaseModel.metadata.create_all(engine)
+    with db_adapter.session_maker() as session:
+        if session.execute(select(func.count(Player.id))).scalar() != 0:
+            raise SystemExit('the database already has players, run the benchmark against a scratch database')
+    return db_adapter
+
+
+def add_players(db_adapter: DBAdapter, count: int, balance: int, first_tg_id: int = 1) -> list[int]:
+    db_adapter.add_role('player')
+    player_ids = []
+    for tg_user_id in range(first_tg_id, first_tg_id + count):
+        db_adapter.add_telegram_account(tg_user_id, tg_user_id)
+        db_adapter.add_user('player', tg_user_id)
+        db_adapter.add_player(tg_user_id, f'player{tg_user_id}')
+        player = db_adapter.get_player_by_tg_id(tg_user_id)
+        db_adapter.update_player_balance_by_id(player.id, balance)
+        player_ids.append(player.id)
+    return player_ids
+
+
+def get_balances(db_adapter: DBAdapter) -> dict[int, int]:
+    with db_adapter.session_maker() as session:
+        return dict(session.execute(select(Player.id, Player.balance)).all())
+
+
+def latency_stats(latencies: list[float]) -> str:
+    if not latencies:
+        return 'no calls'
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return (
+        f'avg {statistics.fmean(latencies) * 1000:.2f} ms, '
+        f'p50 {statistics.median(latencies) * 1000:.2f} ms, '
+        f'p99 {p99 * 1000:.2f} ms, '
+        f'max {latencies[-1] * 1000:.2f} ms'
+    )
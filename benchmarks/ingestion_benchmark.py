@@ -0,0 +1,137 @@
+import argparse
+import json
+import logging
+import random
+import time
+
+from telebot.types import Update
+
+from fair.bot.dispatcher import DispatchedTeleBot, UpdateDispatcher
+from fair.bot.filters import add_custom_filters
+from fair.bot.handlers import register_handlers
+from fair.bot.ingestion import UPDATE_HANDLERS, UpdateFilter, decode_update, peek_update_type
+from fair.bot.states import PlayerStates
+from fair.config import BotDispatcherConfig, ButtonsConfig, load_config
+
+
+# Webhook updates handled per second by a single worker, the bodies are a mix of the button messages
+# and the callback queries the bot handles and of the edited messages and my_chat_member updates it has
+# no handlers for. Before: every body is parsed with json and built into an Update, then matched against
+# the handlers one by one. After: the body is decoded with orjson, dropped by the UpdateFilter if nothing
+# handles it, otherwise submitted to the update dispatcher, its worker builds the Update and the router
+# finds the handler. The handlers are only matched, none of them is run, thus no DB or Bot API is needed.
+# Usage: python -m benchmarks.ingestion_benchmark <config path> [--updates 20000 --dropped-share 0.3]
+
+MESSAGE_USER_ID = 1
+CALLBACK_USER_ID = 2
+BOT_USER_ID = 3
+
+
+def make_bodies(buttons: ButtonsConfig, count: int, dropped_share: float) -> list[bytes]:
+    user = {'id': MESSAGE_USER_ID, 'is_bot': False, 'first_name': 'player', 'language_code': 'en'}
+    chat = {'id': MESSAGE_USER_ID, 'type': 'private', 'first_name': 'player'}
+    message = {'message_id': 1, 'date': 0, 'chat': chat, 'from': user, 'text': buttons.my_balance}
+    callback_query = {
+        'id': '1',
+        'chat_instance': 'benchmark',
+        'data': 'new_queue_locations_page#2',
+        'from': dict(user, id=CALLBACK_USER_ID),
+        'message': dict(message, chat=dict(chat, id=CALLBACK_USER_ID), text='menu'),
+    }
+    bot_member = {'id': BOT_USER_ID, 'is_bot': True, 'first_name': 'bot'}
+    my_chat_member = {
+        'chat': chat,
+        'from': user,
+        'date': 0,
+        'old_chat_member': {'status': 'member', 'user': bot_member},
+        'new_chat_member': {'status': 'kicked', 'until_date': 0, 'user': bot_member},
+    }
+    handled = [{'message': message}, {'callback_query': callback_query}]
+    dropped = [{'edited_message': dict(message, edit_date=1)}, {'my_chat_member': my_chat_member}]
+    bodies = []
+    for update_id in range(count):
+        update = random.choice(dropped if random.random() < dropped_share else handled)
+        bodies.append(json.dumps({'update_id': update_id, **update}).encode())
+    return bodies
+
+
+def setup_bot(buttons: ButtonsConfig) -> DispatchedTeleBot:
+    # set up as setup_bot does with a dispatcher, without the middlewares, as they need the DB
+    bot = DispatchedTeleBot('1:benchmark', threaded=False)
+    add_custom_filters(bot, 1)
+    register_handlers(bot, buttons)
+    bot.compile_routes()
+    bot.set_state(MESSAGE_USER_ID, PlayerStates.main_menu, MESSAGE_USER_ID)
+    bot.set_state(CALLBACK_USER_ID, PlayerStates.choose_new_queue_location, CALLBACK_USER_ID)
+    return bot
+
+
+def match(bot: DispatchedTeleBot, update: Update, routed: bool):
+    # handler the bot would run for the update, if any
+    for update_type, attribute in UPDATE_HANDLERS.items():
+        message = getattr(update, update_type)
+        if message is None:
+            continue
+        handlers = getattr(bot, attribute)
+        for handler in bot._route(message, handlers, update_type) if routed else handlers:
+            if bot._test_message_handler(handler, message):
+                return handler['function']
+    return None
+
+
+def run_before(bot: DispatchedTeleBot, bodies: list[bytes]) -> list:
+    return [match(bot, Update.de_json(json.loads(body)), routed=False) for body in bodies]
+
+
+def run_after(
+        bot: DispatchedTeleBot,
+        update_filter: UpdateFilter,
+        update_dispatcher: UpdateDispatcher,
+        bodies: list[bytes]) -> list:
+    matched = []
+    for body in bodies:
+        raw_update = decode_update(body)
+        if not update_filter.is_handled(raw_update):
+            matched.append(None)
+            continue
+        if not update_dispatcher.submit(raw_update):
+            raise SystemExit('FAILED: the update dispatcher is full')
+        # the worker's side of the dispatcher, run in the same thread
+        raw_update, _ = update_dispatcher._queues[0].get_nowait()
+        matched.append(match(bot, Update.de_json(raw_update), routed=True))
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Webhook updates ingestion benchmark.')
+    parser.add_argument('config_path', metavar='Config path', type=str, help='path to the config file')
+    parser.add_argument('--updates', type=int, default=20000, help='number of updates')
+    parser.add_argument('--dropped-share', type=float, default=0.3, help='share of the updates with no handlers')
+    parser.add_argument('--seed', type=int, default=2023, help='random seed')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    buttons = load_config(args.config_path, False).buttons
+    bot = setup_bot(buttons)
+    update_filter = UpdateFilter(bot)
+    # a single worker, its queue is drained after every submission
+    update_dispatcher = UpdateDispatcher(bot, logging.getLogger('benchmark.bot'), BotDispatcherConfig(workers=1))
+    bodies = make_bodies(buttons, args.updates, args.dropped_share)
+
+    started_at = time.perf_counter()
+    before = run_before(bot, bodies)
+    before_elapsed = time.perf_counter() - started_at
+    started_at = time.perf_counter()
+    after = run_after(bot, update_filter, update_dispatcher, bodies)
+    after_elapsed = time.perf_counter() - started_at
+
+    if before != after:
+        raise SystemExit('FAILED: the handlers matched after differ from the ones before')
+    dropped = sum(update_filter.dropped.values())
+    print(f'{args.updates} updates, {dropped} dropped by the filter: {update_filter.dropped}')
+    print(f'before {args.updates / before_elapsed:8.0f} updates/s per worker')
+    print(f'after  {args.updates / after_elapsed:8.0f} updates/s per worker')
+
+
+if __name__ == '__main__':
+    main()
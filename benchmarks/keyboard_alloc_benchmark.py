@@ -0,0 +1,76 @@
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+from fair.bot import keyboards
+from fair.config import load_config
+
+
+# Allocations an update makes to get its keyboard json, before: the markup is built and serialized on every send,
+# after: the SerializedMarkup cached by the keyboards module is sent. Measured for a static menu and a page
+# of the players, the page before is built from the same arguments, thus both send the same json.
+# Peak is the memory traced during one update, blocks are the ones still allocated once it returns, the json included,
+# with the cycle collector off, i.e. the garbage it leaves to the collector.
+# Usage: python -m benchmarks.keyboard_alloc_benchmark <config path> [--updates 20000 --page-size 50]
+
+
+def measure(get_json: Callable[[], str], updates: int) -> tuple[int, int, float]:
+    get_json()  # warm up, the cached keyboards are built here
+    gc.disable()
+    try:
+        tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        traced = tracemalloc.get_traced_memory()[0]
+        result = get_json()
+        peak = tracemalloc.get_traced_memory()[1] - traced
+        # blocks of the snapshots themselves are not counted
+        own = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = tracemalloc.take_snapshot().filter_traces(own).compare_to(snapshot.filter_traces(own), 'lineno')
+        blocks = sum(stat.count_diff for stat in stats)
+        tracemalloc.stop()
+        del result
+    finally:
+        gc.enable()
+    started_at = time.perf_counter()
+    for _ in range(updates):
+        get_json()
+    return peak, blocks, (time.perf_counter() - started_at) / updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keyboard allocations per update benchmark.')
+    parser.add_argument('config_path', metavar='Config path', type=str, help='path to the config file')
+    parser.add_argument('--updates', type=int, default=20000, help='number of updates timed per keyboard')
+    parser.add_argument('--page-size', type=int, default=50, help='number of players on the page')
+    args = parser.parse_args()
+
+    buttons = load_config(args.config_path, False).buttons
+    menu = (buttons.new_queue, buttons.my_balance, buttons.transfer_money, buttons.help)
+    page = [(f'player {i}', i) for i in range(args.page_size)]
+    page_args = (
+        'transfer_recipients',
+        '1',
+        str(args.page_size),
+        buttons.prev_page,
+        buttons.next_page,
+        buttons.cancel
+    )
+    cases = [
+        ('static before', lambda: keyboards.player_main_menu.__wrapped__(*menu).to_json()),
+        ('static after', lambda: keyboards.player_main_menu(*menu).to_json()),
+        ('page before', lambda: keyboards.build_collection_page(tuple(page), *page_args).to_json()),
+        ('page after', lambda: keyboards.collection_page(page, *page_args).to_json()),
+    ]
+    if cases[0][1]() != cases[1][1]() or cases[2][1]() != cases[3][1]():
+        raise SystemExit('FAILED: cached keyboards differ from the built ones')
+
+    for name, get_json in cases:
+        peak, blocks, elapsed = measure(get_json, args.updates)
+        print(f'{name:14} peak {peak:6d} bytes, {blocks:3d} blocks left, {elapsed * 1e6:7.2f} us per update')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+from fair.bot.rate_limiter import MemoryRateLimiter
+
+
+# Memory of the memory anti-flood limiter after a stream of synthetic users, each one arriving once at a steady rate,
+# some of them flooding with several actions at once. The clock is synthetic, thus a million users at 50k/s
+# take the limiter's 20 seconds, not the real ones. Memory is the one traced for the limiter's state once
+# the stream ends, the reference is a dict of the same keys kept for every user ever seen.
+# Usage: python -m benchmarks.rate_limiter_benchmark [--users 1000000 --rate 50000 --interval 0.2 --burst 1]
+
+
+def make_hits(users: int, rate: float, flood_share: float) -> list[tuple[str, float]]:
+    hits = []
+    for user_id in range(users):
+        now = user_id / rate
+        for _ in range(random.randint(2, 5) if random.random() < flood_share else 1):
+            hits.append((f'message:{user_id}', now))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory anti-flood limiter memory benchmark.')
+    parser.add_argument('--users', type=int, default=1000000, help='number of synthetic users')
+    parser.add_argument('--rate', type=float, default=50000, help='users arriving per second')
+    parser.add_argument('--interval', type=float, default=0.2, help='seconds between the actions, actions_timeout')
+    parser.add_argument('--burst', type=int, default=1, help='number of actions allowed at once')
+    parser.add_argument('--max-size', type=int, default=100000, help='max number of users tracked')
+    parser.add_argument('--flood-share', type=float, default=0.1, help='share of the users flooding')
+    parser.add_argument('--seed', type=int, default=2023, help='random seed')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    hits = make_hits(args.users, args.rate, args.flood_share)
+    limiter = MemoryRateLimiter(args.interval, args.burst, args.max_size)
+    tracemalloc.start()
+    traced = tracemalloc.get_traced_memory()[0]
+    for key, now in hits:
+        limiter._hit(key, now)
+    memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # timed apart, as tracing slows the allocations down
+    timed_limiter = MemoryRateLimiter(args.interval, args.burst, args.max_size)
+    started_at = time.perf_counter()
+    for key, now in hits:
+        timed_limiter._hit(key, now)
+    elapsed = time.perf_counter() - started_at
+
+    tracemalloc.start()
+    reference_traced = tracemalloc.get_traced_memory()[0]
+    every_user = {key: now for key, now in hits}
+    reference_memory = tracemalloc.get_traced_memory()[0] - reference_traced
+    tracemalloc.stop()
+
+    stats = limiter.get_stats()
+    print(f'{args.users} users, {len(hits)} actions at {args.rate:.0f} users/s, {args.interval} s interval')
+    print(f'limiter: {stats["size"]} users tracked, {(memory - traced) / 2 ** 20:.2f} MiB, '
+          f'peak {(peak - traced) / 2 ** 20:.2f} MiB, allowed {stats["allowed"]}, rejected {stats["rejected"]}')
+    print(f'every user kept: {len(every_user)} users, {reference_memory / 2 ** 20:.2f} MiB')
+    print(f'{elapsed / len(hits) * 1e9:.0f} ns per action')
+
+
+if __name__ == '__main__':
+    main()
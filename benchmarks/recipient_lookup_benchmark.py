@@ -0,0 +1,93 @@
+import random
+import time
+
+from sqlalchemy import event, text
+
+from fair.db import DBAdapter
+
+from benchmarks.common import define_arg_parser, setup_db, add_players, latency_stats
+
+
+# Queries a player or a manager makes to find a recipient among the players. Paging: the pages of the players
+# are read from the first one until the page with the recipient, as with the next page button. Search: the first
+# page is shown and the recipient's name is typed, the search by the name prefix finds it on the first page
+# of the results. Queries are counted by the engine, the page cache must be off, otherwise the repeated pages
+# are not queried. The plan of the search is printed to check it is served by ix_players_name_lower.
+# Usage: python -m benchmarks.recipient_lookup_benchmark <config path> [--players 5000 --lookups 200]
+
+
+class QueryCounter:
+    def __init__(self, db_adapter: DBAdapter):
+        self.count = 0
+        event.listen(db_adapter.session_maker.kw['bind'], 'before_cursor_execute', self.count_query)
+
+    def count_query(self, *args):
+        self.count += 1
+
+
+def find_by_paging(db_adapter: DBAdapter, player_id: int, page_size: int) -> bool:
+    cursor = None
+    while True:
+        page = db_adapter.get_all_players_page(cursor=cursor, limit=page_size + 1)
+        if any(player.id == player_id for player in page[:page_size]):
+            return True
+        if len(page) <= page_size:
+            return False
+        cursor = page[page_size - 1].id
+
+
+def find_by_search(db_adapter: DBAdapter, player_id: int, name: str, page_size: int) -> bool:
+    db_adapter.get_all_players_page(cursor=None, limit=page_size + 1)
+    return any(player.id == player_id for player in db_adapter.search_players_by_name(name, limit=page_size))
+
+
+def measure(counter: QueryCounter, lookup) -> tuple[int, float]:
+    counter.count = 0
+    started_at = time.perf_counter()
+    if not lookup():
+        raise SystemExit('FAILED: the recipient is not found')
+    return counter.count, time.perf_counter() - started_at
+
+
+def main():
+    parser = define_arg_parser('Recipient lookup benchmark.')
+    parser.add_argument('--lookups', type=int, default=200, help='number of the recipients looked up')
+    parser.add_argument('--page-size', type=int, default=10, help='number of the players on a page')
+    parser.set_defaults(players=5000)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    db_adapter = setup_db(args.config_path, args.use_env_vars, args.config_env_mapping_path, args.threads)
+    if db_adapter.page_cache is not None:
+        raise SystemExit('the page cache must be off, set db.page_cache_size to 0 and unset db.page_cache_redis')
+    player_ids = add_players(db_adapter, args.players, args.balance)
+    names = {player.id: player.name for player in db_adapter.get_all_players(0, args.players)}
+    with db_adapter.session_maker() as session:
+        session.execute(text('ANALYZE players'))
+        plan = session.execute(
+            text("EXPLAIN SELECT * FROM players WHERE lower(name) LIKE :pattern ORDER BY lower(name), id LIMIT 10"),
+            {'pattern': f'{names[player_ids[-1]]}%'}
+        ).scalars().all()
+    counter = QueryCounter(db_adapter)
+
+    results = {'paging': [], 'search': []}
+    for player_id in random.sample(player_ids, min(args.lookups, len(player_ids))):
+        results['paging'].append(measure(counter, lambda: find_by_paging(db_adapter, player_id, args.page_size)))
+        results['search'].append(
+            measure(counter, lambda: find_by_search(db_adapter, player_id, names[player_id], args.page_size))
+        )
+
+    print(f'{len(results["paging"])} lookups among {args.players} players, {args.page_size} players per page')
+    for name, measured in results.items():
+        queries = [count for count, _ in measured]
+        print(
+            f'{name}: {sum(queries) / len(queries):.1f} queries per lookup, max {max(queries)}, '
+            f'latency {latency_stats([latency for _, latency in measured])}'
+        )
+    print('search plan:')
+    for line in plan:
+        print(f'  {line}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import time
+
+from telebot.types import CallbackQuery, Update
+
+from fair.bot.filters import add_custom_filters
+from fair.bot.handlers import register_handlers
+from fair.bot.router import RoutedTeleBot
+from fair.bot.states import PlayerStates, STATE_GROUPS
+from fair.config import ButtonsConfig, load_config
+from fair.utils import dummy_true
+
+
+# Routing cost of a callback query as the number of the handlers grows: the bot's own handlers plus the extra ones
+# with distinct callback data and states. Linear is telebot's scan testing the filters of every handler until
+# the first match, routed is the handler router's lookup and the test of its candidates. The update is a page
+# of the new queue locations, registered late, thus it is scanned last by telebot. State reads are counted,
+# the handlers are only matched, none of them is run, and the state is kept by the memory storage.
+# Usage: python -m benchmarks.router_benchmark <config path> [--extra-handlers 0 100 1000 --updates 2000]
+
+USER_ID = 1
+
+
+def make_callback_query(data: str) -> CallbackQuery:
+    return Update.de_json({
+        'update_id': 1,
+        'callback_query': {
+            'id': '1',
+            'chat_instance': 'benchmark',
+            'data': data,
+            'from': {'id': USER_ID, 'is_bot': False, 'first_name': 'player'},
+            'message': {
+                'message_id': 1,
+                'date': 0,
+                'text': 'menu',
+                'chat': {'id': USER_ID, 'type': 'private'},
+                'from': {'id': USER_ID + 1, 'is_bot': True, 'first_name': 'bot'},
+            },
+        },
+    }).callback_query
+
+
+def setup_bot(buttons: ButtonsConfig, extra_handlers: int) -> RoutedTeleBot:
+    bot = RoutedTeleBot('1:benchmark', threaded=False)
+    add_custom_filters(bot, 1)
+    states = [state.name for group in STATE_GROUPS for state in group._state_list]
+    for i in range(extra_handlers):
+        bot.register_callback_query_handler(
+            dummy_true,
+            func=dummy_true,
+            cb_data=f'extra_{i}',
+            state=states[i % len(states)]
+        )
+    register_handlers(bot, buttons)
+    bot.compile_routes()
+    return bot
+
+
+def measure(bot: RoutedTeleBot, call: CallbackQuery, updates: int, routed: bool) -> tuple[float, float, object]:
+    handlers = bot.callback_query_handlers
+    reads = 0
+    get_state = bot.current_states.get_state
+
+    def counted_get_state(*args):
+        nonlocal reads
+        reads += 1
+        return get_state(*args)
+
+    bot.current_states.get_state = counted_get_state
+    matched = None
+    started_at = time.perf_counter()
+    try:
+        for _ in range(updates):
+            candidates = bot._route(call, handlers, 'callback_query') if routed else handlers
+            for handler in candidates:
+                if bot._test_message_handler(handler, call):
+                    matched = handler['function']
+                    break
+    finally:
+        bot.current_states.get_state = get_state
+    return (time.perf_counter() - started_at) / updates, reads / updates, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Handler routing benchmark.')
+    parser.add_argument('config_path', metavar='Config path', type=str, help='path to the config file')
+    parser.add_argument(
+        '--extra-handlers',
+        type=int,
+        nargs='+',
+        default=[0, 100, 1000],
+        help='numbers of the extra callback query handlers'
+    )
+    parser.add_argument('--updates', type=int, default=2000, help='number of updates routed per case')
+    args = parser.parse_args()
+
+    buttons = load_config(args.config_path, False).buttons
+    call = make_callback_query('new_queue_locations_page#2')
+    for extra_handlers in args.extra_handlers:
+        bot = setup_bot(buttons, extra_handlers)
+        bot.set_state(USER_ID, PlayerStates.choose_new_queue_location, USER_ID)
+        linear, linear_reads, linear_handler = measure(bot, call, args.updates, routed=False)
+        routed, routed_reads, routed_handler = measure(bot, call, args.updates, routed=True)
+        if linear_handler is None or linear_handler is not routed_handler:
+            raise SystemExit(f'FAILED: routed handler {routed_handler} != linear one {linear_handler}')
+        print(
+            f'{len(bot.callback_query_handlers):5d} callback handlers: '
+            f'linear {linear * 1e6:8.1f} us {linear_reads:.0f} get_state, '
+            f'routed {routed * 1e6:5.1f} us {routed_reads:.0f} get_state'
+        )
+
+
+if __name__ == '__main__':
+    main()
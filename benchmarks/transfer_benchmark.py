@@ -0,0 +1,112 @@
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, func
+
+from fair.db import DBAdapter, DBError
+from fair.db.models import TransferRecord
+
+from benchmarks.common import define_arg_parser, setup_db, add_players, get_balances, latency_stats
+
+
+# Fires concurrent transfers between a small set of players, thus the same pairs are transferred between
+# in both directions at once, then checks that no transfer deadlocked or failed and the money is conserved:
+# every balance equals the initial one plus the received and minus the sent amounts of the transfers history.
+# Some transfers are made to the sender itself or to a missing player, they must be refused without a debit.
+# Usage: python -m benchmarks.transfer_benchmark <config path> [--transfers 10000 --threads 32 --players 20]
+
+
+def make_transfers(player_ids: list[int], count: int, max_amount: int, invalid_ratio: float) -> list[tuple]:
+    missing_player_id = max(player_ids) + 1
+    transfers = []
+    for _ in range(count):
+        sender, receiver = random.sample(player_ids, 2)
+        roll = random.random()
+        if roll < invalid_ratio / 2:
+            receiver = sender
+        elif roll < invalid_ratio:
+            receiver = missing_player_id
+        transfers.append((sender, receiver, random.randint(1, max_amount)))
+    return transfers
+
+
+def transfer(db_adapter: DBAdapter, sender: int, receiver: int, amount: int) -> tuple[str, float]:
+    started_at = time.perf_counter()
+    try:
+        result = 'transferred' if db_adapter.transfer_by_player_id(sender, receiver, amount) else 'refused'
+    except DBError as e:
+        result = f'error: {str(e).splitlines()[0]}'
+    return result, time.perf_counter() - started_at
+
+
+def check(db_adapter: DBAdapter, player_ids: list[int], balance: int, results: Counter) -> list[str]:
+    errors = []
+    balances = get_balances(db_adapter)
+    with db_adapter.session_maker() as session:
+        sent = dict(session.execute(
+            select(TransferRecord.sender_player_id, func.sum(TransferRecord.amount))
+            .group_by(TransferRecord.sender_player_id)
+        ).all())
+        received = dict(session.execute(
+            select(TransferRecord.receiver_player_id, func.sum(TransferRecord.amount))
+            .group_by(TransferRecord.receiver_player_id)
+        ).all())
+        records = session.execute(select(func.count(TransferRecord.id))).scalar()
+        self_records = session.execute(
+            select(func.count(TransferRecord.id))
+            .where(TransferRecord.sender_player_id == TransferRecord.receiver_player_id)
+        ).scalar()
+    if sum(balances.values()) != balance * len(player_ids):
+        errors.append(f'total balance {sum(balances.values())} != {balance * len(player_ids)}')
+    for player_id in player_ids:
+        expected = balance - sent.get(player_id, 0) + received.get(player_id, 0)
+        if balances[player_id] != expected:
+            errors.append(f'player {player_id} balance {balances[player_id]} != {expected} from the history')
+    if records != results['transferred']:
+        errors.append(f'{records} history rows != {results["transferred"]} successful transfers')
+    if self_records != 0:
+        errors.append(f'{self_records} transfers to the sender itself were made')
+    return errors
+
+
+def main():
+    parser = define_arg_parser('Concurrent money transfers benchmark.')
+    parser.add_argument('--transfers', type=int, default=10000, help='number of transfers')
+    parser.add_argument('--max-amount', type=int, default=300, help='max amount of a transfer')
+    parser.add_argument('--invalid-ratio', type=float, default=0.02, help='share of self and missing transfers')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    db_adapter = setup_db(args.config_path, args.use_env_vars, args.config_env_mapping_path, args.threads)
+    player_ids = add_players(db_adapter, args.players, args.balance)
+    transfers = make_transfers(player_ids, args.transfers, args.max_amount, args.invalid_ratio)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as executor:
+        outcomes = list(executor.map(lambda entry: transfer(db_adapter, *entry), transfers))
+    elapsed = time.perf_counter() - started_at
+
+    results = Counter(result for result, _ in outcomes)
+    print(f'{args.transfers} transfers between {args.players} players by {args.threads} threads in {elapsed:.2f} s')
+    print(f'throughput {args.transfers / elapsed:.0f} transfers/s')
+    print(f'latency {latency_stats([latency for _, latency in outcomes])}')
+    for result, count in results.most_common():
+        print(f'{result}: {count}')
+
+    errors = check(db_adapter, player_ids, args.balance, results)
+    errors += [
+        f'{count} transfers failed with {result}'
+        for result, count in results.items()
+        if result.startswith('error')
+    ]
+    for error in errors:
+        print(f'FAILED: {error}')
+    if errors:
+        raise SystemExit(1)
+    print('OK: balances are conserved and match the transfers history')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,10 @@
 import argparse
+import asyncio
 from typing import Optional
 
-from fair.config import load_config
-from fair.db import setup_adapter
-from fair.logger import setup_logger
-from fair.bot import setup_bot, launch_bot
+from fair.config import load_config, BotConfig
+from fair.context import build_context, start_services, stop_services, stop_async_services
+from fair.bot import launch_bot, launch_async_bot
 
 
 def define_arg_parser():
@@ -21,13 +21,33 @@ def define_arg_parser():
     return parser
 
 
+async def run_async_bot(context: dict, bot_config: BotConfig):
+    # the services are started within the event loop the bot is polling in
+    start_services(context)
+    try:
+        await launch_async_bot(
+            context['bot'],
+            bot_config.drop_pending,
+            bot_config.use_webhook,
+            bot_config.allowed_updates,
+            bot_config.webhook
+        )
+    finally:
+        await stop_async_services(context)
+
+
 def main(config_path: str, use_env_vars: bool, config_env_mapping_path: Optional[str] = None):
     cfg = load_config(config_path, use_env_vars, config_env_mapping_path)
-    db_logger = setup_logger(cfg.db.logger)
-    db_adapter = setup_adapter(cfg.db, db_logger)
-    bot_logger = setup_logger(cfg.bot.logger)
-    bot = setup_bot(cfg.bot, db_adapter, cfg.messages, cfg.buttons, bot_logger)
-    launch_bot(bot, cfg.bot.drop_pending, cfg.bot.use_webhook, cfg.bot.allowed_updates, cfg.bot.webhook)
+    context = build_context(cfg)
+    bot = context['bot']
+    if cfg.bot.use_async:
+        asyncio.run(run_async_bot(context, cfg.bot))
+    else:
+        start_services(context)
+        try:
+            launch_bot(bot, cfg.bot.drop_pending, cfg.bot.use_webhook, cfg.bot.allowed_updates, cfg.bot.webhook)
+        finally:
+            stop_services(context)
 
 
 if __name__ == '__main__':
@@ -2,34 +2,45 @@ from typing import Optional
 
 from sanic import Sanic
 
-from fair.bot import setup_bot, launch_bot, stop_bot
+from fair.bot import launch_bot, stop_bot, launch_async_bot, stop_async_bot
+from fair.bot.ingestion import UpdateFilter
 from fair.config import load_config
-from fair.db import setup_adapter
-from fair.logger import setup_logger
+from fair.context import build_context, start_services, stop_services, stop_async_services
 from fair.routes import setup_routes
 
 
 async def on_startup(app: Sanic):
     bot = app.ctx['bot']
     cfg = app.ctx['bot_config']
-    launch_bot(bot, cfg.drop_pending, cfg.use_webhook, cfg.allowed_updates, cfg.webhook)
+    start_services(app.ctx)
+    if cfg.use_async:
+        # polling never returns, thus it is launched as a background task of the app
+        app.add_task(launch_async_bot(bot, cfg.drop_pending, cfg.use_webhook, cfg.allowed_updates, cfg.webhook))
+    else:
+        launch_bot(bot, cfg.drop_pending, cfg.use_webhook, cfg.allowed_updates, cfg.webhook)
 
 
 async def on_shutdown(app: Sanic):
     bot = app.ctx['bot']
     cfg = app.ctx['bot_config']
-    stop_bot(bot, cfg.use_webhook)
+    if cfg.use_async:
+        await stop_async_bot(bot, cfg.use_webhook)
+        await stop_async_services(app.ctx)
+    else:
+        stop_bot(bot, cfg.use_webhook)
+        stop_services(app.ctx)
 
 
 def build_app(config_path: str, use_env_vars: bool, config_env_mapping_path: Optional[str] = None) -> Sanic:
     app = Sanic("FairBotApp")
     cfg = load_config(config_path, use_env_vars, config_env_mapping_path)
-    app.ctx['bot_config'] = cfg.bot
-    db_logger = setup_logger(cfg.db.logger)
-    db_adapter = setup_adapter(cfg.db, db_logger)
-    bot_logger = setup_logger(cfg.bot.logger)
-    bot = setup_bot(cfg.bot, db_adapter, cfg.messages, cfg.buttons, bot_logger)
-    app.ctx['bot'] = bot
+    context = build_context(cfg)
+    for key, value in context.items():
+        app.ctx[key] = value
+    bot = context['bot']
+    # built after the handlers are registered
+    app.ctx['update_filter'] = UpdateFilter(bot)
+    app.ctx['admin_config'] = cfg.admin
 
     setup_routes(app)
     app.before_server_start(on_startup)
@@ -2,14 +2,25 @@ import logging
 from typing import Optional
 
 from telebot import TeleBot
+from telebot.async_telebot import AsyncTeleBot
 
 from fair.config import BotConfig, BotWebhookConfig, MessagesConfig, ButtonsConfig
-from fair.db import DBAdapter
+from fair.db import DBAdapter, AsyncDBAdapter
+from fair.utils import LRUCache
 
+from fair.bot import asyncio_filters, asyncio_handlers, asyncio_middlewares
+from fair.bot.api_queue import ApiQueue, AsyncApiQueue
+from fair.bot.dispatcher import DispatchedTeleBot, AsyncDispatchedTeleBot, uses_dispatcher
+from fair.bot.outbound import OutboundDispatcher, AsyncOutboundDispatcher
+from fair.bot.queue_notifier import QueueNotifier, AsyncQueueNotifier
 from fair.bot.filters import add_custom_filters
 from fair.bot.handlers import register_handlers
 from fair.bot.middlewares import setup_middlewares
-from fair.bot.states import setup_state_storage
+from fair.bot.router import RoutedTeleBot, AsyncRoutedTeleBot
+from fair.bot.rate_limiter import (
+    MemoryRateLimiter, RedisRateLimiter, AsyncMemoryRateLimiter, AsyncRedisRateLimiter
+)
+from fair.bot.states import STATE_GROUPS, setup_state_storage, setup_async_state_storage
 
 
 def launch_bot(bot: TeleBot,
@@ -56,22 +67,113 @@ def setup_bot(
         db_adapter: DBAdapter,
         messages: MessagesConfig,
         buttons: ButtonsConfig,
-        logger: logging.Logger):
-    state_storage = setup_state_storage(bot_config.state_storage)
-    bot = TeleBot(bot_config.token, state_storage=state_storage, use_class_middlewares=bot_config.use_class_middlewares)
+        logger: logging.Logger,
+        rate_limiter: MemoryRateLimiter | RedisRateLimiter,
+        api_queue: ApiQueue,
+        outbound: OutboundDispatcher,
+        queue_notifier: QueueNotifier):
+    state_storage = setup_state_storage(bot_config.state_storage, STATE_GROUPS)
+    # updates are handled by the dispatcher's workers if it is used, thus the bot's own thread pool is not
+    use_dispatcher = uses_dispatcher(bot_config)
+    bot_cls = DispatchedTeleBot if use_dispatcher else RoutedTeleBot
+    bot = bot_cls(
+        bot_config.token,
+        state_storage=state_storage,
+        use_class_middlewares=bot_config.use_class_middlewares,
+        threaded=not use_dispatcher
+    )
 
     add_custom_filters(bot, bot_config.owner_tg_id)
     if bot_config.use_class_middlewares:
         setup_middlewares(
             bot,
             messages.anti_flood,
-            bot_config.actions_timeout,
+            rate_limiter,
             db_adapter,
             messages,
             buttons,
             logger,
-            bot_config.page_size
+            bot_config.page_size,
+            LRUCache(bot_config.inline_cache_size, bot_config.inline_cache_time),
+            api_queue,
+            outbound,
+            queue_notifier
         )
     register_handlers(bot, buttons)
+    bot.compile_routes()
+
+    return bot
+
+
+async def launch_async_bot(bot: AsyncRoutedTeleBot,
+                           drop_pending: bool,
+                           use_webhook: bool,
+                           allowed_updates: Optional[list[str]] = None,
+                           webhook_config: Optional[BotWebhookConfig] = None
+                           ):
+    # the bot user is requested once here for both the polling and the webhook,
+    # the handlers read it instead of requesting it on every update
+    bot.bot_user = await bot.get_me()
+    await bot.set_state(bot.bot_user.id, 1, bot.bot_user.id)
+    if use_webhook:
+        if webhook_config is None:
+            raise ValueError('webhook_config is required if use_webhook is True')
+        await bot.remove_webhook()
+        await bot.set_webhook(
+            url=webhook_config.url,
+            certificate=webhook_config.cert_path,
+            max_connections=webhook_config.max_connections,
+            allowed_updates=allowed_updates,
+            ip_address=webhook_config.ip_address,
+            drop_pending_updates=drop_pending,
+            secret_token=webhook_config.secret_token
+        )
+    else:
+        await bot.remove_webhook()
+        await bot.infinity_polling(allowed_updates=allowed_updates, skip_pending=drop_pending)
+
+
+async def stop_async_bot(bot: AsyncTeleBot, use_webhook: bool):
+    if use_webhook:
+        # see the comment in stop_bot, the same applies here
+
+        # await bot.remove_webhook()
+        pass
+    # polling stops together with the event loop, only the aiohttp session has to be closed
+    await bot.close_session()
+
+
+def setup_async_bot(
+        bot_config: BotConfig,
+        db_adapter: AsyncDBAdapter,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        logger: logging.Logger,
+        rate_limiter: AsyncMemoryRateLimiter | AsyncRedisRateLimiter,
+        api_queue: AsyncApiQueue,
+        outbound: AsyncOutboundDispatcher,
+        queue_notifier: AsyncQueueNotifier):
+    state_storage = setup_async_state_storage(bot_config.state_storage, STATE_GROUPS)
+    bot_cls = AsyncDispatchedTeleBot if uses_dispatcher(bot_config) else AsyncRoutedTeleBot
+    bot = bot_cls(bot_config.token, state_storage=state_storage)
+
+    asyncio_filters.add_custom_filters(bot, bot_config.owner_tg_id)
+    if bot_config.use_class_middlewares:
+        asyncio_middlewares.setup_middlewares(
+            bot,
+            messages.anti_flood,
+            rate_limiter,
+            db_adapter,
+            messages,
+            buttons,
+            logger,
+            bot_config.page_size,
+            LRUCache(bot_config.inline_cache_size, bot_config.inline_cache_time),
+            api_queue,
+            outbound,
+            queue_notifier
+        )
+    asyncio_handlers.register_handlers(bot, buttons)
+    bot.compile_routes()
 
     return bot
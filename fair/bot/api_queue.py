@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+
+# Fire-and-forget queue for the non-critical Bot API calls (callback query answers and alike),
+# thus the handlers don't wait for the Telegram round-trip of the calls nobody waits for.
+# Calls are made by the long-living workers, thus the connections are reused:
+# TeleBot keeps a requests session per thread, AsyncTeleBot shares a single aiohttp session.
+# Failed calls are logged and counted, they are never retried
+
+
+class BaseApiQueue:
+    # queue of the pending calls, created by the subclasses
+    _queue: queue.Queue | asyncio.Queue
+
+    def __init__(self, logger: logging.Logger, workers: int, max_size: int):
+        self.logger = logger
+        self.workers = workers
+        self.max_size = max_size
+        self.dropped = 0
+        # method name -> [calls, failures, total latency, max latency]
+        self._stats: dict[str, list] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, method: str, latency: float, failed: bool):
+        with self._stats_lock:
+            stats = self._stats.setdefault(method, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += failed
+            stats[2] += latency
+            stats[3] = max(stats[3], latency)
+
+    def _call_failed(self, method: str, e: Exception):
+        self.logger.warning(f"Queued {method} call failed: {e}")
+
+    def _queue_full(self, method: str):
+        self.dropped += 1
+        self.logger.warning(f"API queue is full, {method} call is dropped")
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            methods = {
+                method: {
+                    'calls': calls,
+                    'failures': failures,
+                    'avg_latency': total_latency / calls,
+                    'max_latency': max_latency,
+                }
+                for method, (calls, failures, total_latency, max_latency) in self._stats.items()
+            }
+        return {
+            'pending': self.qsize(),
+            'max_size': self.max_size,
+            'dropped': self.dropped,
+            'methods': methods,
+        }
+
+
+class ApiQueue(BaseApiQueue):
+    def __init__(self, logger: logging.Logger, workers: int, max_size: int):
+        super().__init__(logger, workers, max_size)
+        self._queue: queue.Queue = queue.Queue(max_size)
+        self._threads: list[threading.Thread] = []
+
+    def submit(self, method: Callable, *args, **kwargs):
+        # method is the bound bot method, e.g. bot.answer_callback_query
+        try:
+            self._queue.put_nowait((method, args, kwargs))
+        except queue.Full:
+            self._queue_full(method.__name__)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            method, args, kwargs = item
+            started = time.perf_counter()
+            failed = False
+            try:
+                method(*args, **kwargs)
+            except Exception as e:
+                failed = True
+                self._call_failed(method.__name__, e)
+            self._record(method.__name__, time.perf_counter() - started, failed)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'ApiQueueWorker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = 5):
+        # pending calls are made before the workers stop
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+
+class AsyncApiQueue(BaseApiQueue):
+    # asyncio counterpart of the ApiQueue, submit is not a coroutine, thus it never blocks the handler
+
+    def __init__(self, logger: logging.Logger, workers: int, max_size: int):
+        super().__init__(logger, workers, max_size)
+        self._queue: asyncio.Queue = asyncio.Queue(max_size)
+        self._tasks: list[asyncio.Task] = []
+
+    def submit(self, method: Callable, *args, **kwargs):
+        # method is the bound bot method, e.g. bot.answer_callback_query
+        try:
+            self._queue.put_nowait((method, args, kwargs))
+        except asyncio.QueueFull:
+            self._queue_full(method.__name__)
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            method, args, kwargs = item
+            started = time.perf_counter()
+            failed = False
+            try:
+                await method(*args, **kwargs)
+            except Exception as e:
+                failed = True
+                self._call_failed(method.__name__, e)
+            self._record(method.__name__, time.perf_counter() - started, failed)
+
+    def start(self):
+        # must be called from the running event loop
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self, timeout: Optional[float] = 5):
+        # pending calls are made before the workers stop
+        if not self._tasks:
+            return
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.wait(self._tasks, timeout=timeout)
+        self._tasks.clear()
@@ -0,0 +1,22 @@
+from telebot.async_telebot import AsyncTeleBot
+from telebot.asyncio_filters import IsDigitFilter
+
+
+from fair.bot.asyncio_filters.state import StateFilter
+from fair.bot.asyncio_filters.callback_data import CallbackDataFilter, CallbackDataPaginationFilter
+from fair.bot.asyncio_filters.text import TextEqualsFilter, AllowedCharsFilter
+from fair.bot.asyncio_filters.roles import IsOwnerFilter
+
+
+def add_custom_filters(bot: AsyncTeleBot, owner_tg_id: int):
+    # add any custom filters here
+    bot.add_custom_filter(StateFilter(bot))
+    bot.add_custom_filter(IsDigitFilter())
+
+    bot.add_custom_filter(TextEqualsFilter())
+    bot.add_custom_filter(AllowedCharsFilter())
+
+    bot.add_custom_filter(CallbackDataFilter())
+    bot.add_custom_filter(CallbackDataPaginationFilter())
+
+    bot.add_custom_filter(IsOwnerFilter(owner_tg_id))
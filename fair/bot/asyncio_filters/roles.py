@@ -0,0 +1,12 @@
+from telebot.asyncio_filters import SimpleCustomFilter
+
+
+class IsOwnerFilter(SimpleCustomFilter):
+    key = 'is_owner'
+
+    def __init__(self, owner_tg_id: int):
+        super().__init__()
+        self.owner_tg_id = owner_tg_id
+
+    async def check(self, update):
+        return update.from_user.id == self.owner_tg_id
@@ -0,0 +1,15 @@
+from telebot import asyncio_filters
+from telebot.handler_backends import State
+
+
+class StateFilter(asyncio_filters.StateFilter):
+    # states are declared once with telebot.handler_backends for both sync and async bots,
+    # but the async StateFilter only recognizes states from telebot.asyncio_handler_backends,
+    # thus states are converted to their names before the check
+
+    async def check(self, message, text):
+        if isinstance(text, list):
+            text = [i.name if isinstance(i, State) else i for i in text]
+        elif isinstance(text, State):
+            text = text.name
+        return await super().check(message, text)
@@ -0,0 +1,28 @@
+from telebot.async_telebot import AsyncTeleBot
+
+from fair.config import ButtonsConfig
+
+from fair.bot.asyncio_handlers import (
+    basic_commands_flow,
+    player_registration_flow,
+    manager_registration_flow,
+    player_permanent_menu,
+    player_queue_flow,
+    money_transfer_flow,
+    manager_permanent_menu,
+    manager_location_flow,
+    inline_query_flow,
+)
+
+
+def register_handlers(bot: AsyncTeleBot, buttons: ButtonsConfig):
+    # register all handlers here
+    basic_commands_flow.register_handlers(bot, buttons)
+    player_registration_flow.register_handlers(bot)
+    manager_registration_flow.register_handlers(bot)
+    player_permanent_menu.register_handlers(bot, buttons)
+    player_queue_flow.register_handlers(bot)
+    money_transfer_flow.register_handlers(bot)
+    manager_permanent_menu.register_handlers(bot, buttons)
+    manager_location_flow.register_handlers(bot)
+    inline_query_flow.register_handlers(bot)
@@ -0,0 +1,5 @@
+# Admins permanent menu with text buttons
+
+# 1. Help
+# 5. Add new location
+# 6. Remove location
@@ -0,0 +1,763 @@
+from logging import Logger
+
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import Message, CallbackQuery
+
+from fair.config import MessagesConfig, ButtonsConfig
+from fair.db import AsyncDBAdapter, DBError
+from fair.utils import dummy_true
+
+from fair.bot import keyboards
+from fair.bot.outbound import AsyncOutboundDispatcher
+from fair.bot.states import ManagerStates
+
+
+# Manager's permanent menu with text buttons
+
+# 1. Help
+# 2. Choose location
+# 3. My location
+# 4.1 Reward a player
+# 4.2 Purchase
+# 5. List all players with pages (10 players per page)
+#    while choosing a recipient players can also be found by the name prefix
+# 6. List all locations with pages (10 locations per page), sorted by the number of players in a queue
+# 7. Add money to player's balance
+# 8. Subtract money from player's balance
+
+
+async def list_all_players_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        players = await db_adapter.get_all_players_page(cursor=None, limit=page_size + 1)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda player: (player.id,)
+        )
+        collection = list((player.name, player.id) for player in players)
+        keyboard = keyboards.collection_page(
+            collection=collection,
+            collection_name="players",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(bot.send_message, message.chat.id, messages.all_players, reply_markup=keyboard)
+
+
+async def all_players_page_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    cursor, backward = keyboards.parse_page_cursor(call.data)
+    try:
+        players = await db_adapter.get_all_players_page(cursor=cursor[0], limit=page_size + 1, backward=backward)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
+        return
+    else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda player: (player.id,)
+        )
+        collection = list((player.name, player.id) for player in players)
+        keyboard = keyboards.collection_page(
+            collection=collection,
+            collection_name="players",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(
+            bot.edit_message_reply_markup,
+            chat_id=call.message.chat.id,
+            message_id=call.message.id,
+            reply_markup=keyboard
+        )
+
+
+async def all_players_cancel_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    outbound.submit(
+        bot.edit_message_text,
+        text=messages.all_players_cancelled,
+        chat_id=call.message.chat.id,
+        message_id=call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+
+
+async def list_all_locations_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        locations = await db_adapter.get_all_locations_page(cursor=None, limit=page_size + 1)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
+        collection = list((f"{location.name} - {queue}", location.id) for location, queue in locations)
+        keyboard = keyboards.collection_page(
+            collection=collection,
+            collection_name="locations",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(bot.send_message, message.chat.id, messages.all_locations, reply_markup=keyboard)
+
+
+async def all_locations_page_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    cursor, backward = keyboards.parse_page_cursor(call.data)
+    try:
+        locations = await db_adapter.get_all_locations_page(cursor=cursor, limit=page_size + 1, backward=backward)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
+        return
+    else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
+        collection = list((f"{location.name} - {queue}", location.id) for location, queue in locations)
+        keyboard = keyboards.collection_page(
+            collection=collection,
+            collection_name="locations",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(
+            bot.edit_message_reply_markup,
+            chat_id=call.message.chat.id,
+            message_id=call.message.id,
+            reply_markup=keyboard
+        )
+
+
+async def all_locations_cancel_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    outbound.submit(
+        bot.edit_message_text,
+        text=messages.all_locations_cancelled,
+        chat_id=call.message.chat.id,
+        message_id=call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+
+
+async def create_recipients_keyboard(
+        db_adapter: AsyncDBAdapter,
+        buttons: ButtonsConfig,
+        collection_name: str,
+        page_size: int):
+    players = await db_adapter.get_all_players_page(cursor=None, limit=page_size + 1)
+    players, prev_cursor, next_cursor = keyboards.page_cursors(
+        page=players,
+        page_size=page_size,
+        cursor=None,
+        backward=False,
+        key=lambda player: (player.id,)
+    )
+    collection = list((player.name, player.id) for player in players)
+    keyboard = keyboards.collection_page(
+        collection=collection,
+        collection_name=collection_name,
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
+        prev_page_btn=buttons.prev_page,
+        next_page_btn=buttons.next_page,
+        cancel_btn=buttons.cancel
+    )
+    return keyboard
+
+
+async def add_balance_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        keyboard = await create_recipients_keyboard(db_adapter, buttons, "add_balance_recipients", page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        await bot.set_state(message.from_user.id, ManagerStates.choose_add_recipient, message.chat.id)
+        outbound.submit(bot.send_message, message.chat.id, messages.choose_add_balance_recipient, reply_markup=keyboard)
+
+
+async def subtract_balance_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        keyboard = await create_recipients_keyboard(db_adapter, buttons, "subtract_balance_recipients", page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        await bot.set_state(message.from_user.id, ManagerStates.choose_subtract_recipient, message.chat.id)
+        outbound.submit(
+            bot.send_message,
+            message.chat.id,
+            messages.choose_subtract_balance_recipient,
+            reply_markup=keyboard
+        )
+
+
+async def reward_player_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        keyboard = await create_recipients_keyboard(db_adapter, buttons, "reward_recipients", page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
+        return
+    else:
+        await bot.set_state(call.from_user.id, ManagerStates.choose_reward_recipient, call.message.chat.id)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.choose_reward_recipient, reply_markup=keyboard)
+
+
+async def purchase_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        keyboard = await create_recipients_keyboard(db_adapter, buttons, "purchase_recipients", page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
+        return
+    else:
+        await bot.set_state(call.from_user.id, ManagerStates.choose_purchase_recipient, call.message.chat.id)
+        outbound.submit(
+            bot.send_message,
+            call.message.chat.id,
+            messages.choose_purchase_recipient,
+            reply_markup=keyboard
+        )
+
+
+async def recipient_page_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    collection_name = call.data.split("#")[0][:-5]  # remove "_page"
+    cursor, backward = keyboards.parse_page_cursor(call.data)
+    try:
+        players = await db_adapter.get_all_players_page(cursor=cursor[0], limit=page_size + 1, backward=backward)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
+        return
+    else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda player: (player.id,)
+        )
+        collection = list((player.name, player.id) for player in players)
+        keyboard = keyboards.collection_page(
+            collection=collection,
+            collection_name=collection_name,
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(
+            bot.edit_message_reply_markup,
+            chat_id=call.message.chat.id,
+            message_id=call.message.id,
+            reply_markup=keyboard
+        )
+
+
+async def recipient_search_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    state = await bot.get_state(message.from_user.id, message.chat.id)
+    if state == ManagerStates.choose_add_recipient.name:
+        collection_name = "add_balance_recipients"
+    elif state == ManagerStates.choose_subtract_recipient.name:
+        collection_name = "subtract_balance_recipients"
+    elif state == ManagerStates.choose_reward_recipient.name:
+        collection_name = "reward_recipients"
+    else:
+        collection_name = "purchase_recipients"
+    try:
+        players = await db_adapter.search_players_by_name(message.text, limit=page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if len(players) == 0:
+            outbound.submit(bot.send_message, message.chat.id, messages.player_search_no_results)
+            return
+        keyboard = keyboards.collection_page(
+            collection=[(player.name, player.id) for player in players],
+            collection_name=collection_name,
+            prev_cursor=None,
+            next_cursor=None,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(bot.send_message, message.chat.id, messages.player_search_results, reply_markup=keyboard)
+
+
+async def recipient_cancel_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    msg = messages.unknown_error
+    await bot.set_state(call.from_user.id, ManagerStates.main_menu)
+    if "add_balance_recipients" in call.data:
+        msg = messages.add_balance_cancelled
+    elif "subtract_balance_recipients" in call.data:
+        msg = messages.subtract_balance_cancelled
+    elif "reward_recipients" in call.data:
+        msg = messages.reward_cancelled
+    elif "purchase_recipients" in call.data:
+        msg = messages.purchase_cancelled
+    outbound.submit(
+        bot.edit_message_text,
+        text=msg,
+        chat_id=call.message.chat.id,
+        message_id=call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+
+
+async def recipient_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    recipient_player_id = int(call.data.split("#")[1])
+    await bot.add_data(call.from_user.id, call.message.chat.id, recipient_player_id=recipient_player_id)
+    msg = messages.unknown_error
+    if "add_balance_recipients" in call.data:
+        msg = messages.choose_add_balance_amount
+        await bot.set_state(call.from_user.id, ManagerStates.choose_add_amount)
+    elif "subtract_balance_recipients" in call.data:
+        msg = messages.choose_subtract_balance_amount
+        await bot.set_state(call.from_user.id, ManagerStates.choose_subtract_amount)
+    elif "reward_recipients" in call.data:
+        msg = messages.choose_reward_amount
+        await bot.set_state(call.from_user.id, ManagerStates.choose_reward_amount)
+    elif "purchase_recipients" in call.data:
+        msg = messages.choose_purchase_amount
+        await bot.set_state(call.from_user.id, ManagerStates.choose_purchase_amount)
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+    outbound.submit(bot.send_message, chat_id=call.message.chat.id, text=msg)
+
+
+async def choose_location_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        locations = await db_adapter.get_all_locations_page(cursor=None, limit=page_size + 1)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
+        collection = list((f"{location.name} - {queue}", location.id) for location, queue in locations)
+        keyboard = keyboards.collection_page(
+            collection=collection,
+            collection_name="choose_locations",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        await bot.set_state(message.from_user.id, ManagerStates.choose_location, message.chat.id)
+        outbound.submit(bot.send_message, message.chat.id, messages.choose_location, reply_markup=keyboard)
+
+
+async def my_location_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        location = await db_adapter.get_location_by_manager_tg_id(message.from_user.id)
+        queue_count = 0
+        if location is not None:
+            queue_count = await db_adapter.get_queue_count_by_location_id(location.id)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if location is None:
+            outbound.submit(bot.send_message, message.chat.id, messages.manager_not_on_location_error)
+        else:
+            outbound.submit(
+                bot.send_message,
+                message.chat.id,
+                messages.manager_my_location.format(location.name, queue_count),
+                reply_markup=keyboards.location_options(
+                    my_location_queue_btn=buttons.my_location_queue,
+                    call_next_btn=buttons.call_next,
+                    select_players_btn=buttons.select_players,
+                    pause_the_location_btn=buttons.pause_location
+                )
+            )
+
+
+async def leave_location_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        manager_location_updated = await db_adapter.update_manager_location_by_tg_id(message.from_user.id, None)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if manager_location_updated is False:
+            outbound.submit(bot.send_message, message.chat.id, messages.manager_not_on_location_error)
+        else:
+            outbound.submit(
+                bot.send_message,
+                message.chat.id,
+                messages.manager_left_location,
+                reply_markup=keyboards.manager_main_menu(
+                    list_all_players_btn=buttons.list_all_players,
+                    list_all_locations_btn=buttons.list_all_locations,
+                    add_balance_btn=buttons.add_balance,
+                    subtract_balance_btn=buttons.subtract_balance,
+                    choose_location_btn=buttons.choose_location,
+                    help_btn=buttons.help
+                )
+            )
+
+
+def register_recipient_handlers(bot: AsyncTeleBot):
+    bot.register_callback_query_handler(
+        recipient_page_handler,
+        func=dummy_true,
+        cb_data_pagination="add_balance_recipients_page",
+        state=ManagerStates.choose_add_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_cancel_handler,
+        func=dummy_true,
+        cb_data_pagination="add_balance_recipients_cancel",
+        state=ManagerStates.choose_add_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_handler,
+        func=dummy_true,
+        cb_data_pagination="add_balance_recipients",
+        state=ManagerStates.choose_add_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_page_handler,
+        func=dummy_true,
+        cb_data_pagination="subtract_balance_recipients_page",
+        state=ManagerStates.choose_subtract_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_cancel_handler,
+        func=dummy_true,
+        cb_data_pagination="subtract_balance_recipients_cancel",
+        state=ManagerStates.choose_subtract_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_handler,
+        func=dummy_true,
+        cb_data_pagination="subtract_balance_recipients",
+        state=ManagerStates.choose_subtract_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_page_handler,
+        func=dummy_true,
+        cb_data_pagination="reward_recipients_page",
+        state=ManagerStates.choose_reward_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_cancel_handler,
+        func=dummy_true,
+        cb_data_pagination="reward_recipients_cancel",
+        state=ManagerStates.choose_reward_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_page_handler,
+        func=dummy_true,
+        cb_data_pagination="purchase_recipients_page",
+        state=ManagerStates.choose_purchase_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_cancel_handler,
+        func=dummy_true,
+        cb_data_pagination="purchase_recipients_cancel",
+        state=ManagerStates.choose_purchase_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        recipient_handler,
+        func=dummy_true,
+        cb_data_pagination="purchase_recipients",
+        state=ManagerStates.choose_purchase_recipient,
+        pass_bot=True
+    )
+
+
+def register_handlers(bot: AsyncTeleBot, buttons: ButtonsConfig):
+    bot.register_message_handler(
+        list_all_players_handler,
+        text_equals=buttons.list_all_players,
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        all_players_page_handler,
+        func=dummy_true,
+        cb_data_pagination="players_page",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        all_players_cancel_handler,
+        func=dummy_true,
+        cb_data="players_cancel",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        list_all_locations_handler,
+        text_equals=buttons.list_all_locations,
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        all_locations_page_handler,
+        func=dummy_true,
+        cb_data_pagination="locations_page",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        all_locations_cancel_handler,
+        func=dummy_true,
+        cb_data="locations_cancel",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        add_balance_handler,
+        text_equals=buttons.add_balance,
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        subtract_balance_handler,
+        text_equals=buttons.subtract_balance,
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        reward_player_handler,
+        func=dummy_true,
+        cb_data="reward_player",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        purchase_handler,
+        func=dummy_true,
+        cb_data="purchase",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    register_recipient_handlers(bot)
+    bot.register_message_handler(
+        choose_location_handler,
+        text_equals=buttons.choose_location,
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        my_location_handler,
+        text_equals=buttons.my_location,
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        leave_location_handler,
+        text_equals=buttons.leave_location,
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    # registered last, thus the menu buttons are never treated as a search query
+    bot.register_message_handler(
+        recipient_search_handler,
+        content_types=['text'],
+        state=[
+            ManagerStates.choose_add_recipient,
+            ManagerStates.choose_subtract_recipient,
+            ManagerStates.choose_reward_recipient,
+            ManagerStates.choose_purchase_recipient
+        ],
+        pass_bot=True
+    )
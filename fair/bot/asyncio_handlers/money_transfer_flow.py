@@ -0,0 +1,247 @@
+from logging import Logger
+
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import Message, CallbackQuery
+
+from fair.config import MessagesConfig, ButtonsConfig
+from fair.db import AsyncDBAdapter, DBError
+from fair.utils import dummy_true
+
+from fair.bot import keyboards
+from fair.bot.outbound import AsyncOutboundDispatcher, Priority
+from fair.bot.api_queue import AsyncApiQueue
+from fair.bot.states import PlayerStates
+
+
+# Money transfers from player to player
+
+# User is to come here after pressing the text button "Money transfer"
+
+# 1. Show a list of players with pages (10 players per page) to be a recipient,
+#    or the players found by the name prefix the user typed
+# 2. Ask for an amount with a few template values as inline buttons (e.g. 10, 50, 100, 500, 1000)
+# 3. Finish the transfer
+
+
+async def money_transfer_recipient_page_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        api_queue: AsyncApiQueue,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    cursor, backward = keyboards.parse_page_cursor(call.data)
+    try:
+        players = await db_adapter.get_all_players_page(cursor=cursor[0], limit=page_size + 1, backward=backward)
+    except DBError as e:
+        logger.error(e)
+        api_queue.submit(bot.answer_callback_query, call.id, text=messages.unknown_error)
+        return
+    else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda player: (player.id,)
+        )
+        logger.debug(f"Player {call.from_user.id} is choosing a money transfer recipient, cursor {cursor}")
+        keyboard = keyboards.collection_page(
+            collection=[(player.name, player.id) for player in players],
+            collection_name="transfer_recipients",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(bot.edit_message_reply_markup, call.message.chat.id, call.message.id, reply_markup=keyboard)
+
+
+async def money_transfer_recipient_search_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        players = await db_adapter.search_players_by_name(message.text, limit=page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        logger.debug(f"Player {message.from_user.id} is searching for a money transfer recipient by {message.text}")
+        if len(players) == 0:
+            outbound.submit(bot.send_message, message.chat.id, messages.player_search_no_results)
+            return
+        keyboard = keyboards.collection_page(
+            collection=[(player.name, player.id) for player in players],
+            collection_name="transfer_recipients",
+            prev_cursor=None,
+            next_cursor=None,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(bot.send_message, message.chat.id, messages.player_search_results, reply_markup=keyboard)
+
+
+async def money_transfer_recipient_cancel_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    logger.debug(f"Player {call.from_user.id} cancelled choosing a recipient for money transfer")
+    await bot.set_state(call.from_user.id, PlayerStates.main_menu, call.message.chat.id)
+    outbound.submit(
+        bot.edit_message_text,
+        text=messages.money_transfer_recipient_cancelled,
+        chat_id=call.message.chat.id,
+        message_id=call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+
+
+async def money_transfer_recipient_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    recipient_player_id = int(call.data.split("#")[1])
+    logger.debug(f"Player {call.from_user.id} chose a recipient {recipient_player_id} for money transfer")
+    await bot.add_data(call.from_user.id, call.message.chat.id, recipient_player_id=recipient_player_id)
+    await bot.set_state(call.from_user.id, PlayerStates.choose_money_transfer_amount, call.message.chat.id)
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+    outbound.submit(
+        bot.send_message,
+        chat_id=call.message.chat.id,
+        text=messages.choose_money_transfer_amount,
+        reply_markup=keyboards.transfer_amount(buttons.cancel)
+    )
+
+
+async def money_transfer_amount_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    async with bot.retrieve_data(message.from_user.id, message.chat.id) as data:
+        recipient_player_id = data.get("recipient_player_id")
+    if recipient_player_id is None:
+        logger.debug(f"Player {message.from_user.id} is trying to transfer money without choosing a recipient")
+        outbound.submit(
+            bot.send_message,
+            chat_id=message.chat.id,
+            text=messages.money_transfer_recipient_not_chosen_error,
+            reply_markup=keyboards.empty_inline()
+        )
+        await bot.set_state(message.from_user.id, PlayerStates.main_menu, message.chat.id)
+        return
+    else:
+        try:
+            player = await db_adapter.get_player_by_tg_id(message.from_user.id)
+            queue_entry = await db_adapter.get_queue_entry_by_player_id(player.id)
+            money_transferred = False
+            if player is not None:
+                money_transferred = await db_adapter.transfer_by_player_id(
+                    player.id,
+                    recipient_player_id,
+                    int(message.text)
+                )
+        except DBError as e:
+            logger.error(e)
+            outbound.submit(bot.send_message, chat_id=message.chat.id, text=messages.unknown_error)
+            return
+        else:
+            if money_transferred is False:
+                logger.debug(f"Player {message.from_user.id} is trying to transfer money with invalid amount")
+                outbound.submit(
+                    bot.send_message,
+                    chat_id=message.chat.id,
+                    text=messages.money_transfer_amount_invalid_error
+                )
+                return
+            else:
+                logger.debug(f"Player {message.from_user.id} transferred money to player {recipient_player_id}")
+                if queue_entry is None:
+                    keyboard = keyboards.player_main_menu(
+                        new_queue_btn=buttons.new_queue,
+                        my_balance_btn=buttons.my_balance,
+                        transfer_money_btn=buttons.transfer_money,
+                        help_btn=buttons.help
+                    )
+                else:
+                    keyboard = keyboards.player_queue_menu(
+                        my_queue_btn=buttons.my_queue,
+                        leave_the_queue_btn=buttons.leave_queue,
+                        my_balance_btn=buttons.my_balance,
+                        transfer_money_btn=buttons.transfer_money,
+                        help_btn=buttons.help
+                    )
+                await bot.set_state(message.from_user.id, PlayerStates.main_menu, message.chat.id)
+                outbound.submit(
+                    bot.send_message,
+                    chat_id=message.chat.id,
+                    text=messages.money_transfer_success,
+                    reply_markup=keyboard,
+                    priority=Priority.HIGH
+                )
+
+
+def register_handlers(bot: AsyncTeleBot):
+    bot.register_callback_query_handler(
+        money_transfer_recipient_page_handler,
+        func=dummy_true,
+        cb_data_pagination="transfer_recipients_page",
+        state=PlayerStates.choose_money_transfer_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        money_transfer_recipient_cancel_handler,
+        func=dummy_true,
+        cb_data="transfer_recipients_cancel",
+        state=PlayerStates.choose_money_transfer_recipient,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        money_transfer_recipient_handler,
+        func=dummy_true,
+        cb_data_pagination="transfer_recipients",
+        state=PlayerStates.choose_money_transfer_recipient,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        money_transfer_recipient_search_handler,
+        content_types=['text'],
+        state=PlayerStates.choose_money_transfer_recipient,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        money_transfer_amount_handler,
+        is_digit=True,
+        state=PlayerStates.choose_money_transfer_amount,
+        pass_bot=True
+    )
@@ -0,0 +1,226 @@
+import math
+from logging import Logger
+
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import Message
+
+from fair.config import MessagesConfig, ButtonsConfig
+from fair.db import AsyncDBAdapter, DBError
+
+from fair.bot import keyboards
+from fair.bot.outbound import AsyncOutboundDispatcher, Priority
+from fair.bot.queue_notifier import AsyncQueueNotifier
+from fair.bot.states import PlayerStates
+
+
+# Player's permanent menu with text buttons
+
+# 1. New queue
+# 2. My queue
+# 3. Leave the queue
+# 4. My balance
+# 5. Transfer money
+
+
+async def my_balance_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        player = await db_adapter.get_player_by_tg_id(message.from_user.id)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if player is None:
+            logger.debug(f"Player with tg_id {message.from_user.id} not found!")
+            outbound.submit(bot.send_message, message.chat.id, messages.player_not_found_error)
+        else:
+            outbound.submit(
+                bot.send_message,
+                message.chat.id,
+                messages.player_balance.format(player.balance),
+                priority=Priority.HIGH
+            )
+
+
+async def transfer_money_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        players = await db_adapter.get_all_players_page(cursor=None, limit=page_size + 1)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda player: (player.id,)
+        )
+        logger.debug(f"Player with tg_id {message.from_user.id} initiated money transfer")
+        keyboard = keyboards.collection_page(
+            collection=[(player.name, player.id) for player in players],
+            collection_name='transfer_recipients',
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel,
+        )
+        await bot.set_state(message.from_user.id, PlayerStates.choose_money_transfer_recipient, message.chat.id)
+        outbound.submit(
+            bot.send_message,
+            message.chat.id,
+            messages.choose_money_transfer_recipient,
+            reply_markup=keyboard
+        )
+
+
+async def new_queue_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        locations = await db_adapter.get_all_active_locations_page(cursor=None, limit=page_size + 1)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
+        logger.debug(f"Player with tg_id {message.from_user.id} initiated new queue")
+        keyboard = keyboards.collection_page(
+            collection=[(f"{location.name} - {queue}", location.id) for location, queue in locations],
+            collection_name='new_queue_locations',
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel,
+        )
+        await bot.set_state(message.from_user.id, PlayerStates.choose_new_queue_location, message.chat.id)
+        outbound.submit(bot.send_message, message.chat.id, messages.choose_new_queue_location, reply_markup=keyboard)
+
+
+async def my_queue_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        position = await db_adapter.get_queue_position_by_player_tg_id(message.from_user.id)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if position is None:
+            logger.debug("Player is not in queue, when trying to get his queue info")
+            outbound.submit(bot.send_message, message.chat.id, messages.player_not_in_queue_error)
+        else:
+            text = messages.player_queue_location.format(position.location_name, position.position + 1, position.size)
+            if position.eta is not None:
+                text += '\n' + messages.player_queue_eta.format(math.ceil(position.eta / 60))
+            outbound.submit(bot.send_message, message.chat.id, text)
+
+
+async def leave_queue_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        queue_notifier: AsyncQueueNotifier,
+        **kwargs):
+    try:
+        # read before the entry is deleted, the not called players behind the position are notified
+        position = await db_adapter.get_queue_waiting_position_by_player_tg_id(message.from_user.id)
+        queue_entry_deleted = await db_adapter.delete_queue_entry_by_player_tg_id(message.from_user.id)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if queue_entry_deleted is False:
+            logger.debug("Player is not in queue, when trying to leave it")
+            outbound.submit(bot.send_message, message.chat.id, messages.player_not_in_queue_error)
+        else:
+            logger.debug(f"Player with tg_id {message.from_user.id} left queue")
+            outbound.submit(bot.send_message, message.chat.id, messages.player_left_queue)
+            await queue_notifier.forget(message.chat.id)
+            if position is not None:
+                location_id, location_name, ahead = position
+                await queue_notifier.queue_moved(
+                    bot,
+                    db_adapter,
+                    outbound,
+                    messages,
+                    location_id,
+                    location_name,
+                    ahead
+                )
+
+
+def register_handlers(bot: AsyncTeleBot, buttons: ButtonsConfig):
+    bot.register_message_handler(
+        my_balance_handler,
+        text_equals=buttons.my_balance,
+        state=PlayerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        transfer_money_handler,
+        text_equals=buttons.transfer_money,
+        state=PlayerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        new_queue_handler,
+        text_equals=buttons.new_queue,
+        state=PlayerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        my_queue_handler,
+        text_equals=buttons.my_queue,
+        state=PlayerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        leave_queue_handler,
+        text_equals=buttons.leave_queue,
+        state=PlayerStates().state_list,
+        pass_bot=True
+    )
@@ -0,0 +1,158 @@
+from logging import Logger
+
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import CallbackQuery
+
+from fair.config import MessagesConfig, ButtonsConfig
+from fair.db import AsyncDBAdapter, DBError
+from fair.utils import dummy_true
+
+from fair.bot import keyboards
+from fair.bot.outbound import AsyncOutboundDispatcher
+from fair.bot.api_queue import AsyncApiQueue
+from fair.bot.states import PlayerStates
+
+
+# Player queue flow
+
+# User is to come here after pressing the text button "New queue" in the main menu
+
+# 1. If the user presses the button "New queue",
+#    show the list of all available locations
+#    as inline buttons with the name and a number of people in the corresponding queues.
+#    1.1 If the user presses the button with the name of the location, add him to the queue of this location,
+#        then he is to be redirected to the main menu.
+# 2. If the user presses the button "My queue",
+#    show the location where the user is in the queue, then he is to be redirected to the main menu.
+# 3. If the user presses the button "Leave the queue", delete his queue, then he is to be redirected to the main menu.
+
+
+async def new_queue_location_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        api_queue: AsyncApiQueue,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    location_id = int(call.data.split("#")[1])
+    try:
+        queue_entry_added = await db_adapter.add_queue_entry_by_player_tg_id(call.from_user.id, location_id)
+    except DBError as e:
+        logger.error(f"{e}")
+        api_queue.submit(bot.answer_callback_query, call.id, messages.unknown_error)
+        return
+    else:
+        if queue_entry_added is False:
+            logger.debug(f"Player {call.from_user.id} is already in the queue of location {location_id}")
+            outbound.submit(bot.send_message, call.message.chat.id, messages.queue_entry_already_exists_error)
+            return
+        else:
+            logger.debug(f"Player {call.from_user.id} was added to the queue of location {location_id}")
+            await bot.set_state(call.message.from_user.id, PlayerStates.main_menu, call.message.chat.id)
+            outbound.submit(
+                bot.edit_message_reply_markup,
+                call.message.chat.id,
+                call.message.id,
+                reply_markup=keyboards.empty_inline()
+            )
+            keyboard = keyboards.player_queue_menu(
+                my_queue_btn=buttons.my_queue,
+                leave_the_queue_btn=buttons.leave_queue,
+                my_balance_btn=buttons.my_balance,
+                transfer_money_btn=buttons.transfer_money,
+                help_btn=buttons.help
+            )
+            outbound.submit(bot.send_message, call.message.chat.id, messages.queue_entry_added, reply_markup=keyboard)
+
+
+async def new_queue_locations_page_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        page_size: int,
+        api_queue: AsyncApiQueue,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    cursor, backward = keyboards.parse_page_cursor(call.data)
+    try:
+        locations = await db_adapter.get_all_active_locations_page(
+            cursor=cursor,
+            limit=page_size + 1,
+            backward=backward
+        )
+    except DBError as e:
+        logger.error(f"{e}")
+        api_queue.submit(bot.answer_callback_query, call.id, messages.unknown_error)
+        return
+    else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
+        logger.debug(f"Player {call.from_user.id} is viewing locations list, cursor {cursor}")
+        keyboard = keyboards.collection_page(
+            collection=[(f"{location.name} - {queue}", location.id) for location, queue in locations],
+            collection_name="new_queue_locations",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(
+            bot.edit_message_reply_markup,
+            chat_id=call.message.chat.id,
+            message_id=call.message.id,
+            reply_markup=keyboard
+        )
+
+
+async def new_queue_location_cancel_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    logger.debug(f"Player {call.from_user.id} cancelled choosing new queue location")
+    await bot.set_state(call.message.from_user.id, PlayerStates.main_menu, call.message.chat.id)
+    outbound.submit(
+        bot.edit_message_text,
+        text=messages.new_queue_location_cancelled,
+        chat_id=call.message.chat.id,
+        message_id=call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+
+
+def register_handlers(bot: AsyncTeleBot):
+    bot.register_callback_query_handler(
+        new_queue_location_handler,
+        func=dummy_true,
+        cb_data_pagination="new_queue_locations",
+        state=PlayerStates.choose_new_queue_location,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        new_queue_locations_page_handler,
+        func=dummy_true,
+        cb_data_pagination="new_queue_locations_page",
+        state=PlayerStates.choose_new_queue_location,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        new_queue_location_cancel_handler,
+        func=dummy_true,
+        cb_data="new_queue_locations_cancel",
+        state=PlayerStates.choose_new_queue_location,
+        pass_bot=True
+    )
@@ -0,0 +1,127 @@
+import string
+from logging import Logger
+
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import Message, CallbackQuery
+
+from fair.config import MessagesConfig, ButtonsConfig
+from fair.db import AsyncDBAdapter, DBError
+from fair.utils import dummy_true, ru_letters
+
+from fair.bot import keyboards
+from fair.bot.outbound import AsyncOutboundDispatcher
+from fair.bot.states import UnregisteredStates, PlayerStates
+
+
+# Registration without a password
+
+# User is to come here after a start command and pressing the inline button "Register as a player"
+# with the "reg_player" callback_data
+
+# 1 ask for a name, finish registration
+
+
+async def reg_player_handler(
+        call: CallbackQuery,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.message_id,
+        reply_markup=keyboards.empty_inline()
+    )
+    await bot.set_state(call.from_user.id, UnregisteredStates.reg_player_name, call.message.chat.id)
+    outbound.submit(bot.send_message, call.message.chat.id, messages.get_player_name)
+
+
+async def invalid_player_name_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    outbound.submit(bot.send_message, message.chat.id, messages.invalid_player_name)
+
+
+async def player_name_handler(
+        message: Message,
+        bot: AsyncTeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: AsyncDBAdapter,
+        logger: Logger,
+        outbound: AsyncOutboundDispatcher,
+        **kwargs):
+    try:
+        name_available = await db_adapter.check_player_name_availability(message.text)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if name_available is False:
+            logger.debug(f"Player name already exists: {message.text}")
+            outbound.submit(bot.send_message, message.chat.id, messages.player_name_already_taken)
+            return
+    try:
+        user_added = await db_adapter.add_user("player", message.from_user.id)  # add User
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if user_added is False:
+            logger.error(
+                f"Constraints violation while adding user:"
+                f" {message.from_user.id}, {message.text}"
+            )
+            outbound.submit(bot.send_message, message.chat.id, messages.add_player_error)
+            return
+        else:
+            logger.debug(f"User added: {message.from_user.id}, {message.text}")
+    try:
+        player_added = await db_adapter.add_player(message.from_user.id, message.text)  # add Player
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if player_added is False:
+            logger.error(
+                f"Constraints violation while adding player:"
+                f" {message.from_user.id}, {message.text}"
+            )
+            await bot.delete_state(message.from_user.id, message.chat.id)
+            outbound.submit(bot.send_message, message.chat.id, messages.add_player_error)
+        else:
+            logger.debug(f"Player added: {message.from_user.id}")
+            await bot.set_state(message.from_user.id, PlayerStates.main_menu, message.chat.id)
+            outbound.submit(
+                bot.send_message,
+                message.chat.id,
+                messages.player_registered,
+                reply_markup=keyboards.player_main_menu(
+                    buttons.new_queue,
+                    buttons.my_balance,
+                    buttons.transfer_money,
+                    buttons.help
+                )
+            )
+
+
+def register_handlers(bot: AsyncTeleBot):
+    bot.register_callback_query_handler(reg_player_handler, func=dummy_true, cb_data="reg_player", pass_bot=True)
+    bot.register_message_handler(
+        player_name_handler,
+        allowed_chars=string.ascii_letters + string.digits + ru_letters + " -_\"\'",
+        state=UnregisteredStates.reg_player_name,
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        invalid_player_name_handler,
+        state=UnregisteredStates.reg_player_name,
+        pass_bot=True
+    )
@@ -0,0 +1,45 @@
+import logging
+
+from telebot.async_telebot import AsyncTeleBot
+
+from fair.db import AsyncDBAdapter
+from fair.config import MessagesConfig, ButtonsConfig
+from fair.utils import LRUCache
+
+from fair.bot.api_queue import AsyncApiQueue
+from fair.bot.outbound import AsyncOutboundDispatcher
+from fair.bot.queue_notifier import AsyncQueueNotifier
+from fair.bot.rate_limiter import AsyncMemoryRateLimiter, AsyncRedisRateLimiter
+
+from fair.bot.asyncio_middlewares.message_antiflood import MessageAntiFloodMiddleware
+from fair.bot.asyncio_middlewares.callback_query_antiflood import CallbackQueryAntiFloodMiddleware
+from fair.bot.asyncio_middlewares.extra_arguments import ExtraArgumentsMiddleware
+
+
+def setup_middlewares(
+        bot: AsyncTeleBot,
+        timeout_message: str,
+        limiter: AsyncMemoryRateLimiter | AsyncRedisRateLimiter,
+        db_adapter: AsyncDBAdapter,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        logger: logging.Logger,
+        page_size: int,
+        inline_cache: LRUCache,
+        api_queue: AsyncApiQueue,
+        outbound: AsyncOutboundDispatcher,
+        queue_notifier: AsyncQueueNotifier):
+    # setup all middlewares here
+    bot.setup_middleware(MessageAntiFloodMiddleware(bot, timeout_message, limiter, outbound))
+    bot.setup_middleware(CallbackQueryAntiFloodMiddleware(bot, timeout_message, limiter, api_queue))
+    bot.setup_middleware(ExtraArgumentsMiddleware(
+        db_adapter,
+        messages,
+        buttons,
+        logger,
+        page_size,
+        inline_cache,
+        api_queue,
+        outbound,
+        queue_notifier
+    ))
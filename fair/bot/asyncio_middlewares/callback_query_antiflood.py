@@ -0,0 +1,33 @@
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import CallbackQuery
+from telebot.asyncio_handler_backends import BaseMiddleware, CancelUpdate
+
+from fair.bot.api_queue import AsyncApiQueue
+from fair.bot.rate_limiter import AsyncMemoryRateLimiter, AsyncRedisRateLimiter
+
+
+class CallbackQueryAntiFloodMiddleware(BaseMiddleware):
+    def __init__(
+            self,
+            bot: AsyncTeleBot,
+            timeout_message: str,
+            limiter: AsyncMemoryRateLimiter | AsyncRedisRateLimiter,
+            api_queue: AsyncApiQueue):
+        super().__init__()
+        self.bot = bot
+        self.timeout_message = timeout_message
+        self.limiter = limiter
+        self.api_queue = api_queue
+        self.update_types = ['callback_query']
+
+    # argument naming is kept from the base class to avoid possible errors if passed as kwargs
+    async def pre_process(self, message: CallbackQuery, data: dict):
+        if not await self.limiter.hit(f'callback_query:{message.from_user.id}'):
+            self.api_queue.submit(self.bot.answer_callback_query, message.id, self.timeout_message, show_alert=True)
+            return CancelUpdate()
+        # always answer callback query, the handler doesn't wait for it
+        self.api_queue.submit(self.bot.answer_callback_query, message.id)
+
+    # argument naming is kept from the base class to avoid possible errors if passed as kwargs
+    async def post_process(self, message: CallbackQuery, data: dict, exception: BaseException):
+        pass
@@ -0,0 +1,51 @@
+import logging
+
+from telebot.asyncio_handler_backends import BaseMiddleware
+
+from fair.config import MessagesConfig, ButtonsConfig
+from fair.utils import LRUCache
+
+from fair.bot.api_queue import AsyncApiQueue
+from fair.bot.outbound import AsyncOutboundDispatcher
+from fair.bot.queue_notifier import AsyncQueueNotifier
+from fair.db import AsyncDBAdapter
+
+
+class ExtraArgumentsMiddleware(BaseMiddleware):
+    def __init__(
+            self,
+            db_adapter: AsyncDBAdapter,
+            messages: MessagesConfig,
+            buttons: ButtonsConfig,
+            logger: logging.Logger,
+            page_size: int,
+            inline_cache: LRUCache,
+            api_queue: AsyncApiQueue,
+            outbound: AsyncOutboundDispatcher,
+            queue_notifier: AsyncQueueNotifier):
+        super().__init__()
+        self.db_adapter = db_adapter
+        self.messages = messages
+        self.buttons = buttons
+        self.logger = logger
+        self.page_size = page_size
+        self.inline_cache = inline_cache
+        self.api_queue = api_queue
+        self.outbound = outbound
+        self.queue_notifier = queue_notifier
+        self.update_types = ['message', 'callback_query', 'inline_query']
+
+    async def pre_process(self, message, data: dict):
+        # passing extra arguments to handlers
+        data['db_adapter'] = self.db_adapter
+        data['messages'] = self.messages
+        data['buttons'] = self.buttons
+        data['logger'] = self.logger
+        data['page_size'] = self.page_size
+        data['inline_cache'] = self.inline_cache
+        data['api_queue'] = self.api_queue
+        data['outbound'] = self.outbound
+        data['queue_notifier'] = self.queue_notifier
+
+    async def post_process(self, message, data: dict, exception: BaseException):
+        pass
@@ -0,0 +1,29 @@
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import Message
+from telebot.asyncio_handler_backends import BaseMiddleware, CancelUpdate
+
+from fair.bot.outbound import AsyncOutboundDispatcher, Priority
+from fair.bot.rate_limiter import AsyncMemoryRateLimiter, AsyncRedisRateLimiter
+
+
+class MessageAntiFloodMiddleware(BaseMiddleware):
+    def __init__(
+            self,
+            bot: AsyncTeleBot,
+            timeout_message: str,
+            limiter: AsyncMemoryRateLimiter | AsyncRedisRateLimiter,
+            outbound: AsyncOutboundDispatcher):
+        super().__init__()
+        self.bot = bot
+        self.timeout_message = timeout_message
+        self.limiter = limiter
+        self.outbound = outbound
+        self.update_types = ['message']
+
+    async def pre_process(self, message: Message, data: dict):
+        if not await self.limiter.hit(f'message:{message.from_user.id}'):
+            self.outbound.submit(self.bot.send_message, message.chat.id, self.timeout_message, priority=Priority.LOW)
+            return CancelUpdate()
+
+    async def post_process(self, message: Message, data: dict, exception: BaseException):
+        pass
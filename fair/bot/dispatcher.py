@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+
+from telebot.types import Update
+
+from fair.config import BotConfig, BotDispatcherConfig
+
+from fair.bot.router import AsyncRoutedTeleBot, RoutedTeleBot
+
+
+# Update dispatcher shards the updates by the user id onto the worker queues,
+# thus the updates of a user are handled one by one in order, while the different users are handled in parallel.
+# Queues are bounded: webhook is told about a full shard and responds with an error, Telegram redelivers the update
+# later; polling waits for the free space, thus the next updates are not requested meanwhile
+
+
+def uses_dispatcher(bot_config: BotConfig) -> bool:
+    return bot_config.dispatcher is not None or (bot_config.use_webhook and bot_config.webhook.fast_ack)
+
+
+def get_user_id(raw_update: dict) -> Optional[int]:
+    # raw update holds update_id and a single object, e.g. message or callback_query
+    for key, value in raw_update.items():
+        if key == 'update_id' or not isinstance(value, dict):
+            continue
+        user = value.get('from') or value.get('user')
+        if user is not None:
+            return user['id']
+        chat = value.get('chat')
+        if chat is not None:
+            return chat['id']
+    return None
+
+
+def get_update_user_id(update: Update) -> Optional[int]:
+    # parsed counterpart of get_user_id, unset update fields are None
+    for value in vars(update).values():
+        if value is None or isinstance(value, int):
+            continue
+        user = getattr(value, 'from_user', None) or getattr(value, 'user', None)
+        if user is not None:
+            return user.id
+        chat = getattr(value, 'chat', None)
+        if chat is not None:
+            return chat.id
+    return None
+
+
+class DispatchedTeleBot(RoutedTeleBot):
+    # polled updates are handed over to the dispatcher, its workers handle them via handle_updates
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.update_dispatcher: Optional[UpdateDispatcher] = None
+
+    def process_new_updates(self, updates: list[Update]):
+        if self.update_dispatcher is None:
+            self.handle_updates(updates)
+            return
+        for update in updates:
+            self.update_dispatcher.submit_update(update)
+
+    def handle_updates(self, updates: list[Update]):
+        super().process_new_updates(updates)
+
+
+class AsyncDispatchedTeleBot(AsyncRoutedTeleBot):
+    # asyncio counterpart of the DispatchedTeleBot
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.update_dispatcher: Optional[AsyncUpdateDispatcher] = None
+
+    async def process_new_updates(self, updates: list[Update]):
+        if self.update_dispatcher is None:
+            await self.handle_updates(updates)
+            return
+        for update in updates:
+            await self.update_dispatcher.submit_update(update)
+
+    async def handle_updates(self, updates: list[Update]):
+        await super().process_new_updates(updates)
+
+
+class BaseUpdateDispatcher:
+    # shard queues of the workers, created by the subclasses
+    _queues: list[queue.Queue] | list[asyncio.Queue]
+
+    def __init__(self, logger: logging.Logger, config: BotDispatcherConfig):
+        self.logger = logger
+        self.workers = config.workers
+        self.queue_size = config.queue_size
+        self.submitted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _shard(self, update: dict | Update) -> int:
+        if isinstance(update, dict):
+            user_id, update_id = get_user_id(update), update['update_id']
+        else:
+            user_id, update_id = get_update_user_id(update), update.update_id
+        return (user_id if user_id is not None else update_id) % self.workers
+
+    def _submitted(self, shard_size: int):
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, shard_size)
+
+    def _record(self, latency: float, failed: bool):
+        with self._stats_lock:
+            self.processed += 1
+            self.failed += failed
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+
+    def _depths(self) -> list[int]:
+        return [shard.qsize() for shard in self._queues]
+
+    def get_stats(self) -> dict:
+        depths = self._depths()
+        with self._stats_lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'depths': depths,
+                'pending': sum(depths),
+                'max_depth': self.max_depth,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'processed': self.processed,
+                'failed': self.failed,
+                # latency is measured from the submission, thus it includes the time spent in the queue
+                'avg_latency': self._total_latency / self.processed if self.processed else 0.0,
+                'max_latency': self._max_latency,
+            }
+
+
+class UpdateDispatcher(BaseUpdateDispatcher):
+    # bot has to be created with threaded=False, as the handlers are run by the dispatcher's threads
+
+    def __init__(self, bot: DispatchedTeleBot, logger: logging.Logger, config: BotDispatcherConfig):
+        super().__init__(logger, config)
+        self.bot = bot
+        bot.update_dispatcher = self
+        self._queues = [queue.Queue(config.queue_size) for _ in range(config.workers)]
+        self._threads: list[threading.Thread] = []
+
+    def submit(self, raw_update: dict) -> bool:
+        # returns False if the shard is full and the update is not accepted
+        shard = self._queues[self._shard(raw_update)]
+        try:
+            shard.put_nowait((raw_update, time.monotonic()))
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self._submitted(shard.qsize())
+        return True
+
+    def submit_update(self, update: Update):
+        # waits for the free space in the shard
+        shard = self._queues[self._shard(update)]
+        shard.put((update, time.monotonic()))
+        self._submitted(shard.qsize())
+
+    def _worker(self, shard: queue.Queue):
+        while True:
+            item = shard.get()
+            if item is None:
+                return
+            update, submitted_at = item
+            failed = False
+            try:
+                self.bot.handle_updates([Update.de_json(update) if isinstance(update, dict) else update])
+            except Exception as e:
+                failed = True
+                self.logger.exception(e)
+            self._record(time.monotonic() - submitted_at, failed)
+
+    def start(self):
+        for i, shard in enumerate(self._queues):
+            thread = threading.Thread(target=self._worker, args=(shard,), name=f'UpdateWorker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = 5):
+        # pending updates are handled before the workers stop
+        for shard in self._queues:
+            shard.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+
+class AsyncUpdateDispatcher(BaseUpdateDispatcher):
+    # asyncio counterpart of the UpdateDispatcher, handle_updates returns once the update is handled
+
+    def __init__(self, bot: AsyncDispatchedTeleBot, logger: logging.Logger, config: BotDispatcherConfig):
+        super().__init__(logger, config)
+        self.bot = bot
+        bot.update_dispatcher = self
+        self._queues = [asyncio.Queue(config.queue_size) for _ in range(config.workers)]
+        self._tasks: list[asyncio.Task] = []
+
+    def submit(self, raw_update: dict) -> bool:
+        # returns False if the shard is full and the update is not accepted
+        shard = self._queues[self._shard(raw_update)]
+        try:
+            shard.put_nowait((raw_update, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self._submitted(shard.qsize())
+        return True
+
+    async def submit_update(self, update: Update):
+        # waits for the free space in the shard
+        shard = self._queues[self._shard(update)]
+        await shard.put((update, time.monotonic()))
+        self._submitted(shard.qsize())
+
+    async def _worker(self, shard: asyncio.Queue):
+        while True:
+            item = await shard.get()
+            if item is None:
+                return
+            update, submitted_at = item
+            failed = False
+            try:
+                await self.bot.handle_updates([Update.de_json(update) if isinstance(update, dict) else update])
+            except Exception as e:
+                failed = True
+                self.logger.exception(e)
+            self._record(time.monotonic() - submitted_at, failed)
+
+    def start(self):
+        # must be called from the running event loop
+        for shard in self._queues:
+            self._tasks.append(asyncio.create_task(self._worker(shard)))
+
+    async def stop(self, timeout: Optional[float] = 5):
+        # pending updates are handled before the workers stop
+        if not self._tasks:
+            return
+        for shard in self._queues:
+            await shard.put(None)
+        await asyncio.wait(self._tasks, timeout=timeout)
+        self._tasks.clear()
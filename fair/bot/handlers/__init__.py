@@ -11,6 +11,7 @@ from fair.bot.handlers import (
     money_transfer_flow,
     manager_permanent_menu,
     manager_location_flow,
+    inline_query_flow,
 )
 
 
@@ -24,3 +25,4 @@ def register_handlers(bot: TeleBot, buttons: ButtonsConfig):
     money_transfer_flow.register_handlers(bot)
     manager_permanent_menu.register_handlers(bot, buttons)
     manager_location_flow.register_handlers(bot)
+    inline_query_flow.register_handlers(bot)
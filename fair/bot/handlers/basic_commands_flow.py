@@ -8,6 +8,7 @@ from fair.db import DBAdapter, DBError
 from fair.utils import dummy_true
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher, Priority
 from fair.bot.states import UnregisteredStates, PlayerStates, ManagerStates
 
 
@@ -24,13 +25,14 @@ def start_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     bot.set_state(message.from_user.id, UnregisteredStates.started, message.chat.id)
     try:
         tg_account = db_adapter.get_telegram_account(message.from_user.id)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if tg_account is None:
@@ -42,7 +44,7 @@ def start_handler(
                 )
             except DBError as e:
                 logger.error(e)
-                bot.send_message(message.chat.id, messages.unknown_error)
+                outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
                 return
             else:
                 if tg_account_added is False:
@@ -50,14 +52,15 @@ def start_handler(
                         f'Constraints violation while adding telegram account:'
                         f' {message.from_user.id}, {message.chat.id}, {message.from_user.username}'
                     )
-                    bot.send_message(message.chat.id, messages.add_tg_account_error)
+                    outbound.submit(bot.send_message, message.chat.id, messages.add_tg_account_error)
                     return
                 else:
                     logger.debug(
                         f'Telegram account added:'
                         f' {message.from_user.id}, {message.chat.id}, {message.from_user.username}'
                     )
-        bot.send_message(
+        outbound.submit(
+            bot.send_message,
             message.chat.id, messages.welcome,
             reply_markup=keyboards.reg_buttons(buttons.reg_player, buttons.reg_manager, buttons.help)
         )
@@ -68,10 +71,13 @@ def unregistered_help_button_handler(
         bot: TeleBot,
         messages: MessagesConfig,
         buttons: ButtonsConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.send_message(
+    outbound.submit(
+        bot.send_message,
         call.message.chat.id, messages.unregistered_help,
-        reply_markup=keyboards.reg_buttons(buttons.reg_player, buttons.reg_manager, buttons.help)
+        reply_markup=keyboards.reg_buttons(buttons.reg_player, buttons.reg_manager, buttons.help),
+        priority=Priority.LOW
     )
 
 
@@ -80,10 +86,13 @@ def unregistered_help_handler(
         bot: TeleBot,
         messages: MessagesConfig,
         buttons: ButtonsConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.send_message(
+    outbound.submit(
+        bot.send_message,
         message.chat.id, messages.unregistered_help,
-        reply_markup=keyboards.reg_buttons(buttons.reg_player, buttons.reg_manager, buttons.help)
+        reply_markup=keyboards.reg_buttons(buttons.reg_player, buttons.reg_manager, buttons.help),
+        priority=Priority.LOW
     )
 
 
@@ -91,24 +100,27 @@ def player_help_handler(
         message: Message,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.send_message(message.chat.id, messages.player_help)
+    outbound.submit(bot.send_message, message.chat.id, messages.player_help, priority=Priority.LOW)
 
 
 def manager_help_handler(
         message: Message,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.send_message(message.chat.id, messages.manager_help)
+    outbound.submit(bot.send_message, message.chat.id, messages.manager_help, priority=Priority.LOW)
 
 
 def owner_help_handler(
         message: Message,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.send_message(message.chat.id, messages.owner_help)
+    outbound.submit(bot.send_message, message.chat.id, messages.owner_help, priority=Priority.LOW)
 
 
 def register_handlers(bot: TeleBot, buttons: ButtonsConfig):
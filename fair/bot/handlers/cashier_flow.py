@@ -4,6 +4,7 @@ from telebot import TeleBot
 from telebot.types import Message
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher, Priority
 from fair.config import MessagesConfig, ButtonsConfig
 from fair.db import DBAdapter, DBError
 
@@ -24,6 +25,7 @@ def purchase_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     with bot.retrieve_data(message.from_user.id, message.chat.id) as data:
         current_player_id = data.get("current_player_id", None)
@@ -32,7 +34,7 @@ def purchase_handler(
             manager = db_adapter.get_manager_by_tg_id(message.from_user.id)
         except DBError as e:
             logger.error(e)
-            bot.send_message(message.chat.id, messages.unknown_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
             return
         else:
             keyboard = keyboards.manager_on_location_menu(
@@ -48,18 +50,34 @@ def purchase_handler(
                         balance_status = db_adapter.purchase_by_player_id(current_player_id, manager.id, amount)
                     except DBError as e:
                         logger.error(e)
-                        bot.send_message(message.chat.id, messages.unknown_error)
+                        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
                         return
                     else:
                         if balance_status:
-                            bot.send_message(message.chat.id, messages.purchase_successful, reply_markup=keyboard)
+                            outbound.submit(
+                                bot.send_message,
+                                message.chat.id,
+                                messages.purchase_successful,
+                                reply_markup=keyboard,
+                                priority=Priority.HIGH
+                            )
                             bot.set_state(message.from_user.id, ManagerStates.main_menu, message.chat.id)
                         else:
-                            bot.send_message(message.chat.id, messages.bad_player_balance_error, reply_markup=keyboard)
+                            outbound.submit(
+                                bot.send_message,
+                                message.chat.id,
+                                messages.bad_player_balance_error,
+                                reply_markup=keyboard
+                            )
                 else:
-                    bot.send_message(message.chat.id, messages.bad_chosen_player_error, reply_markup=keyboard)
+                    outbound.submit(
+                        bot.send_message,
+                        message.chat.id,
+                        messages.bad_chosen_player_error,
+                        reply_markup=keyboard
+                    )
             else:
-                bot.send_message(message.chat.id, messages.bad_manager_error, reply_markup=keyboard)
+                outbound.submit(bot.send_message, message.chat.id, messages.bad_manager_error, reply_markup=keyboard)
 
 
 def register_handlers(bot: TeleBot):
@@ -0,0 +1,79 @@
+from logging import Logger
+
+from telebot import TeleBot
+from telebot.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+
+from fair.config import MessagesConfig
+from fair.db import DBAdapter, DBError
+from fair.utils import dummy_true, LRUCache
+
+
+# Inline mode (@bot <name prefix>) lookup of the players and locations,
+# results are cached by the query both in-process and by Telegram (cache_time) and paged via next_offset
+
+INLINE_QUERY_MAX_RESULTS = 100  # players and locations each
+INLINE_QUERY_PAGE_SIZE = 50  # Telegram allows at most 50 results per answer
+
+
+def build_inline_results(
+        messages: MessagesConfig,
+        locations: list,
+        players: list) -> list[InlineQueryResultArticle]:
+    results = []
+    for location, queue_size in locations:
+        results.append(InlineQueryResultArticle(
+            id=f"l{location.id}",
+            title=location.name,
+            input_message_content=InputTextMessageContent(location.name),
+            description=messages.inline_location_description.format(queue_size)
+        ))
+    for player in players:
+        results.append(InlineQueryResultArticle(
+            id=f"p{player.id}",
+            title=player.name,
+            input_message_content=InputTextMessageContent(player.name)
+        ))
+    return results
+
+
+def inline_query_handler(
+        inline_query: InlineQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        inline_cache: LRUCache,
+        **kwargs):
+    query = inline_query.query.strip().lower()
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    try:
+        if db_adapter.get_identity(inline_query.from_user.id) is None:
+            # only registered users can look the players up
+            bot.answer_inline_query(inline_query.id, [], cache_time=inline_cache.ttl, is_personal=True)
+            return
+        results = inline_cache.get(query)
+        if results is None:
+            locations = db_adapter.search_locations_by_name(query, INLINE_QUERY_MAX_RESULTS)
+            players = db_adapter.search_players_by_name(query, INLINE_QUERY_MAX_RESULTS)
+            results = build_inline_results(messages, locations, players)
+            inline_cache.set(query, results)
+    except DBError as e:
+        logger.error(e)
+        return
+    page = results[offset:offset + INLINE_QUERY_PAGE_SIZE]
+    next_offset = offset + INLINE_QUERY_PAGE_SIZE
+    bot.answer_inline_query(
+        inline_query.id,
+        page,
+        cache_time=inline_cache.ttl,
+        is_personal=True,
+        next_offset=str(next_offset) if next_offset < len(results) else ''
+    )
+
+
+def register_handlers(bot: TeleBot):
+    bot.register_inline_handler(
+        inline_query_handler,
+        func=dummy_true,
+        pass_bot=True
+    )
@@ -1,13 +1,16 @@
 from logging import Logger
+from typing import Optional
 
 from telebot import TeleBot
-from telebot.types import CallbackQuery
+from telebot.types import CallbackQuery, Message
 
 from fair.config import MessagesConfig, ButtonsConfig
 from fair.db import DBAdapter, DBError
 from fair.utils import dummy_true
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher, Priority
+from fair.bot.queue_notifier import QueueNotifier
 from fair.bot.states import ManagerStates
 
 
@@ -19,36 +22,45 @@ def choose_location_page_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
-    page_idx = int(call.data.split('#')[1])
+    cursor, backward = keyboards.parse_page_cursor(call.data)
     try:
-        locations = db_adapter.get_all_locations(offset=page_idx * page_size, limit=page_size)
-        locations_cnt = db_adapter.get_all_locations_count()
+        locations = db_adapter.get_all_locations_page(cursor=cursor, limit=page_size + 1, backward=backward)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.from_user.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
         return
     else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
         collection = list((f"{location.name} - {queue}", location.id) for location, queue in locations)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="choose_locations",
-            page_idx=page_idx,
-            page_cnt=round(locations_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel,
         )
-        bot.edit_message_reply_markup(call.message.chat.id, call.message.id, reply_markup=keyboard)
+        outbound.submit(bot.edit_message_reply_markup, call.message.chat.id, call.message.id, reply_markup=keyboard)
 
 
 def choose_location_cancel_handler(
         call: CallbackQuery,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
     bot.set_state(call.from_user.id, ManagerStates.main_menu, call.message.chat.id)
-    bot.edit_message_text(
+    outbound.submit(
+        bot.edit_message_text,
         text=messages.choose_location_cancelled,
         chat_id=call.message.chat.id,
         message_id=call.message.id,
@@ -63,6 +75,7 @@ def chosen_location_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     location_id = int(call.data.split('#')[1])
     try:
@@ -72,14 +85,15 @@ def chosen_location_handler(
             manager_location_updated = db_adapter.update_manager_location_by_tg_id(call.from_user.id, location_id)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.from_user.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
         return
     else:
         if manager_location_updated is False:
-            bot.send_message(call.from_user.id, messages.bad_location_error)
+            outbound.submit(bot.send_message, call.from_user.id, messages.bad_location_error)
         else:
             bot.set_state(call.from_user.id, ManagerStates.main_menu, call.message.chat.id)
-            bot.send_message(
+            outbound.submit(
+                bot.send_message,
                 call.from_user.id,
                 messages.location_updated,
                 reply_markup=keyboards.manager_on_location_menu(
@@ -89,12 +103,15 @@ def chosen_location_handler(
                     help_btn=buttons.help,
                 )
             )
-            bot.edit_message_text(
+            outbound.submit(
+                bot.edit_message_text,
                 text=messages.chosen_location.format(location.name),
                 chat_id=call.message.chat.id,
                 message_id=call.message.id,
                 reply_markup=keyboards.location_options(
                     my_location_queue_btn=buttons.my_location_queue,
+                    call_next_btn=buttons.call_next,
+                    select_players_btn=buttons.select_players,
                     pause_the_location_btn=buttons.my_location,
                 )
             )
@@ -108,26 +125,34 @@ def my_location_queue_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
-        players = db_adapter.get_queue_by_manager_tg_id(call.from_user.id, offset=0, limit=page_size)
-        players_cnt = db_adapter.get_queue_count_by_manager_tg_id(call.from_user.id)
+        players = db_adapter.get_queue_page_by_manager_tg_id(call.from_user.id, cursor=None, limit=page_size + 1)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.from_user.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
         return
     else:
-        collection = list((player.name, player.id) for player in players)
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda entry: (entry[1],)
+        )
+        collection = list((player.name, player.id) for player, _ in players)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="my_location_queue",
-            page_idx=0,
-            page_cnt=round(players_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel,
         )
-        bot.edit_message_text(
+        outbound.submit(
+            bot.edit_message_text,
             text=messages.my_location_queue,
             chat_id=call.message.chat.id,
             message_id=call.message.id,
@@ -143,27 +168,39 @@ def my_location_queue_page_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
-    page_idx = int(call.data.split('#')[1])
+    cursor, backward = keyboards.parse_page_cursor(call.data)
     try:
-        players = db_adapter.get_queue_by_manager_tg_id(call.from_user.id, offset=page_idx * page_size, limit=page_size)
-        players_cnt = db_adapter.get_queue_count_by_manager_tg_id(call.from_user.id)
+        players = db_adapter.get_queue_page_by_manager_tg_id(
+            call.from_user.id,
+            cursor=cursor[0],
+            limit=page_size + 1,
+            backward=backward
+        )
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.from_user.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
         return
     else:
-        collection = list((f"{player.id}", player.id) for player in players)
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda entry: (entry[1],)
+        )
+        collection = list((player.name, player.id) for player, _ in players)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="my_location_queue",
-            page_idx=page_idx,
-            page_cnt=round(players_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel,
         )
-        bot.edit_message_reply_markup(call.message.chat.id, call.message.id, reply_markup=keyboard)
+        outbound.submit(bot.edit_message_reply_markup, call.message.chat.id, call.message.id, reply_markup=keyboard)
 
 
 def my_location_queue_cancel_handler(
@@ -171,14 +208,18 @@ def my_location_queue_cancel_handler(
         bot: TeleBot,
         messages: MessagesConfig,
         buttons: ButtonsConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
     bot.set_state(call.from_user.id, ManagerStates.main_menu, call.message.chat.id)
-    bot.edit_message_text(
+    outbound.submit(
+        bot.edit_message_text,
         text=messages.my_location_queue_cancelled,
         chat_id=call.message.chat.id,
         message_id=call.message.id,
         reply_markup=keyboards.location_options(
             my_location_queue_btn=buttons.my_location_queue,
+            call_next_btn=buttons.call_next,
+            select_players_btn=buttons.select_players,
             pause_the_location_btn=buttons.my_location,
         )
     )
@@ -191,6 +232,7 @@ def my_location_queue_chosen_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         location = db_adapter.get_location_by_manager_tg_id(call.from_user.id)
@@ -199,24 +241,395 @@ def my_location_queue_chosen_handler(
             shop = db_adapter.get_shop_by_location_id(location.id)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.from_user.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
         return
     else:
         current_player_id = int(call.data.split('#')[1])
         bot.set_state(call.from_user.id, ManagerStates.location_player_chosen_options, call.message.chat.id)
         bot.add_data(call.from_user.id, call.message.chat.id, current_player_id=current_player_id)
-        bot.edit_message_text(
+        outbound.submit(
+            bot.edit_message_text,
             text=messages.location_player_chosen_options,
             chat_id=call.message.chat.id,
             message_id=call.message.id,
             reply_markup=keyboards.location_player_chosen_options(
                 my_location_queue_btn=buttons.my_location_queue,
+                call_player_btn=buttons.call_player,
                 reward_player_btn=buttons.reward_player if shop is not None else buttons.purchase,
                 pause_the_location_btn=buttons.my_location
             )
         )
 
 
+def send_player_called(
+        call: CallbackQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        outbound: OutboundDispatcher,
+        called: Optional[tuple[int, str, int, int, str, int]]):
+    if called is None:
+        outbound.submit(bot.send_message, call.from_user.id, messages.no_player_to_call_error)
+        return
+    _, player_name, player_chat_id, _, location_name, _ = called
+    outbound.submit(
+        bot.send_message,
+        player_chat_id,
+        messages.player_called.format(location_name),
+        priority=Priority.HIGH
+    )
+    outbound.submit(
+        bot.edit_message_text,
+        text=messages.manager_player_called.format(player_name),
+        chat_id=call.message.chat.id,
+        message_id=call.message.id,
+        reply_markup=keyboards.location_options(
+            my_location_queue_btn=buttons.my_location_queue,
+            call_next_btn=buttons.call_next,
+            select_players_btn=buttons.select_players,
+            pause_the_location_btn=buttons.pause_location,
+        )
+    )
+
+
+def call_player_handler(
+        call: CallbackQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        outbound: OutboundDispatcher,
+        queue_notifier: QueueNotifier,
+        **kwargs):
+    # the player chosen in the location queue is called out of turn
+    with bot.retrieve_data(call.from_user.id, call.message.chat.id) as data:
+        current_player_id = data.get("current_player_id")
+    try:
+        called = None
+        if current_player_id is not None:
+            called = db_adapter.call_queue_entry_by_manager_tg_id(call.from_user.id, current_player_id)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
+        return
+    else:
+        bot.set_state(call.from_user.id, ManagerStates.main_menu, call.message.chat.id)
+        send_player_called(call, bot, messages, buttons, outbound, called)
+        if called is not None:
+            # the not called players behind the called one move up in the queue
+            _, _, _, location_id, location_name, ahead = called
+            queue_notifier.queue_moved(
+                bot,
+                db_adapter,
+                outbound,
+                messages,
+                location_id,
+                location_name,
+                ahead
+            )
+
+
+def call_next_handler(
+        call: CallbackQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        outbound: OutboundDispatcher,
+        queue_notifier: QueueNotifier,
+        **kwargs):
+    # the first player in the location queue who is not called yet
+    try:
+        called = db_adapter.call_next_queue_entry_by_manager_tg_id(call.from_user.id)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
+        return
+    else:
+        send_player_called(call, bot, messages, buttons, outbound, called)
+        if called is not None:
+            # the not called players behind the called one move up in the queue
+            _, _, _, location_id, location_name, ahead = called
+            queue_notifier.queue_moved(
+                bot,
+                db_adapter,
+                outbound,
+                messages,
+                location_id,
+                location_name,
+                ahead
+            )
+
+
+def create_selected_players_keyboard(
+        db_adapter: DBAdapter,
+        buttons: ButtonsConfig,
+        tg_user_id: int,
+        page_size: int,
+        selected: frozenset[int],
+        cursor: Optional[tuple[int, ...]] = None,
+        backward: bool = False):
+    players = db_adapter.get_queue_page_by_manager_tg_id(
+        tg_user_id,
+        cursor=None if cursor is None else cursor[0],
+        limit=page_size + 1,
+        backward=backward
+    )
+    players, prev_cursor, next_cursor = keyboards.page_cursors(
+        page=players,
+        page_size=page_size,
+        cursor=cursor,
+        backward=backward,
+        key=lambda entry: (entry[1],)
+    )
+    keyboard = keyboards.multi_select_page(
+        collection=list((player.name, player.id) for player, _ in players),
+        selected=selected,
+        collection_name="selected_players",
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
+        prev_page_btn=buttons.prev_page,
+        next_page_btn=buttons.next_page,
+        cancel_btn=buttons.cancel,
+        done_btn=buttons.done,
+    )
+    return keyboard
+
+
+def select_players_handler(
+        call: CallbackQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    # a group of players from the location queue is rewarded or charged at once
+    try:
+        location = db_adapter.get_location_by_manager_tg_id(call.from_user.id)
+        shop = None
+        keyboard = None
+        if location is not None:
+            shop = db_adapter.get_shop_by_location_id(location.id)
+            keyboard = create_selected_players_keyboard(db_adapter, buttons, call.from_user.id, page_size, frozenset())
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
+        return
+    else:
+        if location is None:
+            outbound.submit(bot.send_message, call.from_user.id, messages.manager_not_on_location_error)
+            return
+        # players are charged at the locations with a shop and rewarded at the rest
+        if shop is not None:
+            bot.set_state(call.from_user.id, ManagerStates.select_purchase_recipients, call.message.chat.id)
+        else:
+            bot.set_state(call.from_user.id, ManagerStates.select_reward_recipients, call.message.chat.id)
+        bot.add_data(call.from_user.id, call.message.chat.id, selected_player_ids=[])
+        outbound.submit(
+            bot.edit_message_text,
+            text=messages.select_players,
+            chat_id=call.message.chat.id,
+            message_id=call.message.id,
+            reply_markup=keyboard
+        )
+
+
+def selected_players_page_handler(
+        call: CallbackQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    cursor, backward = keyboards.parse_page_cursor(call.data)
+    with bot.retrieve_data(call.from_user.id, call.message.chat.id) as data:
+        selected = frozenset(data.get("selected_player_ids") or ())
+    try:
+        keyboard = create_selected_players_keyboard(
+            db_adapter,
+            buttons,
+            call.from_user.id,
+            page_size,
+            selected,
+            cursor=cursor,
+            backward=backward
+        )
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
+        return
+    else:
+        outbound.submit(bot.edit_message_reply_markup, call.message.chat.id, call.message.id, reply_markup=keyboard)
+
+
+def selected_player_handler(
+        call: CallbackQuery,
+        bot: TeleBot,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    # the player is selected or deselected, the page is redrawn from the received keyboard without any query
+    player_id = int(call.data.split('#')[1])
+    with bot.retrieve_data(call.from_user.id, call.message.chat.id) as data:
+        selected_player_ids = data.setdefault("selected_player_ids", [])
+        is_selected = player_id not in selected_player_ids
+        if is_selected:
+            selected_player_ids.append(player_id)
+        else:
+            selected_player_ids.remove(player_id)
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.id,
+        reply_markup=keyboards.toggle_selected(call.message.reply_markup, call.data, is_selected)
+    )
+
+
+def selected_players_done_handler(
+        call: CallbackQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    with bot.retrieve_data(call.from_user.id, call.message.chat.id) as data:
+        selected_player_ids = data.get("selected_player_ids") or []
+    if len(selected_player_ids) == 0:
+        outbound.submit(bot.send_message, call.from_user.id, messages.no_players_selected_error)
+        return
+    state = bot.get_state(call.from_user.id, call.message.chat.id)
+    if state == ManagerStates.select_purchase_recipients.name:
+        bot.set_state(call.from_user.id, ManagerStates.choose_purchase_many_amount, call.message.chat.id)
+        msg = messages.choose_purchase_many_amount
+        keyboard = keyboards.purchase_amount(cancel_btn=buttons.cancel)
+    else:
+        bot.set_state(call.from_user.id, ManagerStates.choose_reward_many_amount, call.message.chat.id)
+        msg = messages.choose_reward_many_amount
+        keyboard = keyboards.reward_amount(cancel_btn=buttons.cancel)
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+    outbound.submit(bot.send_message, call.message.chat.id, msg.format(len(selected_player_ids)), reply_markup=keyboard)
+
+
+def selected_players_cancel_handler(
+        call: CallbackQuery,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    bot.set_state(call.from_user.id, ManagerStates.main_menu, call.message.chat.id)
+    outbound.submit(
+        bot.edit_message_text,
+        text=messages.select_players_cancelled,
+        chat_id=call.message.chat.id,
+        message_id=call.message.id,
+        reply_markup=keyboards.location_options(
+            my_location_queue_btn=buttons.my_location_queue,
+            call_next_btn=buttons.call_next,
+            select_players_btn=buttons.select_players,
+            pause_the_location_btn=buttons.pause_location,
+        )
+    )
+
+
+def reward_many_handler(
+        message: Message,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    # every selected player is rewarded by a single statement
+    with bot.retrieve_data(message.from_user.id, message.chat.id) as data:
+        selected_player_ids = data.get("selected_player_ids") or []
+    try:
+        manager = db_adapter.get_manager_by_tg_id(message.from_user.id)
+        rewarded = 0
+        if manager is not None:
+            rewarded = db_adapter.reward_by_player_ids(selected_player_ids, manager.id, int(message.text))
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        keyboard = keyboards.manager_on_location_menu(
+            choose_location_btn=buttons.my_location,
+            my_location_btn=buttons.my_location,
+            leave_the_location_btn=buttons.leave_location,
+            help_btn=buttons.help
+        )
+        if manager is None:
+            outbound.submit(bot.send_message, message.chat.id, messages.bad_manager_error, reply_markup=keyboard)
+        elif rewarded == 0:
+            outbound.submit(bot.send_message, message.chat.id, messages.bad_chosen_player_error, reply_markup=keyboard)
+        else:
+            bot.set_state(message.from_user.id, ManagerStates.main_menu, message.chat.id)
+            outbound.submit(
+                bot.send_message,
+                message.chat.id,
+                messages.reward_many_successful.format(rewarded, len(selected_player_ids)),
+                reply_markup=keyboard,
+                priority=Priority.HIGH
+            )
+
+
+def purchase_many_handler(
+        message: Message,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    # every selected player who can afford the purchase is charged by a single statement
+    with bot.retrieve_data(message.from_user.id, message.chat.id) as data:
+        selected_player_ids = data.get("selected_player_ids") or []
+    try:
+        manager = db_adapter.get_manager_by_tg_id(message.from_user.id)
+        purchased = 0
+        if manager is not None:
+            purchased = db_adapter.purchase_by_player_ids(selected_player_ids, manager.id, int(message.text))
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        keyboard = keyboards.manager_on_location_menu(
+            choose_location_btn=buttons.my_location,
+            my_location_btn=buttons.my_location,
+            leave_the_location_btn=buttons.leave_location,
+            help_btn=buttons.help
+        )
+        if manager is None:
+            outbound.submit(bot.send_message, message.chat.id, messages.bad_manager_error, reply_markup=keyboard)
+        elif purchased == 0:
+            outbound.submit(bot.send_message, message.chat.id, messages.bad_player_balance_error, reply_markup=keyboard)
+        else:
+            bot.set_state(message.from_user.id, ManagerStates.main_menu, message.chat.id)
+            outbound.submit(
+                bot.send_message,
+                message.chat.id,
+                messages.purchase_many_successful.format(purchased, len(selected_player_ids)),
+                reply_markup=keyboard,
+                priority=Priority.HIGH
+            )
+
+
 def pause_location_handler(
         call: CallbackQuery,
         bot: TeleBot,
@@ -224,18 +637,20 @@ def pause_location_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         location_paused = db_adapter.update_location_by_manager_tg_id(call.from_user.id, is_active=False)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.from_user.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
         return
     else:
         if location_paused is False:
-            bot.send_message(call.from_user.id, messages.pause_location_error)
+            outbound.submit(bot.send_message, call.from_user.id, messages.pause_location_error)
         else:
-            bot.edit_message_text(
+            outbound.submit(
+                bot.edit_message_text,
                 text=messages.location_paused,
                 chat_id=call.message.chat.id,
                 message_id=call.message.id,
@@ -250,23 +665,27 @@ def unpause_location_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         location_unpaused = db_adapter.update_location_by_manager_tg_id(call.from_user.id, is_active=True)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.from_user.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.from_user.id, messages.unknown_error)
         return
     else:
         if location_unpaused is False:
-            bot.send_message(call.from_user.id, messages.unpause_location_error)
+            outbound.submit(bot.send_message, call.from_user.id, messages.unpause_location_error)
         else:
-            bot.edit_message_text(
+            outbound.submit(
+                bot.edit_message_text,
                 text=messages.location_unpaused,
                 chat_id=call.message.chat.id,
                 message_id=call.message.id,
                 reply_markup=keyboards.location_options(
                     my_location_queue_btn=buttons.my_location_queue,
+                    call_next_btn=buttons.call_next,
+                    select_players_btn=buttons.select_players,
                     pause_the_location_btn=buttons.pause_location,
                 )
             )
@@ -322,6 +741,67 @@ def register_handlers(bot: TeleBot):
         state=ManagerStates().state_list,
         pass_bot=True
     )
+    bot.register_callback_query_handler(
+        call_player_handler,
+        func=dummy_true,
+        cb_data="call_player",
+        state=ManagerStates.location_player_chosen_options,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        call_next_handler,
+        func=dummy_true,
+        cb_data="call_next",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        select_players_handler,
+        func=dummy_true,
+        cb_data="select_players",
+        state=ManagerStates().state_list,
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        selected_players_page_handler,
+        func=dummy_true,
+        cb_data_pagination="selected_players_page",
+        state=[ManagerStates.select_reward_recipients, ManagerStates.select_purchase_recipients],
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        selected_players_cancel_handler,
+        func=dummy_true,
+        cb_data="selected_players_cancel",
+        state=[ManagerStates.select_reward_recipients, ManagerStates.select_purchase_recipients],
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        selected_players_done_handler,
+        func=dummy_true,
+        cb_data="selected_players_done",
+        state=[ManagerStates.select_reward_recipients, ManagerStates.select_purchase_recipients],
+        pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        selected_player_handler,
+        func=dummy_true,
+        cb_data_pagination="selected_players",
+        state=[ManagerStates.select_reward_recipients, ManagerStates.select_purchase_recipients],
+        pass_bot=True
+    )
+    bot.register_message_handler(
+        reward_many_handler,
+        state=ManagerStates.choose_reward_many_amount,
+        pass_bot=True,
+        is_digit=True
+    )
+    bot.register_message_handler(
+        purchase_many_handler,
+        is_digit=True,
+        state=ManagerStates.choose_purchase_many_amount,
+        pass_bot=True
+    )
     bot.register_callback_query_handler(
         pause_location_handler,
         func=dummy_true,
@@ -8,6 +8,7 @@ from fair.db import DBAdapter, DBError
 from fair.utils import dummy_true
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher
 from fair.bot.states import ManagerStates
 
 
@@ -19,6 +20,7 @@ from fair.bot.states import ManagerStates
 # 4.1 Reward a player
 # 4.2 Purchase
 # 5. List all players with pages (10 players per page)
+#    while choosing a recipient players can also be found by the name prefix
 # 6. List all locations with pages (10 locations per page), sorted by the number of players in a queue
 # 7. Add money to player's balance
 # 8. Subtract money from player's balance
@@ -32,26 +34,33 @@ def list_all_players_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
-        players = db_adapter.get_all_players(offset=0, limit=page_size)
-        players_cnt = db_adapter.get_all_players_count()
+        players = db_adapter.get_all_players_page(cursor=None, limit=page_size + 1)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda player: (player.id,)
+        )
         collection = list((player.name, player.id) for player in players)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="players",
-            page_idx=0,
-            page_cnt=round(players_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
-        bot.send_message(message.chat.id, messages.all_players, reply_markup=keyboard)
+        outbound.submit(bot.send_message, message.chat.id, messages.all_players, reply_markup=keyboard)
 
 
 def all_players_page_handler(
@@ -62,27 +71,35 @@ def all_players_page_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
-    page_idx = int(call.data.split("#")[1])
+    cursor, backward = keyboards.parse_page_cursor(call.data)
     try:
-        players = db_adapter.get_all_players(offset=page_idx * page_size, limit=page_size)
-        players_cnt = db_adapter.get_all_players_count()
+        players = db_adapter.get_all_players_page(cursor=cursor[0], limit=page_size + 1, backward=backward)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
         return
     else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda player: (player.id,)
+        )
         collection = list((player.name, player.id) for player in players)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="players",
-            page_idx=page_idx,
-            page_cnt=round(players_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
-        bot.edit_message_reply_markup(
+        outbound.submit(
+            bot.edit_message_reply_markup,
             chat_id=call.message.chat.id,
             message_id=call.message.id,
             reply_markup=keyboard
@@ -93,8 +110,10 @@ def all_players_cancel_handler(
         call: CallbackQuery,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.edit_message_text(
+    outbound.submit(
+        bot.edit_message_text,
         text=messages.all_players_cancelled,
         chat_id=call.message.chat.id,
         message_id=call.message.id,
@@ -110,26 +129,33 @@ def list_all_locations_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
-        locations = db_adapter.get_all_locations(offset=0, limit=page_size)
-        locations_cnt = db_adapter.get_all_locations_count()
+        locations = db_adapter.get_all_locations_page(cursor=None, limit=page_size + 1)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
         collection = list((f"{location.name} - {queue}", location.id) for location, queue in locations)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="locations",
-            page_idx=0,
-            page_cnt=round(locations_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
-        bot.send_message(message.chat.id, messages.all_locations, reply_markup=keyboard)
+        outbound.submit(bot.send_message, message.chat.id, messages.all_locations, reply_markup=keyboard)
 
 
 def all_locations_page_handler(
@@ -140,27 +166,35 @@ def all_locations_page_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
-    page_idx = int(call.data.split("#")[1])
+    cursor, backward = keyboards.parse_page_cursor(call.data)
     try:
-        locations = db_adapter.get_all_locations(offset=page_idx * page_size, limit=page_size)
-        locations_cnt = db_adapter.get_all_locations_count()
+        locations = db_adapter.get_all_locations_page(cursor=cursor, limit=page_size + 1, backward=backward)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
         return
     else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
         collection = list((f"{location.name} - {queue}", location.id) for location, queue in locations)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="locations",
-            page_idx=page_idx,
-            page_cnt=round(locations_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
-        bot.edit_message_reply_markup(
+        outbound.submit(
+            bot.edit_message_reply_markup,
             chat_id=call.message.chat.id,
             message_id=call.message.id,
             reply_markup=keyboard
@@ -171,8 +205,10 @@ def all_locations_cancel_handler(
         call: CallbackQuery,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.edit_message_text(
+    outbound.submit(
+        bot.edit_message_text,
         text=messages.all_locations_cancelled,
         chat_id=call.message.chat.id,
         message_id=call.message.id,
@@ -181,14 +217,20 @@ def all_locations_cancel_handler(
 
 
 def create_recipients_keyboard(db_adapter: DBAdapter, buttons: ButtonsConfig, collection_name: str, page_size: int):
-    players = db_adapter.get_all_players(offset=0, limit=page_size)
-    players_cnt = db_adapter.get_all_players_count()
+    players = db_adapter.get_all_players_page(cursor=None, limit=page_size + 1)
+    players, prev_cursor, next_cursor = keyboards.page_cursors(
+        page=players,
+        page_size=page_size,
+        cursor=None,
+        backward=False,
+        key=lambda player: (player.id,)
+    )
     collection = list((player.name, player.id) for player in players)
     keyboard = keyboards.collection_page(
         collection=collection,
         collection_name=collection_name,
-        page_idx=0,
-        page_cnt=round(players_cnt / page_size + 0.5),
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
         prev_page_btn=buttons.prev_page,
         next_page_btn=buttons.next_page,
         cancel_btn=buttons.cancel
@@ -204,16 +246,17 @@ def add_balance_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         keyboard = create_recipients_keyboard(db_adapter, buttons, "add_balance_recipients", page_size)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         bot.set_state(message.from_user.id, ManagerStates.choose_add_recipient, message.chat.id)
-        bot.send_message(message.chat.id, messages.choose_add_balance_recipient, reply_markup=keyboard)
+        outbound.submit(bot.send_message, message.chat.id, messages.choose_add_balance_recipient, reply_markup=keyboard)
 
 
 def subtract_balance_handler(
@@ -224,16 +267,22 @@ def subtract_balance_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         keyboard = create_recipients_keyboard(db_adapter, buttons, "subtract_balance_recipients", page_size)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         bot.set_state(message.from_user.id, ManagerStates.choose_subtract_recipient, message.chat.id)
-        bot.send_message(message.chat.id, messages.choose_subtract_balance_recipient, reply_markup=keyboard)
+        outbound.submit(
+            bot.send_message,
+            message.chat.id,
+            messages.choose_subtract_balance_recipient,
+            reply_markup=keyboard
+        )
 
 
 def reward_player_handler(
@@ -244,16 +293,17 @@ def reward_player_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         keyboard = create_recipients_keyboard(db_adapter, buttons, "reward_recipients", page_size)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
         return
     else:
         bot.set_state(call.from_user.id, ManagerStates.choose_reward_recipient, call.message.chat.id)
-        bot.send_message(call.message.chat.id, messages.choose_reward_recipient, reply_markup=keyboard)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.choose_reward_recipient, reply_markup=keyboard)
 
 
 def purchase_handler(
@@ -264,16 +314,22 @@ def purchase_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         keyboard = create_recipients_keyboard(db_adapter, buttons, "purchase_recipients", page_size)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
         return
     else:
         bot.set_state(call.from_user.id, ManagerStates.choose_purchase_recipient, call.message.chat.id)
-        bot.send_message(call.message.chat.id, messages.choose_purchase_recipient, reply_markup=keyboard)
+        outbound.submit(
+            bot.send_message,
+            call.message.chat.id,
+            messages.choose_purchase_recipient,
+            reply_markup=keyboard
+        )
 
 
 def recipient_page_handler(
@@ -284,38 +340,88 @@ def recipient_page_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     collection_name = call.data.split("#")[0][:-5]  # remove "_page"
-    page_idx = int(call.data.split("#")[1])
+    cursor, backward = keyboards.parse_page_cursor(call.data)
     try:
-        players = db_adapter.get_all_players(offset=page_idx * page_size, limit=page_size)
-        players_cnt = db_adapter.get_all_players_count()
+        players = db_adapter.get_all_players_page(cursor=cursor[0], limit=page_size + 1, backward=backward)
     except DBError as e:
         logger.error(e)
-        bot.send_message(call.message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, call.message.chat.id, messages.unknown_error)
         return
     else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda player: (player.id,)
+        )
         collection = list((player.name, player.id) for player in players)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name=collection_name,
-            page_idx=page_idx,
-            page_cnt=round(players_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
-        bot.edit_message_reply_markup(
+        outbound.submit(
+            bot.edit_message_reply_markup,
             chat_id=call.message.chat.id,
             message_id=call.message.id,
             reply_markup=keyboard
         )
 
 
+def recipient_search_handler(
+        message: Message,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    state = bot.get_state(message.from_user.id, message.chat.id)
+    if state == ManagerStates.choose_add_recipient.name:
+        collection_name = "add_balance_recipients"
+    elif state == ManagerStates.choose_subtract_recipient.name:
+        collection_name = "subtract_balance_recipients"
+    elif state == ManagerStates.choose_reward_recipient.name:
+        collection_name = "reward_recipients"
+    else:
+        collection_name = "purchase_recipients"
+    try:
+        players = db_adapter.search_players_by_name(message.text, limit=page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        if len(players) == 0:
+            outbound.submit(bot.send_message, message.chat.id, messages.player_search_no_results)
+            return
+        keyboard = keyboards.collection_page(
+            collection=[(player.name, player.id) for player in players],
+            collection_name=collection_name,
+            prev_cursor=None,
+            next_cursor=None,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(bot.send_message, message.chat.id, messages.player_search_results, reply_markup=keyboard)
+
+
 def recipient_cancel_handler(
         call: CallbackQuery,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
     msg = messages.unknown_error
     bot.set_state(call.from_user.id, ManagerStates.main_menu)
@@ -327,7 +433,8 @@ def recipient_cancel_handler(
         msg = messages.reward_cancelled
     elif "purchase_recipients" in call.data:
         msg = messages.purchase_cancelled
-    bot.edit_message_text(
+    outbound.submit(
+        bot.edit_message_text,
         text=msg,
         chat_id=call.message.chat.id,
         message_id=call.message.id,
@@ -339,6 +446,7 @@ def recipient_handler(
         call: CallbackQuery,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
     recipient_player_id = int(call.data.split("#")[1])
     bot.add_data(call.from_user.id, call.message.chat.id, recipient_player_id=recipient_player_id)
@@ -355,8 +463,13 @@ def recipient_handler(
     elif "purchase_recipients" in call.data:
         msg = messages.choose_purchase_amount
         bot.set_state(call.from_user.id, ManagerStates.choose_purchase_amount)
-    bot.edit_message_reply_markup(call.message.chat.id, call.message.id, reply_markup=keyboards.empty_inline())
-    bot.send_message(chat_id=call.message.chat.id, text=msg)
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+    outbound.submit(bot.send_message, chat_id=call.message.chat.id, text=msg)
 
 
 def choose_location_handler(
@@ -367,27 +480,34 @@ def choose_location_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
-        locations = db_adapter.get_all_locations(offset=0, limit=page_size)
-        locations_cnt = db_adapter.get_all_locations_count()
+        locations = db_adapter.get_all_locations_page(cursor=None, limit=page_size + 1)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
         collection = list((f"{location.name} - {queue}", location.id) for location, queue in locations)
         keyboard = keyboards.collection_page(
             collection=collection,
             collection_name="choose_locations",
-            page_idx=0,
-            page_cnt=round(locations_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
         bot.set_state(message.from_user.id, ManagerStates.choose_location, message.chat.id)
-        bot.send_message(message.chat.id, messages.choose_location, reply_markup=keyboard)
+        outbound.submit(bot.send_message, message.chat.id, messages.choose_location, reply_markup=keyboard)
 
 
 def my_location_handler(
@@ -397,6 +517,7 @@ def my_location_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         location = db_adapter.get_location_by_manager_tg_id(message.from_user.id)
@@ -405,17 +526,20 @@ def my_location_handler(
             queue_count = db_adapter.get_queue_count_by_location_id(location.id)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if location is None:
-            bot.send_message(message.chat.id, messages.manager_not_on_location_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.manager_not_on_location_error)
         else:
-            bot.send_message(
+            outbound.submit(
+                bot.send_message,
                 message.chat.id,
                 messages.manager_my_location.format(location.name, queue_count),
                 reply_markup=keyboards.location_options(
                     my_location_queue_btn=buttons.my_location_queue,
+                    call_next_btn=buttons.call_next,
+                    select_players_btn=buttons.select_players,
                     pause_the_location_btn=buttons.pause_location
                 )
             )
@@ -428,18 +552,20 @@ def leave_location_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         manager_location_updated = db_adapter.update_manager_location_by_tg_id(message.from_user.id, None)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if manager_location_updated is False:
-            bot.send_message(message.chat.id, messages.manager_not_on_location_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.manager_not_on_location_error)
         else:
-            bot.send_message(
+            outbound.submit(
+                bot.send_message,
                 message.chat.id,
                 messages.manager_left_location,
                 reply_markup=keyboards.manager_main_menu(
@@ -619,3 +745,15 @@ def register_handlers(bot: TeleBot, buttons: ButtonsConfig):
         state=ManagerStates().state_list,
         pass_bot=True
     )
+    # registered last, thus the menu buttons are never treated as a search query
+    bot.register_message_handler(
+        recipient_search_handler,
+        content_types=['text'],
+        state=[
+            ManagerStates.choose_add_recipient,
+            ManagerStates.choose_subtract_recipient,
+            ManagerStates.choose_reward_recipient,
+            ManagerStates.choose_purchase_recipient
+        ],
+        pass_bot=True
+    )
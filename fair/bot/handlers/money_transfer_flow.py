@@ -8,6 +8,8 @@ from fair.db import DBAdapter, DBError
 from fair.utils import dummy_true
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher, Priority
+from fair.bot.api_queue import ApiQueue
 from fair.bot.states import PlayerStates
 
 
@@ -15,7 +17,8 @@ from fair.bot.states import PlayerStates
 
 # User is to come here after pressing the text button "Money transfer"
 
-# 1. Show a list of players with pages (10 players per page) to be a recipient
+# 1. Show a list of players with pages (10 players per page) to be a recipient,
+#    or the players found by the name prefix the user typed
 # 2. Ask for an amount with a few template values as inline buttons (e.g. 10, 50, 100, 500, 1000)
 # 3. Finish the transfer
 
@@ -28,27 +31,68 @@ def money_transfer_recipient_page_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        api_queue: ApiQueue,
+        outbound: OutboundDispatcher,
         **kwargs):
-    page_idx = int(call.data.split("#")[1])
+    cursor, backward = keyboards.parse_page_cursor(call.data)
     try:
-        players = db_adapter.get_all_players(offset=page_idx * page_size, limit=page_size)
-        players_cnt = db_adapter.get_all_players_count()
+        players = db_adapter.get_all_players_page(cursor=cursor[0], limit=page_size + 1, backward=backward)
     except DBError as e:
         logger.error(e)
-        bot.answer_callback_query(call.id, text=messages.unknown_error)
+        api_queue.submit(bot.answer_callback_query, call.id, text=messages.unknown_error)
         return
     else:
-        logger.debug(f"Player {call.from_user.id} is choosing a recipient for money transfer on page {page_idx}")
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda player: (player.id,)
+        )
+        logger.debug(f"Player {call.from_user.id} is choosing a money transfer recipient, cursor {cursor}")
+        keyboard = keyboards.collection_page(
+            collection=[(player.name, player.id) for player in players],
+            collection_name="transfer_recipients",
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            prev_page_btn=buttons.prev_page,
+            next_page_btn=buttons.next_page,
+            cancel_btn=buttons.cancel
+        )
+        outbound.submit(bot.edit_message_reply_markup, call.message.chat.id, call.message.id, reply_markup=keyboard)
+
+
+def money_transfer_recipient_search_handler(
+        message: Message,
+        bot: TeleBot,
+        messages: MessagesConfig,
+        buttons: ButtonsConfig,
+        db_adapter: DBAdapter,
+        logger: Logger,
+        page_size: int,
+        outbound: OutboundDispatcher,
+        **kwargs):
+    try:
+        players = db_adapter.search_players_by_name(message.text, limit=page_size)
+    except DBError as e:
+        logger.error(e)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
+        return
+    else:
+        logger.debug(f"Player {message.from_user.id} is searching for a money transfer recipient by {message.text}")
+        if len(players) == 0:
+            outbound.submit(bot.send_message, message.chat.id, messages.player_search_no_results)
+            return
         keyboard = keyboards.collection_page(
             collection=[(player.name, player.id) for player in players],
             collection_name="transfer_recipients",
-            page_idx=page_idx,
-            page_cnt=round(players_cnt // page_size + 0.5),
+            prev_cursor=None,
+            next_cursor=None,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
-        bot.edit_message_reply_markup(call.message.chat.id, call.message.id, reply_markup=keyboard)
+        outbound.submit(bot.send_message, message.chat.id, messages.player_search_results, reply_markup=keyboard)
 
 
 def money_transfer_recipient_cancel_handler(
@@ -56,10 +100,12 @@ def money_transfer_recipient_cancel_handler(
         bot: TeleBot,
         messages: MessagesConfig,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     logger.debug(f"Player {call.from_user.id} cancelled choosing a recipient for money transfer")
     bot.set_state(call.from_user.id, PlayerStates.main_menu, call.message.chat.id)
-    bot.edit_message_text(
+    outbound.submit(
+        bot.edit_message_text,
         text=messages.money_transfer_recipient_cancelled,
         chat_id=call.message.chat.id,
         message_id=call.message.id,
@@ -73,13 +119,20 @@ def money_transfer_recipient_handler(
         messages: MessagesConfig,
         buttons: ButtonsConfig,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     recipient_player_id = int(call.data.split("#")[1])
     logger.debug(f"Player {call.from_user.id} chose a recipient {recipient_player_id} for money transfer")
     bot.add_data(call.from_user.id, call.message.chat.id, recipient_player_id=recipient_player_id)
     bot.set_state(call.from_user.id, PlayerStates.choose_money_transfer_amount, call.message.chat.id)
-    bot.edit_message_reply_markup(call.message.chat.id, call.message.id, reply_markup=keyboards.empty_inline())
-    bot.send_message(
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.id,
+        reply_markup=keyboards.empty_inline()
+    )
+    outbound.submit(
+        bot.send_message,
         chat_id=call.message.chat.id,
         text=messages.choose_money_transfer_amount,
         reply_markup=keyboards.transfer_amount(buttons.cancel)
@@ -93,12 +146,14 @@ def money_transfer_amount_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     with bot.retrieve_data(message.from_user.id, message.chat.id) as data:
         recipient_player_id = data.get("recipient_player_id")
     if recipient_player_id is None:
         logger.debug(f"Player {message.from_user.id} is trying to transfer money without choosing a recipient")
-        bot.send_message(
+        outbound.submit(
+            bot.send_message,
             chat_id=message.chat.id,
             text=messages.money_transfer_recipient_not_chosen_error,
             reply_markup=keyboards.empty_inline()
@@ -114,12 +169,16 @@ def money_transfer_amount_handler(
                 money_transferred = db_adapter.transfer_by_player_id(player.id, recipient_player_id, int(message.text))
         except DBError as e:
             logger.error(e)
-            bot.send_message(chat_id=message.chat.id, text=messages.unknown_error)
+            outbound.submit(bot.send_message, chat_id=message.chat.id, text=messages.unknown_error)
             return
         else:
             if money_transferred is False:
                 logger.debug(f"Player {message.from_user.id} is trying to transfer money with invalid amount")
-                bot.send_message(chat_id=message.chat.id, text=messages.money_transfer_amount_invalid_error)
+                outbound.submit(
+                    bot.send_message,
+                    chat_id=message.chat.id,
+                    text=messages.money_transfer_amount_invalid_error
+                )
                 return
             else:
                 logger.debug(f"Player {message.from_user.id} transferred money to player {recipient_player_id}")
@@ -139,10 +198,12 @@ def money_transfer_amount_handler(
                         help_btn=buttons.help
                     )
                 bot.set_state(message.from_user.id, PlayerStates.main_menu, message.chat.id)
-                bot.send_message(
+                outbound.submit(
+                    bot.send_message,
                     chat_id=message.chat.id,
                     text=messages.money_transfer_success,
-                    reply_markup=keyboard
+                    reply_markup=keyboard,
+                    priority=Priority.HIGH
                 )
 
 
@@ -168,6 +229,12 @@ def register_handlers(bot: TeleBot):
         state=PlayerStates.choose_money_transfer_recipient,
         pass_bot=True
     )
+    bot.register_message_handler(
+        money_transfer_recipient_search_handler,
+        content_types=['text'],
+        state=PlayerStates.choose_money_transfer_recipient,
+        pass_bot=True
+    )
     bot.register_message_handler(
         money_transfer_amount_handler,
         is_digit=True,
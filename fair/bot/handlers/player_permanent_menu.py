@@ -1,3 +1,4 @@
+import math
 from logging import Logger
 
 from telebot import TeleBot
@@ -7,6 +8,8 @@ from fair.config import MessagesConfig, ButtonsConfig
 from fair.db import DBAdapter, DBError
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher, Priority
+from fair.bot.queue_notifier import QueueNotifier
 from fair.bot.states import PlayerStates
 
 
@@ -25,19 +28,25 @@ def my_balance_handler(
         messages: MessagesConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         player = db_adapter.get_player_by_tg_id(message.from_user.id)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if player is None:
             logger.debug(f"Player with tg_id {message.from_user.id} not found!")
-            bot.send_message(message.chat.id, messages.player_not_found_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.player_not_found_error)
         else:
-            bot.send_message(message.chat.id, messages.player_balance.format(player.balance))
+            outbound.submit(
+                bot.send_message,
+                message.chat.id,
+                messages.player_balance.format(player.balance),
+                priority=Priority.HIGH
+            )
 
 
 def transfer_money_handler(
@@ -48,27 +57,39 @@ def transfer_money_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
-        players = db_adapter.get_all_players(offset=0, limit=page_size)
-        players_cnt = db_adapter.get_all_players_count()
+        players = db_adapter.get_all_players_page(cursor=None, limit=page_size + 1)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
+        players, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=players,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda player: (player.id,)
+        )
         logger.debug(f"Player with tg_id {message.from_user.id} initiated money transfer")
         keyboard = keyboards.collection_page(
             collection=[(player.name, player.id) for player in players],
             collection_name='transfer_recipients',
-            page_idx=0,
-            page_cnt=round(players_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel,
         )
         bot.set_state(message.from_user.id, PlayerStates.choose_money_transfer_recipient, message.chat.id)
-        bot.send_message(message.chat.id, messages.choose_money_transfer_recipient, reply_markup=keyboard)
+        outbound.submit(
+            bot.send_message,
+            message.chat.id,
+            messages.choose_money_transfer_recipient,
+            reply_markup=keyboard
+        )
 
 
 def new_queue_handler(
@@ -79,27 +100,34 @@ def new_queue_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
-        locations = db_adapter.get_all_active_locations(offset=0, limit=page_size)
-        locations_cnt = db_adapter.get_all_active_locations_count()
+        locations = db_adapter.get_all_active_locations_page(cursor=None, limit=page_size + 1)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=None,
+            backward=False,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
         logger.debug(f"Player with tg_id {message.from_user.id} initiated new queue")
         keyboard = keyboards.collection_page(
             collection=[(f"{location.name} - {queue}", location.id) for location, queue in locations],
             collection_name='new_queue_locations',
-            page_idx=0,
-            page_cnt=round(locations_cnt / page_size + 0.5),
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel,
         )
         bot.set_state(message.from_user.id, PlayerStates.choose_new_queue_location, message.chat.id)
-        bot.send_message(message.chat.id, messages.choose_new_queue_location, reply_markup=keyboard)
+        outbound.submit(bot.send_message, message.chat.id, messages.choose_new_queue_location, reply_markup=keyboard)
 
 
 def my_queue_handler(
@@ -108,27 +136,23 @@ def my_queue_handler(
         messages: MessagesConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
-        queue_entry = db_adapter.get_queue_entry_by_player_tg_id(message.from_user.id)
-        location = None
-        queue_count = 0
-        if queue_entry is not None:
-            location = db_adapter.get_location_by_id(queue_entry.location_id)
-            queue_count = db_adapter.get_queue_count_by_location_id(queue_entry.location_id)
+        position = db_adapter.get_queue_position_by_player_tg_id(message.from_user.id)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
-        if location is None:
+        if position is None:
             logger.debug("Player is not in queue, when trying to get his queue info")
-            bot.send_message(message.chat.id, messages.player_not_in_queue_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.player_not_in_queue_error)
         else:
-            bot.send_message(
-                message.chat.id,
-                messages.player_queue_location.format(location.name, queue_count)
-            )
+            text = messages.player_queue_location.format(position.location_name, position.position + 1, position.size)
+            if position.eta is not None:
+                text += '\n' + messages.player_queue_eta.format(math.ceil(position.eta / 60))
+            outbound.submit(bot.send_message, message.chat.id, text)
 
 
 def leave_queue_handler(
@@ -137,20 +161,36 @@ def leave_queue_handler(
         messages: MessagesConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
+        queue_notifier: QueueNotifier,
         **kwargs):
     try:
+        # read before the entry is deleted, the not called players behind the position are notified
+        position = db_adapter.get_queue_waiting_position_by_player_tg_id(message.from_user.id)
         queue_entry_deleted = db_adapter.delete_queue_entry_by_player_tg_id(message.from_user.id)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if queue_entry_deleted is False:
             logger.debug("Player is not in queue, when trying to leave it")
-            bot.send_message(message.chat.id, messages.player_not_in_queue_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.player_not_in_queue_error)
         else:
             logger.debug(f"Player with tg_id {message.from_user.id} left queue")
-            bot.send_message(message.chat.id, messages.player_left_queue)
+            outbound.submit(bot.send_message, message.chat.id, messages.player_left_queue)
+            queue_notifier.forget(message.chat.id)
+            if position is not None:
+                location_id, location_name, ahead = position
+                queue_notifier.queue_moved(
+                    bot,
+                    db_adapter,
+                    outbound,
+                    messages,
+                    location_id,
+                    location_name,
+                    ahead
+                )
 
 
 def register_handlers(bot: TeleBot, buttons: ButtonsConfig):
@@ -8,6 +8,8 @@ from fair.db import DBAdapter, DBError
 from fair.utils import dummy_true
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher
+from fair.bot.api_queue import ApiQueue
 from fair.bot.states import PlayerStates
 
 
@@ -32,23 +34,30 @@ def new_queue_location_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        api_queue: ApiQueue,
+        outbound: OutboundDispatcher,
         **kwargs):
     location_id = int(call.data.split("#")[1])
     try:
         queue_entry_added = db_adapter.add_queue_entry_by_player_tg_id(call.from_user.id, location_id)
     except DBError as e:
         logger.error(f"{e}")
-        bot.answer_callback_query(call.id, messages.unknown_error)
+        api_queue.submit(bot.answer_callback_query, call.id, messages.unknown_error)
         return
     else:
         if queue_entry_added is False:
             logger.debug(f"Player {call.from_user.id} is already in the queue of location {location_id}")
-            bot.send_message(call.message.chat.id, messages.queue_entry_already_exists_error)
+            outbound.submit(bot.send_message, call.message.chat.id, messages.queue_entry_already_exists_error)
             return
         else:
             logger.debug(f"Player {call.from_user.id} was added to the queue of location {location_id}")
             bot.set_state(call.message.from_user.id, PlayerStates.main_menu, call.message.chat.id)
-            bot.edit_message_reply_markup(call.message.chat.id, call.message.id, reply_markup=keyboards.empty_inline())
+            outbound.submit(
+                bot.edit_message_reply_markup,
+                call.message.chat.id,
+                call.message.id,
+                reply_markup=keyboards.empty_inline()
+            )
             keyboard = keyboards.player_queue_menu(
                 my_queue_btn=buttons.my_queue,
                 leave_the_queue_btn=buttons.leave_queue,
@@ -56,7 +65,7 @@ def new_queue_location_handler(
                 transfer_money_btn=buttons.transfer_money,
                 help_btn=buttons.help
             )
-            bot.send_message(call.message.chat.id, messages.queue_entry_added, reply_markup=keyboard)
+            outbound.submit(bot.send_message, call.message.chat.id, messages.queue_entry_added, reply_markup=keyboard)
 
 
 def new_queue_locations_page_handler(
@@ -67,27 +76,40 @@ def new_queue_locations_page_handler(
         db_adapter: DBAdapter,
         logger: Logger,
         page_size: int,
+        api_queue: ApiQueue,
+        outbound: OutboundDispatcher,
         **kwargs):
-    page_idx = int(call.data.split("#")[1])
+    cursor, backward = keyboards.parse_page_cursor(call.data)
     try:
-        locations = db_adapter.get_all_active_locations(offset=page_idx * page_size, limit=page_size)
-        locations_cnt = db_adapter.get_all_active_locations_count()
+        locations = db_adapter.get_all_active_locations_page(cursor=cursor, limit=page_size + 1, backward=backward)
     except DBError as e:
         logger.error(f"{e}")
-        bot.answer_callback_query(call.id, messages.unknown_error)
+        api_queue.submit(bot.answer_callback_query, call.id, messages.unknown_error)
         return
     else:
-        logger.debug(f"Player {call.from_user.id} is viewing page {page_idx} of locations list")
+        locations, prev_cursor, next_cursor = keyboards.page_cursors(
+            page=locations,
+            page_size=page_size,
+            cursor=cursor,
+            backward=backward,
+            key=lambda entry: (entry[1], entry[0].id)
+        )
+        logger.debug(f"Player {call.from_user.id} is viewing locations list, cursor {cursor}")
         keyboard = keyboards.collection_page(
             collection=[(f"{location.name} - {queue}", location.id) for location, queue in locations],
             collection_name="new_queue_locations",
-            page_idx=page_idx,
-            page_cnt=locations_cnt // page_size + 1,
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
             prev_page_btn=buttons.prev_page,
             next_page_btn=buttons.next_page,
             cancel_btn=buttons.cancel
         )
-        bot.edit_message_reply_markup(chat_id=call.message.chat.id, message_id=call.message.id, reply_markup=keyboard)
+        outbound.submit(
+            bot.edit_message_reply_markup,
+            chat_id=call.message.chat.id,
+            message_id=call.message.id,
+            reply_markup=keyboard
+        )
 
 
 def new_queue_location_cancel_handler(
@@ -95,10 +117,12 @@ def new_queue_location_cancel_handler(
         bot: TeleBot,
         messages: MessagesConfig,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     logger.debug(f"Player {call.from_user.id} cancelled choosing new queue location")
     bot.set_state(call.message.from_user.id, PlayerStates.main_menu, call.message.chat.id)
-    bot.edit_message_text(
+    outbound.submit(
+        bot.edit_message_text,
         text=messages.new_queue_location_cancelled,
         chat_id=call.message.chat.id,
         message_id=call.message.id,
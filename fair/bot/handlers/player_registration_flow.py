@@ -9,6 +9,7 @@ from fair.db import DBAdapter, DBError
 from fair.utils import dummy_true, ru_letters
 
 from fair.bot import keyboards
+from fair.bot.outbound import OutboundDispatcher
 from fair.bot.states import UnregisteredStates, PlayerStates
 
 
@@ -24,18 +25,25 @@ def reg_player_handler(
         call: CallbackQuery,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.edit_message_reply_markup(call.message.chat.id, call.message.message_id, reply_markup=keyboards.empty_inline())
+    outbound.submit(
+        bot.edit_message_reply_markup,
+        call.message.chat.id,
+        call.message.message_id,
+        reply_markup=keyboards.empty_inline()
+    )
     bot.set_state(call.from_user.id, UnregisteredStates.reg_player_name, call.message.chat.id)
-    bot.send_message(call.message.chat.id, messages.get_player_name)
+    outbound.submit(bot.send_message, call.message.chat.id, messages.get_player_name)
 
 
 def invalid_player_name_handler(
         message: Message,
         bot: TeleBot,
         messages: MessagesConfig,
+        outbound: OutboundDispatcher,
         **kwargs):
-    bot.send_message(message.chat.id, messages.invalid_player_name)
+    outbound.submit(bot.send_message, message.chat.id, messages.invalid_player_name)
 
 
 def player_name_handler(
@@ -45,23 +53,24 @@ def player_name_handler(
         buttons: ButtonsConfig,
         db_adapter: DBAdapter,
         logger: Logger,
+        outbound: OutboundDispatcher,
         **kwargs):
     try:
         name_available = db_adapter.check_player_name_availability(message.text)
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if name_available is False:
             logger.debug(f"Player name already exists: {message.text}")
-            bot.send_message(message.chat.id, messages.player_name_already_taken)
+            outbound.submit(bot.send_message, message.chat.id, messages.player_name_already_taken)
             return
     try:
         user_added = db_adapter.add_user("player", message.from_user.id)  # add User
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if user_added is False:
@@ -69,7 +78,7 @@ def player_name_handler(
                 f"Constraints violation while adding user:"
                 f" {message.from_user.id}, {message.text}"
             )
-            bot.send_message(message.chat.id, messages.add_player_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.add_player_error)
             return
         else:
             logger.debug(f"User added: {message.from_user.id}, {message.text}")
@@ -77,7 +86,7 @@ def player_name_handler(
         player_added = db_adapter.add_player(message.from_user.id, message.text)  # add Player
     except DBError as e:
         logger.error(e)
-        bot.send_message(message.chat.id, messages.unknown_error)
+        outbound.submit(bot.send_message, message.chat.id, messages.unknown_error)
         return
     else:
         if player_added is False:
@@ -86,11 +95,12 @@ def player_name_handler(
                 f" {message.from_user.id}, {message.text}"
             )
             bot.delete_state(message.from_user.id, message.chat.id)
-            bot.send_message(message.chat.id, messages.add_player_error)
+            outbound.submit(bot.send_message, message.chat.id, messages.add_player_error)
         else:
             logger.debug(f"Player added: {message.from_user.id}")
             bot.set_state(message.from_user.id, PlayerStates.main_menu, message.chat.id)
-            bot.send_message(
+            outbound.submit(
+                bot.send_message,
                 message.chat.id,
                 messages.player_registered,
                 reply_markup=keyboards.player_main_menu(
@@ -0,0 +1,90 @@
+import threading
+from typing import Optional
+
+import orjson
+from telebot import TeleBot
+from telebot.async_telebot import AsyncTeleBot
+
+
+# Webhook ingestion helpers: updates are decoded with orjson and peeked at as plain dicts,
+# thus the updates no registered handler can match are dropped before the full Update object graph is built
+
+# update field -> attribute of the bot with the handlers of that update type, same for TeleBot and AsyncTeleBot
+UPDATE_HANDLERS = {
+    'message': 'message_handlers',
+    'edited_message': 'edited_message_handlers',
+    'channel_post': 'channel_post_handlers',
+    'edited_channel_post': 'edited_channel_post_handlers',
+    'inline_query': 'inline_handlers',
+    'chosen_inline_result': 'chosen_inline_handlers',
+    'callback_query': 'callback_query_handlers',
+    'shipping_query': 'shipping_query_handlers',
+    'pre_checkout_query': 'pre_checkout_query_handlers',
+    'poll': 'poll_handlers',
+    'poll_answer': 'poll_answer_handlers',
+    'my_chat_member': 'my_chat_member_handlers',
+    'chat_member': 'chat_member_handlers',
+    'chat_join_request': 'chat_join_request_handlers',
+}
+MESSAGE_UPDATES = {'message', 'edited_message', 'channel_post', 'edited_channel_post'}
+
+
+def decode_update(body: bytes) -> dict:
+    return orjson.loads(body)
+
+
+def peek_update_type(raw_update: dict) -> Optional[str]:
+    # raw update holds update_id and a single object, e.g. message or callback_query
+    for key in raw_update:
+        if key != 'update_id':
+            return key
+    return None
+
+
+class UpdateFilter:
+    # built once the handlers are registered, only the update type and message content types are checked,
+    # the rest of the filters (states, commands, custom ones) need the full Update and are left to the bot
+
+    def __init__(self, bot: TeleBot | AsyncTeleBot):
+        # update listeners receive all the updates, thus nothing is dropped if there is any
+        self.drop_nothing = bool(bot.update_listener)
+        # update type -> handled message content types, None means any content type
+        self.handled: dict[str, Optional[set[str]]] = {}
+        for update_type, attribute in UPDATE_HANDLERS.items():
+            handlers = getattr(bot, attribute)
+            if not handlers:
+                continue
+            content_types = set()
+            for handler in handlers:
+                handler_content_types = handler['filters'].get('content_types')
+                if update_type not in MESSAGE_UPDATES or handler_content_types is None:
+                    content_types = None
+                    break
+                content_types.update(handler_content_types)
+            self.handled[update_type] = content_types
+        self.dropped: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def is_handled(self, raw_update: dict) -> bool:
+        if self.drop_nothing:
+            return True
+        update_type = peek_update_type(raw_update)
+        if update_type in self.handled:
+            content_types = self.handled[update_type]
+            # content type of the message is the name of its field, e.g. text or photo
+            if content_types is None or not content_types.isdisjoint(raw_update[update_type]):
+                return True
+        with self._lock:
+            self.dropped[update_type] = self.dropped.get(update_type, 0) + 1
+        return False
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            dropped = dict(self.dropped)
+        return {
+            'handled': {
+                update_type: sorted(content_types) if content_types is not None else None
+                for update_type, content_types in self.handled.items()
+            },
+            'dropped': dropped,
+        }
@@ -1,8 +1,48 @@
+import functools
+import math
+from typing import Callable, Optional
+
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from telebot.types import ReplyKeyboardMarkup, KeyboardButton
 from telebot.types import ReplyKeyboardRemove
+from telebot.types import JsonSerializable
+
+from fair.utils import LRUCache
+
+
+# Keyboards are built of the fixed ButtonsConfig strings, thus each of them is built and serialized once
+# and the same SerializedMarkup is returned afterwards. Page keyboards are memoized by their content,
+# thus a changed page (e.g. a player joined the queue) gets a new key and is never served stale.
+# Cached markups are shared, they must not be modified
+
+STATIC_KEYBOARD_CACHE_SIZE = 128
+PAGE_KEYBOARD_CACHE_SIZE = 1024
+SELECTED_MARK = "\u2705 "
+
+
+class SerializedMarkup(JsonSerializable):
+    # telebot calls to_json on every send, the json is made once instead
+    __slots__ = ('json',)
+
+    def __init__(self, markup: JsonSerializable):
+        self.json = markup.to_json()
+
+    def to_json(self) -> str:
+        return self.json
 
 
+def cached_keyboard(build: Callable[..., JsonSerializable]) -> Callable[..., SerializedMarkup]:
+    @functools.lru_cache(maxsize=STATIC_KEYBOARD_CACHE_SIZE)
+    @functools.wraps(build)
+    def cached(*args, **kwargs) -> SerializedMarkup:
+        return SerializedMarkup(build(*args, **kwargs))
+    return cached
+
+
+page_keyboard_cache = LRUCache(PAGE_KEYBOARD_CACHE_SIZE, math.inf)
+
+
+@cached_keyboard
 def reg_buttons(reg_player_btn: str, reg_manager_btn: str, help_btn: str) -> InlineKeyboardMarkup:
     keyboard = InlineKeyboardMarkup()
     keyboard.row(InlineKeyboardButton(text=reg_player_btn, callback_data="reg_player"))
@@ -11,6 +51,7 @@ def reg_buttons(reg_player_btn: str, reg_manager_btn: str, help_btn: str) -> Inl
     return keyboard
 
 
+@cached_keyboard
 def player_main_menu(
         new_queue_btn: str,
         my_balance_btn: str,
@@ -24,6 +65,7 @@ def player_main_menu(
     return keyboard
 
 
+@cached_keyboard
 def player_queue_menu(
         my_queue_btn: str,
         leave_the_queue_btn: str,
@@ -42,33 +84,113 @@ def player_queue_menu(
 def collection_page(
         collection: list[tuple[str, int]],
         collection_name: str,
-        page_idx: int,
-        page_cnt: int,
+        prev_cursor: Optional[str],
+        next_cursor: Optional[str],
+        prev_page_btn: str,
+        next_page_btn: str,
+        cancel_btn: str) -> SerializedMarkup:
+    key = (tuple(collection), collection_name, prev_cursor, next_cursor, prev_page_btn, next_page_btn, cancel_btn)
+    keyboard = page_keyboard_cache.get(key)
+    if keyboard is None:
+        keyboard = SerializedMarkup(build_collection_page(*key))
+        page_keyboard_cache.set(key, keyboard)
+    return keyboard
+
+
+def build_collection_page(
+        collection: tuple[tuple[str, int], ...],
+        collection_name: str,
+        prev_cursor: Optional[str],
+        next_cursor: Optional[str],
         prev_page_btn: str,
         next_page_btn: str,
         cancel_btn: str) -> InlineKeyboardMarkup:
     # Collection name is used as a prefix for callback data.
     # Callback data format for collection entry: {collection_name}#{entry_id}
-    # Callback data format for page control buttons: {collection_name}_page#{page_idx}
+    # Callback data format for page control buttons: {collection_name}_page#<{prev_cursor} / >{next_cursor}
     # Callback data format for cancel button: {collection_name}_cancel
     # Each Callback data must be no longer than 64 bytes, choose collection name wisely.
     keyboard = InlineKeyboardMarkup()
     for entry in collection:
         keyboard.row(InlineKeyboardButton(text=entry[0], callback_data=f"{collection_name}#{entry[1]}"))
     control_btns = []
-    if page_idx > 0:
+    if prev_cursor is not None:
         control_btns.append(
-            InlineKeyboardButton(text=prev_page_btn, callback_data=f"{collection_name}_page#{page_idx - 1}")
+            InlineKeyboardButton(text=prev_page_btn, callback_data=f"{collection_name}_page#<{prev_cursor}")
         )
-    if page_idx < page_cnt - 1:
+    if next_cursor is not None:
         control_btns.append(
-            InlineKeyboardButton(text=next_page_btn, callback_data=f"{collection_name}_page#{page_idx + 1}")
+            InlineKeyboardButton(text=next_page_btn, callback_data=f"{collection_name}_page#>{next_cursor}")
         )
     keyboard.row(*control_btns)
     keyboard.row(InlineKeyboardButton(text=cancel_btn, callback_data=f"{collection_name}_cancel"))
     return keyboard
 
 
+def multi_select_page(
+        collection: list[tuple[str, int]],
+        selected: frozenset[int],
+        collection_name: str,
+        prev_cursor: Optional[str],
+        next_cursor: Optional[str],
+        prev_page_btn: str,
+        next_page_btn: str,
+        cancel_btn: str,
+        done_btn: str) -> SerializedMarkup:
+    # collection page with the selected entries marked and a done button: {collection_name}_done
+    collection = tuple(
+        (SELECTED_MARK + name if entry_id in selected else name, entry_id) for name, entry_id in collection
+    )
+    key = (collection, collection_name, prev_cursor, next_cursor, prev_page_btn, next_page_btn, cancel_btn, done_btn)
+    keyboard = page_keyboard_cache.get(key)
+    if keyboard is None:
+        markup = build_collection_page(*key[:-1])
+        markup.row(InlineKeyboardButton(text=done_btn, callback_data=f"{collection_name}_done"))
+        keyboard = SerializedMarkup(markup)
+        page_keyboard_cache.set(key, keyboard)
+    return keyboard
+
+
+def toggle_selected(markup: InlineKeyboardMarkup, callback_data: str, selected: bool) -> InlineKeyboardMarkup:
+    # the entry of the received multi select page is marked in place, thus no page is read to redraw it
+    for row in markup.keyboard:
+        for button in row:
+            if button.callback_data != callback_data:
+                continue
+            name = button.text[len(SELECTED_MARK):] if button.text.startswith(SELECTED_MARK) else button.text
+            button.text = SELECTED_MARK + name if selected else name
+    return markup
+
+
+def parse_page_cursor(callback_data: str) -> tuple[tuple[int, ...], bool]:
+    # returns the keyset cursor of the page control button and whether the previous page is requested
+    token = callback_data.split("#", maxsplit=1)[1]
+    return tuple(int(key) for key in token[1:].split(".")), token[0] == "<"
+
+
+def page_cursors(
+        page: list,
+        page_size: int,
+        cursor: Optional[tuple[int, ...]],
+        backward: bool,
+        key: Callable[..., tuple[int, ...]]) -> tuple[list, Optional[str], Optional[str]]:
+    # page is expected to be fetched with limit=page_size + 1, the extra entry tells if there is one more page,
+    # thus no count query is needed to decide which page control buttons to show
+    has_more = len(page) > page_size
+    if backward:
+        page = page[len(page) - page_size:] if has_more else page
+        prev_entry = page[0] if has_more else None
+        next_entry = page[-1] if page else None
+    else:
+        page = page[:page_size]
+        prev_entry = page[0] if cursor is not None and page else None
+        next_entry = page[-1] if has_more else None
+    prev_cursor = None if prev_entry is None else ".".join(str(i) for i in key(prev_entry))
+    next_cursor = None if next_entry is None else ".".join(str(i) for i in key(next_entry))
+    return page, prev_cursor, next_cursor
+
+
+@cached_keyboard
 def transfer_amount(cancel_btn: str) -> ReplyKeyboardMarkup:
     keyboard = ReplyKeyboardMarkup(resize_keyboard=True, row_width=3)
     keyboard.row(KeyboardButton(text="10"), KeyboardButton(text="20"), KeyboardButton(text="30"),
@@ -77,6 +199,7 @@ def transfer_amount(cancel_btn: str) -> ReplyKeyboardMarkup:
     return keyboard
 
 
+@cached_keyboard
 def manager_main_menu(
         list_all_players_btn: str,
         list_all_locations_btn: str,
@@ -94,6 +217,7 @@ def manager_main_menu(
     return keyboard
 
 
+@cached_keyboard
 def manager_on_location_menu(
         choose_location_btn: str,
         my_location_btn: str,
@@ -107,30 +231,42 @@ def manager_on_location_menu(
     return keyboard
 
 
-def location_options(my_location_queue_btn: str, pause_the_location_btn: str) -> InlineKeyboardMarkup:
+@cached_keyboard
+def location_options(
+        my_location_queue_btn: str,
+        call_next_btn: str,
+        select_players_btn: str,
+        pause_the_location_btn: str) -> InlineKeyboardMarkup:
     keyboard = InlineKeyboardMarkup()
     keyboard.row(InlineKeyboardButton(text=my_location_queue_btn, callback_data="my_location_queue"))
+    keyboard.row(InlineKeyboardButton(text=call_next_btn, callback_data="call_next"))
+    keyboard.row(InlineKeyboardButton(text=select_players_btn, callback_data="select_players"))
     keyboard.row(InlineKeyboardButton(text=pause_the_location_btn, callback_data="pause_the_location"))
     return keyboard
 
 
+@cached_keyboard
 def location_player_chosen_options(
         my_location_queue_btn: str,
+        call_player_btn: str,
         reward_player_btn: str,
         pause_the_location_btn: str) -> InlineKeyboardMarkup:
     keyboard = InlineKeyboardMarkup()
     keyboard.row(InlineKeyboardButton(text=my_location_queue_btn, callback_data="my_location_queue"))
+    keyboard.row(InlineKeyboardButton(text=call_player_btn, callback_data="call_player"))
     keyboard.row(InlineKeyboardButton(text=reward_player_btn, callback_data="reward_player"))
     keyboard.row(InlineKeyboardButton(text=pause_the_location_btn, callback_data="pause_the_location"))
     return keyboard
 
 
+@cached_keyboard
 def location_paused_options(unpause_the_location_btn: str) -> InlineKeyboardMarkup:
     keyboard = InlineKeyboardMarkup()
     keyboard.row(InlineKeyboardButton(text=unpause_the_location_btn, callback_data="unpause_the_location"))
     return keyboard
 
 
+@cached_keyboard
 def reward_amount(cancel_btn: str) -> ReplyKeyboardMarkup:
     keyboard = ReplyKeyboardMarkup(resize_keyboard=True, row_width=3)
     keyboard.row(KeyboardButton(text="0"), KeyboardButton(text="10"), KeyboardButton(text="30"),
@@ -139,6 +275,7 @@ def reward_amount(cancel_btn: str) -> ReplyKeyboardMarkup:
     return keyboard
 
 
+@cached_keyboard
 def purchase_amount(cancel_btn: str) -> ReplyKeyboardMarkup:
     keyboard = ReplyKeyboardMarkup(resize_keyboard=True, row_width=3)
     keyboard.row(KeyboardButton(text="50"), KeyboardButton(text="100"), KeyboardButton(text="200"),
@@ -147,13 +284,16 @@ def purchase_amount(cancel_btn: str) -> ReplyKeyboardMarkup:
     return keyboard
 
 
-def empty_inline():
+@cached_keyboard
+def empty_inline() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup()
 
 
-def empty_reply():
+@cached_keyboard
+def empty_reply() -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup()
 
 
-def remove_reply():
+@cached_keyboard
+def remove_reply() -> ReplyKeyboardRemove:
     return ReplyKeyboardRemove()
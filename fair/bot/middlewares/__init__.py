@@ -4,6 +4,12 @@ from telebot import TeleBot
 
 from fair.db import DBAdapter
 from fair.config import MessagesConfig, ButtonsConfig
+from fair.utils import LRUCache
+
+from fair.bot.api_queue import ApiQueue
+from fair.bot.outbound import OutboundDispatcher
+from fair.bot.queue_notifier import QueueNotifier
+from fair.bot.rate_limiter import MemoryRateLimiter, RedisRateLimiter
 
 from fair.bot.middlewares.message_antiflood import MessageAntiFloodMiddleware
 from fair.bot.middlewares.callback_query_antiflood import CallbackQueryAntiFloodMiddleware
@@ -13,14 +19,28 @@ from fair.bot.middlewares.extra_arguments import ExtraArgumentsMiddleware
 def setup_middlewares(
         bot: TeleBot,
         timeout_message: str,
-        timeout: float,
+        limiter: MemoryRateLimiter | RedisRateLimiter,
         db_adapter: DBAdapter,
         messages: MessagesConfig,
         buttons: ButtonsConfig,
         logger: logging.Logger,
-        page_size: int):
+        page_size: int,
+        inline_cache: LRUCache,
+        api_queue: ApiQueue,
+        outbound: OutboundDispatcher,
+        queue_notifier: QueueNotifier):
     # setup all middlewares here
-    bot.setup_middleware(MessageAntiFloodMiddleware(bot, timeout_message, timeout))
-    bot.setup_middleware(CallbackQueryAntiFloodMiddleware(bot, timeout_message, timeout))
-    bot.setup_middleware(ExtraArgumentsMiddleware(db_adapter, messages, buttons, logger, page_size))
+    bot.setup_middleware(MessageAntiFloodMiddleware(bot, timeout_message, limiter, outbound))
+    bot.setup_middleware(CallbackQueryAntiFloodMiddleware(bot, timeout_message, limiter, api_queue))
+    bot.setup_middleware(ExtraArgumentsMiddleware(
+        db_adapter,
+        messages,
+        buttons,
+        logger,
+        page_size,
+        inline_cache,
+        api_queue,
+        outbound,
+        queue_notifier
+    ))
     pass
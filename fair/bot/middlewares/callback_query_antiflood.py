@@ -1,32 +1,32 @@
-import time
-
 from telebot import TeleBot
 from telebot.types import CallbackQuery
 from telebot.handler_backends import BaseMiddleware, CancelUpdate
 
+from fair.bot.api_queue import ApiQueue
+from fair.bot.rate_limiter import MemoryRateLimiter, RedisRateLimiter
+
 
 class CallbackQueryAntiFloodMiddleware(BaseMiddleware):
-    def __init__(self, bot: TeleBot, timeout_message: str, timeout: float):
+    def __init__(
+            self,
+            bot: TeleBot,
+            timeout_message: str,
+            limiter: MemoryRateLimiter | RedisRateLimiter,
+            api_queue: ApiQueue):
         super().__init__()
         self.bot = bot
         self.timeout_message = timeout_message
-        self.timeout = timeout
+        self.limiter = limiter
+        self.api_queue = api_queue
         self.update_types = ['callback_query']
-        self.last_query = {}
 
     # argument naming is kept from the base class to avoid possible errors if passed as kwargs
     def pre_process(self, message: CallbackQuery, data: dict):
-        now = time.time()
-        if message.from_user.id not in self.last_query:
-            self.last_query[message.from_user.id] = now
-            self.bot.answer_callback_query(message.id)  # always answer callback query
-            return
-        if now - self.last_query[message.from_user.id] < self.timeout:
-            self.last_query[message.from_user.id] = now
-            self.bot.answer_callback_query(message.id, self.timeout_message, show_alert=True)
+        if not self.limiter.hit(f'callback_query:{message.from_user.id}'):
+            self.api_queue.submit(self.bot.answer_callback_query, message.id, self.timeout_message, show_alert=True)
             return CancelUpdate()
-        self.last_query[message.from_user.id] = now
-        self.bot.answer_callback_query(message.id)  # always answer callback query
+        # always answer callback query, the handler doesn't wait for it
+        self.api_queue.submit(self.bot.answer_callback_query, message.id)
 
     # argument naming is kept from the base class to avoid possible errors if passed as kwargs
     def post_process(self, message: CallbackQuery, data: dict, exception: BaseException):
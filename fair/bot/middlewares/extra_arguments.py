@@ -3,6 +3,11 @@ import logging
 from telebot.handler_backends import BaseMiddleware
 
 from fair.config import MessagesConfig, ButtonsConfig
+from fair.utils import LRUCache
+
+from fair.bot.api_queue import ApiQueue
+from fair.bot.outbound import OutboundDispatcher
+from fair.bot.queue_notifier import QueueNotifier
 from fair.db import DBAdapter
 
 
@@ -13,14 +18,22 @@ class ExtraArgumentsMiddleware(BaseMiddleware):
             messages: MessagesConfig,
             buttons: ButtonsConfig,
             logger: logging.Logger,
-            page_size: int):
+            page_size: int,
+            inline_cache: LRUCache,
+            api_queue: ApiQueue,
+            outbound: OutboundDispatcher,
+            queue_notifier: QueueNotifier):
         super().__init__()
         self.db_adapter = db_adapter
         self.messages = messages
         self.buttons = buttons
         self.logger = logger
         self.page_size = page_size
-        self.update_types = ['message', 'callback_query']
+        self.inline_cache = inline_cache
+        self.api_queue = api_queue
+        self.outbound = outbound
+        self.queue_notifier = queue_notifier
+        self.update_types = ['message', 'callback_query', 'inline_query']
 
     def pre_process(self, message, data: dict):
         # passing extra arguments to handlers
@@ -29,6 +42,10 @@ class ExtraArgumentsMiddleware(BaseMiddleware):
         data['buttons'] = self.buttons
         data['logger'] = self.logger
         data['page_size'] = self.page_size
+        data['inline_cache'] = self.inline_cache
+        data['api_queue'] = self.api_queue
+        data['outbound'] = self.outbound
+        data['queue_notifier'] = self.queue_notifier
 
     def post_process(self, message, data: dict, exception: BaseException):
         pass
@@ -2,25 +2,28 @@ from telebot import TeleBot
 from telebot.types import Message
 from telebot.handler_backends import BaseMiddleware, CancelUpdate
 
+from fair.bot.outbound import OutboundDispatcher, Priority
+from fair.bot.rate_limiter import MemoryRateLimiter, RedisRateLimiter
+
 
 class MessageAntiFloodMiddleware(BaseMiddleware):
-    def __init__(self, bot: TeleBot, timeout_message: str, timeout: float):
+    def __init__(
+            self,
+            bot: TeleBot,
+            timeout_message: str,
+            limiter: MemoryRateLimiter | RedisRateLimiter,
+            outbound: OutboundDispatcher):
         super().__init__()
         self.bot = bot
         self.timeout_message = timeout_message
-        self.timeout = timeout
-        self.last_message = {}
+        self.limiter = limiter
+        self.outbound = outbound
         self.update_types = ['message']
 
     def pre_process(self, message: Message, data: dict):
-        if message.from_user.id not in self.last_message:
-            self.last_message[message.from_user.id] = message.date
-            return
-        if message.date - self.last_message[message.from_user.id] < self.timeout:
-            self.last_message[message.from_user.id] = message.date
-            self.bot.send_message(message.chat.id, self.timeout_message)
+        if not self.limiter.hit(f'message:{message.from_user.id}'):
+            self.outbound.submit(self.bot.send_message, message.chat.id, self.timeout_message, priority=Priority.LOW)
             return CancelUpdate()
-        self.last_message[message.from_user.id] = message.date
 
     def post_process(self, message: Message, data: dict, exception: BaseException):
         pass
@@ -0,0 +1,302 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Callable, Optional
+
+from telebot.apihelper import ApiTelegramException
+from telebot.asyncio_helper import ApiTelegramException as AsyncApiTelegramException
+
+from fair.config import BotOutboundConfig
+
+from fair.bot.api_queue import BaseApiQueue
+
+
+# Outbound dispatcher shapes the bot's messages to Telegram's limits instead of getting 429 errors:
+# a global token bucket (~30 messages per second) and a per-chat one (~1 message per second with short bursts).
+# Messages of a chat are sent one by one in the submission order, the chats compete for the global bucket
+# by the priority of their next message, thus confirmations go before help texts under the load.
+# 429 errors postpone the chat by the retry_after, consecutive edits of the same message are coalesced
+
+MAX_ATTEMPTS = 3
+COALESCED_METHODS = {'edit_message_text', 'edit_message_reply_markup'}
+
+
+class Priority(IntEnum):
+    HIGH = 0  # balance, transfer, reward and purchase confirmations
+    NORMAL = 1
+    LOW = 2  # help texts, flood warnings
+
+
+class OutboundItem:
+    __slots__ = ('method', 'chat_id', 'args', 'kwargs', 'priority', 'submitted_at', 'attempts')
+
+    def __init__(self, method: Callable, chat_id: int, args: tuple, kwargs: dict, priority: Priority, now: float):
+        self.method = method
+        self.chat_id = chat_id
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.submitted_at = now
+        self.attempts = 0
+
+    def message_id(self) -> Optional[int]:
+        return inspect.signature(self.method).bind_partial(*self.args, **self.kwargs).arguments.get('message_id')
+
+
+def get_chat_id(method: Callable, args: tuple, kwargs: dict) -> int:
+    # chat_id is passed both positionally and as keyword by the handlers, e.g. edit_message_text(text, chat_id, ...)
+    return inspect.signature(method).bind_partial(*args, **kwargs).arguments['chat_id']
+
+
+def get_retry_after(e: Exception) -> Optional[float]:
+    if isinstance(e, (ApiTelegramException, AsyncApiTelegramException)) and e.error_code == 429:
+        return e.result_json.get('parameters', {}).get('retry_after', 1)
+    return None
+
+
+class OutboundScheduler:
+    # not thread safe, IO free core shared by the sync and async dispatchers.
+    # both buckets are GCRA ones, thus only the theoretical arrival time (tat) is kept per chat
+
+    def __init__(self, config: BotOutboundConfig):
+        self.global_interval = 1 / config.global_rate
+        self.chat_interval = 1 / config.chat_rate
+        self.chat_tolerance = self.chat_interval * (config.chat_burst - 1)
+        self.max_size = config.queue_size
+        self.size = 0
+        self.coalesced = 0
+        self._global_tat = 0.0
+        self._chats: dict[int, deque[OutboundItem]] = {}
+        self._chat_tats: dict[int, float] = {}
+        self._blocked_until: dict[int, float] = {}
+        self._in_flight: set[int] = set()
+        self._ready: list[tuple[int, int, int]] = []  # (priority, seq, chat_id)
+        self._delayed: list[tuple[float, int, int]] = []  # (not before, seq, chat_id)
+        self._seq = itertools.count()
+
+    def _schedule(self, chat_id: int, now: float):
+        not_before = max(self._chat_tats.get(chat_id, now) - self.chat_tolerance, self._blocked_until.get(chat_id, now))
+        if not_before <= now:
+            heapq.heappush(self._ready, (self._chats[chat_id][0].priority, next(self._seq), chat_id))
+        else:
+            heapq.heappush(self._delayed, (not_before, next(self._seq), chat_id))
+
+    def _coalesce(self, queue: deque[OutboundItem], item: OutboundItem) -> bool:
+        # only the last pending item is replaced, thus the order of the chat's messages is kept
+        if not queue or item.method.__name__ not in COALESCED_METHODS:
+            return False
+        last = queue[-1]
+        if last.method.__name__ != item.method.__name__ or last.message_id() != item.message_id():
+            return False
+        last.args, last.kwargs = item.args, item.kwargs
+        last.priority = min(last.priority, item.priority)
+        self.coalesced += 1
+        return True
+
+    def push(self, item: OutboundItem, now: float) -> bool:
+        queue = self._chats.get(item.chat_id)
+        if queue is not None and self._coalesce(queue, item):
+            return True
+        if self.size >= self.max_size:
+            return False
+        if queue is None:
+            queue = self._chats[item.chat_id] = deque()
+        queue.append(item)
+        self.size += 1
+        if len(queue) == 1 and item.chat_id not in self._in_flight:
+            self._schedule(item.chat_id, now)
+        return True
+
+    def pop(self, now: float) -> tuple[Optional[OutboundItem], Optional[float]]:
+        # returns the item to send now, otherwise the seconds to wait for the next one (None if there is none)
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, chat_id = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready, (self._chats[chat_id][0].priority, next(self._seq), chat_id))
+        if not self._ready:
+            return None, self._delayed[0][0] - now if self._delayed else None
+        if self._global_tat > now:
+            return None, self._global_tat - now
+        _, _, chat_id = heapq.heappop(self._ready)
+        item = self._chats[chat_id].popleft()
+        self.size -= 1
+        self._global_tat = max(self._global_tat, now) + self.global_interval
+        self._chat_tats[chat_id] = max(self._chat_tats.get(chat_id, now), now) + self.chat_interval
+        self._blocked_until.pop(chat_id, None)
+        self._in_flight.add(chat_id)
+        return item, None
+
+    def done(self, item: OutboundItem, now: float, retry_after: Optional[float] = None):
+        chat_id = item.chat_id
+        self._in_flight.discard(chat_id)
+        queue = self._chats[chat_id]
+        if retry_after is not None:
+            self._blocked_until[chat_id] = now + retry_after
+            queue.appendleft(item)
+            self.size += 1
+        if queue:
+            self._schedule(chat_id, now)
+            return
+        del self._chats[chat_id]
+        if self._chat_tats[chat_id] <= now + self.chat_tolerance:
+            # the chat's bucket allows the next message right away, thus it is the same as absent
+            del self._chat_tats[chat_id]
+        elif len(self._chat_tats) > 2 * len(self._chats) + 1024:
+            self._chat_tats = {
+                chat_id_: tat for chat_id_, tat in self._chat_tats.items()
+                if chat_id_ in self._chats or tat > now + self.chat_tolerance
+            }
+
+    def is_idle(self) -> bool:
+        return self.size == 0 and not self._in_flight
+
+
+class BaseOutboundDispatcher(BaseApiQueue):
+    def __init__(self, logger: logging.Logger, config: BotOutboundConfig):
+        super().__init__(logger, config.workers, config.queue_size)
+        self.scheduler = OutboundScheduler(config)
+        self.retries = 0
+
+    def _item(self, method: Callable, args: tuple, kwargs: dict, priority: Priority) -> OutboundItem:
+        return OutboundItem(method, get_chat_id(method, args, kwargs), args, kwargs, priority, time.monotonic())
+
+    def _sent(self, item: OutboundItem, e: Optional[Exception]) -> Optional[float]:
+        # returns the retry_after if the item has to be sent again
+        item.attempts += 1
+        retry_after = get_retry_after(e) if e is not None else None
+        if retry_after is not None and item.attempts < MAX_ATTEMPTS:
+            self.retries += 1
+            return retry_after
+        if e is not None:
+            self._call_failed(item.method.__name__, e)
+        # latency is measured from the submission, thus it includes the time spent in the queue
+        self._record(item.method.__name__, time.monotonic() - item.submitted_at, e is not None)
+        return None
+
+    def qsize(self) -> int:
+        return self.scheduler.size
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats['retries'] = self.retries
+        stats['coalesced'] = self.scheduler.coalesced
+        return stats
+
+
+class OutboundDispatcher(BaseOutboundDispatcher):
+    # a single scheduler thread hands the items over to the pool of the sender threads
+
+    def __init__(self, logger: logging.Logger, config: BotOutboundConfig):
+        super().__init__(logger, config)
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, method: Callable, *args, priority: Priority = Priority.NORMAL, **kwargs):
+        # method is the bound bot method, e.g. bot.send_message, arguments are passed as is
+        item = self._item(method, args, kwargs, priority)
+        with self._condition:
+            pushed = self.scheduler.push(item, time.monotonic())
+            self._condition.notify()
+        if not pushed:
+            self._queue_full(method.__name__)
+
+    def _send(self, item: OutboundItem):
+        e = None
+        try:
+            item.method(*item.args, **item.kwargs)
+        except Exception as e_:
+            e = e_
+        retry_after = self._sent(item, e)
+        with self._condition:
+            self.scheduler.done(item, time.monotonic(), retry_after)
+            self._condition.notify()
+
+    def _run(self):
+        with self._condition:
+            while not (self._stopping and self.scheduler.is_idle()):
+                item, wait = self.scheduler.pop(time.monotonic())
+                if item is None:
+                    self._condition.wait(wait)
+                else:
+                    self._executor.submit(self._send, item)
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='OutboundSender')
+        self._thread = threading.Thread(target=self._run, name='OutboundScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5):
+        # pending messages are sent before the dispatcher stops
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+        self._thread = None
+
+
+class AsyncOutboundDispatcher(BaseOutboundDispatcher):
+    # asyncio counterpart of the OutboundDispatcher, submit is not a coroutine, thus it never blocks the handler
+
+    def __init__(self, logger: logging.Logger, config: BotOutboundConfig):
+        super().__init__(logger, config)
+        self._wakeup = asyncio.Event()
+        self._senders = asyncio.Semaphore(config.workers)
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._send_tasks: set[asyncio.Task] = set()
+
+    def submit(self, method: Callable, *args, priority: Priority = Priority.NORMAL, **kwargs):
+        # method is the bound bot method, e.g. bot.send_message, arguments are passed as is
+        item = self._item(method, args, kwargs, priority)
+        if not self.scheduler.push(item, time.monotonic()):
+            self._queue_full(method.__name__)
+        self._wakeup.set()
+
+    async def _send(self, item: OutboundItem):
+        e = None
+        async with self._senders:
+            try:
+                await item.method(*item.args, **item.kwargs)
+            except Exception as e_:
+                e = e_
+        retry_after = self._sent(item, e)
+        self.scheduler.done(item, time.monotonic(), retry_after)
+        self._wakeup.set()
+
+    async def _run(self):
+        while not (self._stopping and self.scheduler.is_idle()):
+            item, wait = self.scheduler.pop(time.monotonic())
+            if item is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                task = asyncio.create_task(self._send(item))
+                self._send_tasks.add(task)
+                task.add_done_callback(self._send_tasks.discard)
+
+    def start(self):
+        # must be called from the running event loop
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: Optional[float] = 5):
+        # pending messages are sent before the dispatcher stops
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.wait([self._task], timeout=timeout)
+        self._task = None
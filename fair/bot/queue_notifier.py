@@ -0,0 +1,227 @@
+import logging
+import math
+import threading
+from typing import Optional
+
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+from telebot import TeleBot
+from telebot.async_telebot import AsyncTeleBot
+
+from fair.config import MessagesConfig
+from fair.db import DBAdapter, AsyncDBAdapter, DBError
+from fair.utils import LRUCache
+
+from fair.bot.outbound import OutboundDispatcher, AsyncOutboundDispatcher
+
+
+# Queue notifier pushes a message to the players reaching one of the notified positions, e.g. "you're next",
+# thus they don't have to poll "My queue". It is computed incrementally: when the queue moves, i.e. a player
+# leaves it, only the head window of the queue is read and only if the player was in the window.
+# Positions are counted among the players who are not called yet, as the called ones wait for the manager,
+# thus calling a player moves the queue as well. Players are notified once per position.
+# Messages are sent by the outbound dispatcher, thus they are rate shaped along with the rest of the messages.
+# Positions the players were notified at are kept in the Redis of the queue engine if it is set, thus they are shared
+# by the workers, otherwise they are per worker and the notifier must only be used with a single worker.
+# Redis errors are logged and the positions kept by the worker are used instead
+
+NOTIFIED_CACHE_SIZE = 100000
+NOTIFIED_TTL = 24 * 60 * 60  # seconds a notified position is kept in Redis, players who never left the queue age out
+
+# KEYS are the notified keys of the candidates, ARGV[1] is the TTL and ARGV[i + 1] is the position of KEYS[i],
+# returns the indexes of the candidates to notify, checked and set at once, thus a player is notified by one worker
+_REDIS_SELECT = """
+local selected = {}
+for i, key in ipairs(KEYS) do
+    local position = tonumber(ARGV[i + 1])
+    local notified_at = tonumber(redis.call('GET', key))
+    if not notified_at or notified_at > position then
+        redis.call('SET', key, position, 'EX', ARGV[1])
+        table.insert(selected, i)
+    end
+end
+return selected
+"""
+
+
+class BaseQueueNotifier:
+    def __init__(self, positions: tuple[int, ...], logger: logging.Logger, prefix: str = ''):
+        self.positions = frozenset(positions)  # 1 is the head of the queue
+        self.window = max(positions, default=0)
+        self.logger = logger
+        self.prefix = prefix
+        # tg chat id -> last position the player was notified at, used if Redis is not set or fails
+        self.notified = LRUCache(NOTIFIED_CACHE_SIZE, math.inf)
+        self._lock = threading.Lock()
+        self.moves = 0
+        self.sent = 0
+
+    def is_affected(self, position: int) -> bool:
+        # position is the number of the not called players ahead of the one who left the queue or was called,
+        # the players behind it moved
+        return position < self.window
+
+    def _notified_key(self, chat_id: int) -> str:
+        return f'{self.prefix}queue_notified:{chat_id}'
+
+    def _candidates(self, head: list[int]) -> list[tuple[int, int]]:
+        # (tg chat id, position) of the players at the notified positions, head is the tg chat ids
+        # of the not called players
+        return [(chat_id, index + 1) for index, chat_id in enumerate(head) if index + 1 in self.positions]
+
+    def _select_local(self, candidates: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        selected = []
+        with self._lock:
+            for chat_id, position in candidates:
+                notified_at = self.notified.get(chat_id)
+                if notified_at is not None and notified_at <= position:
+                    continue
+                self.notified.set(chat_id, position)
+                selected.append((chat_id, position))
+        return selected
+
+    def _count(self, selected: list[tuple[int, int]]):
+        with self._lock:
+            self.moves += 1
+            self.sent += len(selected)
+
+    def get_stats(self) -> dict:
+        return {
+            'positions': sorted(self.positions),
+            'shared': self.redis is not None,
+            'tracked': len(self.notified),  # by this worker
+            'moves': self.moves,
+            'sent': self.sent,
+        }
+
+
+class QueueNotifier(BaseQueueNotifier):
+    def __init__(
+            self,
+            positions: tuple[int, ...],
+            logger: logging.Logger,
+            redis: Optional[Redis] = None,
+            prefix: str = ''):
+        super().__init__(positions, logger, prefix)
+        self.redis = redis
+        if redis is not None:
+            self._select_script = redis.register_script(_REDIS_SELECT)
+
+    def select(self, head: list[int]) -> list[tuple[int, int]]:
+        # (tg chat id, position) of the players to notify, head is the tg chat ids of the not called players
+        candidates = self._candidates(head)
+        selected = None
+        if candidates and self.redis is not None:
+            try:
+                indexes = self._select_script(
+                    keys=[self._notified_key(chat_id) for chat_id, _ in candidates],
+                    args=[NOTIFIED_TTL, *(position for _, position in candidates)]
+                )
+                selected = [candidates[int(index) - 1] for index in indexes]
+            except RedisError as e:
+                self.logger.warning(e)
+        if selected is None:
+            selected = self._select_local(candidates)
+        self._count(selected)
+        return selected
+
+    def forget(self, chat_id: int):
+        # the player left the queue, thus it is notified again once it queues up
+        self.notified.delete(chat_id)
+        if self.redis is None:
+            return
+        try:
+            self.redis.delete(self._notified_key(chat_id))
+        except RedisError as e:
+            self.logger.warning(e)
+
+    def queue_moved(
+            self,
+            bot: TeleBot,
+            db_adapter: DBAdapter,
+            outbound: OutboundDispatcher,
+            messages: MessagesConfig,
+            location_id: int,
+            location_name: str,
+            position: int):
+        # location and position of the player who left the queue or was called
+        if not self.is_affected(position):
+            return
+        try:
+            head = db_adapter.get_queue_head_by_location_id(location_id, self.window)
+        except DBError as e:
+            self.logger.error(e)
+            return
+        for chat_id, chat_position in self.select(head):
+            outbound.submit(
+                bot.send_message,
+                chat_id,
+                messages.queue_turn_approaching.format(chat_position, location_name)
+            )
+
+
+class AsyncQueueNotifier(BaseQueueNotifier):
+    # asyncio counterpart of the QueueNotifier
+
+    def __init__(
+            self,
+            positions: tuple[int, ...],
+            logger: logging.Logger,
+            redis: Optional[AsyncRedis] = None,
+            prefix: str = ''):
+        super().__init__(positions, logger, prefix)
+        self.redis = redis
+        if redis is not None:
+            self._select_script = redis.register_script(_REDIS_SELECT)
+
+    async def select(self, head: list[int]) -> list[tuple[int, int]]:
+        # (tg chat id, position) of the players to notify, head is the tg chat ids of the not called players
+        candidates = self._candidates(head)
+        selected = None
+        if candidates and self.redis is not None:
+            try:
+                indexes = await self._select_script(
+                    keys=[self._notified_key(chat_id) for chat_id, _ in candidates],
+                    args=[NOTIFIED_TTL, *(position for _, position in candidates)]
+                )
+                selected = [candidates[int(index) - 1] for index in indexes]
+            except RedisError as e:
+                self.logger.warning(e)
+        if selected is None:
+            selected = self._select_local(candidates)
+        self._count(selected)
+        return selected
+
+    async def forget(self, chat_id: int):
+        # the player left the queue, thus it is notified again once it queues up
+        self.notified.delete(chat_id)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(self._notified_key(chat_id))
+        except RedisError as e:
+            self.logger.warning(e)
+
+    async def queue_moved(
+            self,
+            bot: AsyncTeleBot,
+            db_adapter: AsyncDBAdapter,
+            outbound: AsyncOutboundDispatcher,
+            messages: MessagesConfig,
+            location_id: int,
+            location_name: str,
+            position: int):
+        # location and position of the player who left the queue or was called
+        if not self.is_affected(position):
+            return
+        try:
+            head = await db_adapter.get_queue_head_by_location_id(location_id, self.window)
+        except DBError as e:
+            self.logger.error(e)
+            return
+        for chat_id, chat_position in await self.select(head):
+            outbound.submit(
+                bot.send_message,
+                chat_id,
+                messages.queue_turn_approaching.format(chat_position, location_name)
+            )
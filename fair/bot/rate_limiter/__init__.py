@@ -0,0 +1,4 @@
+from fair.bot.rate_limiter.limiter import MemoryRateLimiter, RedisRateLimiter, setup_rate_limiter
+from fair.bot.rate_limiter.asyncio_limiter import (
+    AsyncMemoryRateLimiter, AsyncRedisRateLimiter, setup_async_rate_limiter
+)
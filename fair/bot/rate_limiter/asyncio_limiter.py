@@ -0,0 +1,70 @@
+import logging
+import time
+from typing import Optional
+
+from redis import RedisError
+from redis.asyncio import Redis as AsyncRedis
+
+from fair.config import BotRateLimiterConfig
+
+from fair.bot.rate_limiter.limiter import GCRA_SCRIPT, MemoryRateLimiter
+
+
+class AsyncMemoryRateLimiter(MemoryRateLimiter):
+    # asyncio counterpart of the MemoryRateLimiter, the state is never blocking, thus is shared
+
+    async def hit(self, key: str) -> bool:
+        return self._hit(key, time.monotonic())
+
+
+class AsyncRedisRateLimiter:
+    # asyncio counterpart of the RedisRateLimiter
+
+    def __init__(self, redis: AsyncRedis, interval: float, burst: int, logger: logging.Logger, prefix: str = ''):
+        self.redis = redis
+        self.interval_ms = max(1, round(interval * 1000))
+        self.burst = burst
+        self.logger = logger
+        self.prefix = prefix
+        self.allowed = 0
+        self.rejected = 0
+        self._script = redis.register_script(GCRA_SCRIPT)
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}flood:{key}'
+
+    async def hit(self, key: str) -> bool:
+        try:
+            allowed = bool(await self._script(keys=[self._key(key)], args=[self.interval_ms, self.burst]))
+        except RedisError as e:
+            self.logger.warning(e)
+            allowed = True
+        if allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return allowed
+
+    def get_stats(self) -> dict:
+        return {
+            'backend': 'redis',
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+        }
+
+
+def setup_async_rate_limiter(
+        limiter_config: Optional[BotRateLimiterConfig],
+        interval: float,
+        logger: logging.Logger):
+    if limiter_config is None:
+        limiter_config = BotRateLimiterConfig(type='memory')
+    if limiter_config.type == 'memory':
+        return AsyncMemoryRateLimiter(interval, limiter_config.burst, limiter_config.max_size)
+    redis = AsyncRedis(
+        host=limiter_config.redis.host,
+        port=limiter_config.redis.port,
+        db=limiter_config.redis.db,
+        password=limiter_config.redis.password
+    )
+    return AsyncRedisRateLimiter(redis, interval, limiter_config.burst, logger, limiter_config.redis.prefix)
@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from redis import Redis, RedisError
+
+from fair.config import BotRateLimiterConfig
+
+
+# Token bucket implemented as GCRA (generic cell rate algorithm): the only value kept per key
+# is the theoretical arrival time (tat) of the next action, the bucket is full again once tat <= now,
+# thus keys older than that are equivalent to absent ones and are safe to drop.
+# `burst` actions are allowed at once, then one action per `interval` seconds
+
+# KEYS[1] - key, ARGV[1] - interval in ms, ARGV[2] - burst; returns 1 if the action is allowed, otherwise 0.
+# Server time is used, thus all the workers share the same clock
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + math.floor(now_parts[2] / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = interval * (tonumber(ARGV[2]) - 1)
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+if tat - now > tolerance then
+    return 0
+end
+tat = tat + interval
+redis.call('SET', KEYS[1], tat, 'PX', tat - now)
+return 1
+"""
+
+
+class MemoryRateLimiter:
+    # per-process limiter, keys are kept in a ring of time buckets, each one holds the keys hit during its span.
+    # a key lives at most burst * interval seconds after its last allowed action, thus the spans are chosen so
+    # that the oldest bucket only holds the full again buckets and is dropped as a whole when the ring turns.
+    # memory is proportional to the users active in the last burst * interval seconds, not to all the users ever seen
+
+    RING_SIZE = 4
+
+    def __init__(self, interval: float, burst: int, max_size: int):
+        self.interval = interval
+        self.tolerance = interval * (burst - 1)
+        self.max_size = max_size
+        self.span = max(interval * burst, 1e-3) / (self.RING_SIZE - 1)
+        self.allowed = 0
+        self.rejected = 0
+        self._ring: list[dict] = [{} for _ in range(self.RING_SIZE)]
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _turn(self, now: float):
+        epoch = int(now / self.span)
+        for stale in range(max(self._epoch + 1, epoch - self.RING_SIZE + 1), epoch + 1):
+            self._ring[stale % self.RING_SIZE].clear()
+        self._epoch = max(self._epoch, epoch)
+
+    def _pop(self, key: str) -> Optional[float]:
+        # the newest bucket goes first, as the active users are usually found there
+        for offset in range(self.RING_SIZE):
+            bucket = self._ring[(self._epoch - offset) % self.RING_SIZE]
+            if key in bucket:
+                return bucket.pop(key)
+        return None
+
+    def _hit(self, key: str, now: float) -> bool:
+        with self._lock:
+            self._turn(now)
+            previous_tat = self._pop(key)
+            tat = now if previous_tat is None or previous_tat < now else previous_tat
+            current = self._ring[self._epoch % self.RING_SIZE]
+            if tat - now > self.tolerance:
+                current[key] = previous_tat
+                self.rejected += 1
+                return False
+            current[key] = tat + self.interval
+            self.allowed += 1
+            if len(self) > self.max_size:
+                # under the overload the oldest keys are forgotten early, it only makes the limiter more lenient.
+                # the current bucket goes last, it is only cleared if it alone holds more than max_size keys
+                for offset in range(self.RING_SIZE - 1, -1, -1):
+                    self._ring[(self._epoch - offset) % self.RING_SIZE].clear()
+                    if len(self) <= self.max_size:
+                        break
+            return True
+
+    def hit(self, key: str) -> bool:
+        return self._hit(key, time.monotonic())
+
+    def get_stats(self) -> dict:
+        return {
+            'backend': 'memory',
+            'size': len(self),
+            'max_size': self.max_size,
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+        }
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._ring)
+
+
+class RedisRateLimiter:
+    # limiter shared across the workers, Redis errors are logged and the action is allowed,
+    # as the flood protection should never lock the users out of the bot
+
+    def __init__(self, redis: Redis, interval: float, burst: int, logger: logging.Logger, prefix: str = ''):
+        self.redis = redis
+        self.interval_ms = max(1, round(interval * 1000))
+        self.burst = burst
+        self.logger = logger
+        self.prefix = prefix
+        self.allowed = 0
+        self.rejected = 0
+        self._script = redis.register_script(GCRA_SCRIPT)
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}flood:{key}'
+
+    def hit(self, key: str) -> bool:
+        try:
+            allowed = bool(self._script(keys=[self._key(key)], args=[self.interval_ms, self.burst]))
+        except RedisError as e:
+            self.logger.warning(e)
+            allowed = True
+        if allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return allowed
+
+    def get_stats(self) -> dict:
+        # keys are shared by the workers and expire in Redis, thus only this worker's counters are reported
+        return {
+            'backend': 'redis',
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+        }
+
+
+def setup_rate_limiter(
+        limiter_config: Optional[BotRateLimiterConfig],
+        interval: float,
+        logger: logging.Logger):
+    if limiter_config is None:
+        limiter_config = BotRateLimiterConfig(type='memory')
+    if limiter_config.type == 'memory':
+        return MemoryRateLimiter(interval, limiter_config.burst, limiter_config.max_size)
+    redis = Redis(
+        host=limiter_config.redis.host,
+        port=limiter_config.redis.port,
+        db=limiter_config.redis.db,
+        password=limiter_config.redis.password
+    )
+    return RedisRateLimiter(redis, interval, limiter_config.burst, logger, limiter_config.redis.prefix)
@@ -0,0 +1,218 @@
+from typing import Callable, Optional
+
+from telebot import TeleBot, util
+from telebot.async_telebot import AsyncTeleBot
+from telebot.handler_backends import State
+from telebot.types import CallbackQuery, Message, User
+
+from fair.utils import dummy_true
+
+from fair.bot.states.storage import PipelinedRedisStateStorage
+from fair.bot.states.asyncio_storage import AsyncPipelinedRedisStateStorage
+
+
+# Handler router precompiles the registered handlers into hash tables, thus an update is matched against
+# the few handlers registered for its callback data, text or command and its state instead of testing
+# the filters of every handler one by one. Candidates keep the registration order, thus the first matching
+# handler is the same as telebot's one. Filters the lookup guarantees are dropped from the candidates,
+# the rest (content types, is_digit and alike) are still tested by telebot.
+# Handlers have to be registered with the custom filters already added, routes are compiled once they are
+
+# indexed filters in the order of preference, a handler is indexed by the first one it has
+INDEXED_FILTERS = ('cb_data', 'text_equals', 'commands', 'cb_data_pagination')
+ANY_STATE = None
+
+
+def callback_query_route_keys(call: CallbackQuery) -> list[tuple[str, str]]:
+    if call.data is None:
+        return []
+    keys = [('cb_data', call.data)]
+    # cb_data_pagination matches the data starting with the value and a '#' right after it
+    position = call.data.find('#')
+    while position != -1:
+        keys.append(('cb_data_pagination', call.data[:position]))
+        position = call.data.find('#', position + 1)
+    return keys
+
+
+def message_route_keys(message: Message) -> list[tuple[str, str]]:
+    if message.content_type != 'text':
+        return []
+    return [('text_equals', message.text), ('commands', util.extract_command(message.text))]
+
+
+def get_state_names(value) -> Optional[frozenset]:
+    # state filter value -> state names it allows, ANY_STATE if all of them
+    if value is None or value == '*':
+        return ANY_STATE
+    if not isinstance(value, list):
+        value = [value]
+    return frozenset(state.name if isinstance(state, State) else state for state in value)
+
+
+def get_state_ids(update: Message | CallbackQuery) -> Optional[tuple[int, int]]:
+    # same chat and user as the state filter uses, None if the update has no chat
+    if isinstance(update, CallbackQuery):
+        return (update.message.chat.id, update.from_user.id) if update.message is not None else None
+    return update.chat.id, update.from_user.id
+
+
+class Route:
+    # candidates of a lookup key, split by the state they are registered for
+    __slots__ = ('by_state', 'any_state')
+
+    def __init__(self, entries: list[tuple[int, Optional[frozenset], dict]]):
+        # entries are (registration order, state names, handler)
+        entries = sorted(entries, key=lambda entry: entry[0])
+        states = set().union(*(names for _, names, _ in entries if names is not ANY_STATE))
+        self.by_state: dict[Optional[str], list[dict]] = {
+            state: [handler for _, names, handler in entries if names is ANY_STATE or state in names]
+            for state in states
+        }
+        self.any_state = [handler for _, names, handler in entries if names is ANY_STATE]
+
+    def needs_state(self) -> bool:
+        return bool(self.by_state)
+
+    def select(self, state: Optional[str]) -> list[dict]:
+        return self.by_state.get(state, self.any_state)
+
+
+class HandlerRouter:
+    def __init__(self, handlers: list[dict], route_keys: Callable, custom_filters: dict):
+        self.handlers = handlers
+        self.size = len(handlers)
+        self.route_keys = route_keys
+        indexed = [key for key in INDEXED_FILTERS if key == 'commands' or key in custom_filters]
+        index_state = 'state' in custom_filters
+        keyed: dict[tuple[str, str], list] = {}
+        self._generic: list[tuple[int, Optional[frozenset], dict]] = []
+        for order, handler in enumerate(handlers):
+            filters = handler['filters']
+            kind = next((key for key in indexed if filters.get(key) is not None), None)
+            names = get_state_names(filters.get('state')) if index_state else ANY_STATE
+            dropped = {kind, 'state'} if index_state else {kind}
+            entry = (order, names, self._strip(handler, dropped))
+            if kind is None:
+                self._generic.append(entry)
+                continue
+            values = filters[kind] if kind == 'commands' else [filters[kind]]
+            for value in values:
+                keyed.setdefault((kind, value), []).append(entry)
+        # generic handlers are candidates for every update, thus they are merged into each route beforehand
+        self._routes = {key: Route(entries + self._generic) for key, entries in keyed.items()}
+        self._keyed = keyed
+        self._generic_route = Route(self._generic)
+        # routes of the updates matching several keys at once, e.g. both cb_data and cb_data_pagination
+        self._merged: dict[tuple, Route] = {}
+
+    @staticmethod
+    def _strip(handler: dict, dropped: set) -> dict:
+        filters = {
+            key: value for key, value in handler['filters'].items()
+            if key not in dropped and not (key == 'func' and value is dummy_true)
+        }
+        return {**handler, 'filters': filters}
+
+    def is_stale(self, handlers: list[dict]) -> bool:
+        # handlers registered after the compilation are not routed
+        return handlers is not self.handlers or len(handlers) != self.size
+
+    def route(self, update) -> Route:
+        keys = tuple(key for key in self.route_keys(update) if key in self._routes)
+        if not keys:
+            return self._generic_route
+        if len(keys) == 1:
+            return self._routes[keys[0]]
+        route = self._merged.get(keys)
+        if route is None:
+            entries = {id(entry): entry for key in keys for entry in self._keyed[key]}
+            route = self._merged[keys] = Route(list(entries.values()) + self._generic)
+        return route
+
+
+ROUTED_UPDATES = {
+    'message': ('message_handlers', message_route_keys),
+    'callback_query': ('callback_query_handlers', callback_query_route_keys),
+}
+
+
+def compile_routers(bot: TeleBot | AsyncTeleBot) -> dict[str, HandlerRouter]:
+    return {
+        update_type: HandlerRouter(getattr(bot, attribute), route_keys, bot.custom_filters)
+        for update_type, (attribute, route_keys) in ROUTED_UPDATES.items()
+    }
+
+
+class RoutedTeleBot(TeleBot):
+    # the state is read once per update before the middlewares, instead of once per tested handler.
+    # the per-update scope of the pipelined state storage cache is opened before the routing, thus the state read
+    # by the router is served to the filters and the handlers from the cache, and the writes are flushed at the end
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.routers: dict[str, HandlerRouter] = {}
+
+    def compile_routes(self):
+        self.routers = compile_routers(self)
+
+    def _route(self, message, handlers, update_type):
+        router = self.routers.get(update_type)
+        if router is None or router.is_stale(handlers):
+            return handlers
+        route = router.route(message)
+        if not route.needs_state():
+            return route.any_state
+        ids = get_state_ids(message)
+        if ids is None:
+            return handlers
+        return route.select(self.current_states.get_state(*ids))
+
+    def _run_middlewares_and_handler(self, message, handlers, middlewares, update_type):
+        scoped = isinstance(self.current_states, PipelinedRedisStateStorage)
+        if scoped:
+            self.current_states.begin()
+        try:
+            handlers = self._route(message, handlers, update_type)
+            super()._run_middlewares_and_handler(message, handlers, middlewares, update_type)
+        finally:
+            # flushed even if a middleware cancels the update
+            if scoped:
+                self.current_states.flush()
+
+
+class AsyncRoutedTeleBot(AsyncTeleBot):
+    # asyncio counterpart of the RoutedTeleBot
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.routers: dict[str, HandlerRouter] = {}
+        # AsyncTeleBot.user is only set when polling, the bot user is requested once on launch and kept here
+        self.bot_user: Optional[User] = None
+
+    def compile_routes(self):
+        self.routers = compile_routers(self)
+
+    async def _route(self, message, handlers, update_type):
+        router = self.routers.get(update_type)
+        if router is None or router.is_stale(handlers):
+            return handlers
+        route = router.route(message)
+        if not route.needs_state():
+            return route.any_state
+        ids = get_state_ids(message)
+        if ids is None:
+            return handlers
+        return route.select(await self.current_states.get_state(*ids))
+
+    async def _run_middlewares_and_handlers(self, message, handlers, middlewares, update_type):
+        # each update is handled in its own task, thus the scope kept in a context variable is the update's own
+        scoped = isinstance(self.current_states, AsyncPipelinedRedisStateStorage)
+        if scoped:
+            self.current_states.begin()
+        try:
+            handlers = await self._route(message, handlers, update_type)
+            await super()._run_middlewares_and_handlers(message, handlers, middlewares, update_type)
+        finally:
+            if scoped:
+                await self.current_states.flush()
@@ -1,6 +1,7 @@
 from telebot.handler_backends import State, StatesGroup
 
 from fair.bot.states.storage import setup_state_storage
+from fair.bot.states.asyncio_storage import setup_async_state_storage
 
 
 class UnregisteredStates(StatesGroup):
@@ -32,3 +33,11 @@ class ManagerStates(StatesGroup):
     choose_add_amount = State()
     choose_subtract_recipient = State()
     choose_subtract_amount = State()
+    select_reward_recipients = State()
+    choose_reward_many_amount = State()
+    select_purchase_recipients = State()
+    choose_purchase_many_amount = State()
+
+
+# order matters for the compact state codec, new groups have to be appended to the end
+STATE_GROUPS = [UnregisteredStates, PlayerStates, ManagerStates]
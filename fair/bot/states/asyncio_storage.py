@@ -0,0 +1,146 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from redis.asyncio import Redis
+from telebot.asyncio_storage import StateContext, StateMemoryStorage, StateRedisStorage, StateStorageBase
+from telebot.handler_backends import StatesGroup
+
+from fair.config import BotStateStorageConfig
+
+from fair.bot.states.codec import StateCodec
+
+from fair.bot.states.storage import (
+    record_delete_state,
+    record_get_data,
+    record_get_state,
+    record_save_data,
+    record_set_data,
+    record_set_state,
+)
+
+
+class AsyncPipelinedRedisStateStorage(StateStorageBase):
+    # asyncio counterpart of the PipelinedRedisStateStorage, the cache is kept in a context variable,
+    # as each update is handled in its own task
+
+    def __init__(
+            self,
+            codec: StateCodec,
+            host: str,
+            port: int,
+            db: int = 0,
+            password: Optional[str] = None,
+            prefix: str = 'telebot_',
+            ttl: Optional[int] = None):
+        super().__init__()
+        self.codec = codec
+        # idle chats' records expire, reads prolong them
+        self.ttl = ttl
+        self.redis = Redis(host=host, port=port, db=db, password=password)
+        self.prefix = prefix
+        # (records, dirty chat ids) of the current update
+        self._scope: ContextVar[Optional[tuple[dict, set]]] = ContextVar('state_cache_scope', default=None)
+
+    def _key(self, chat_id: str) -> str:
+        return self.prefix + chat_id
+
+    def begin(self):
+        self._scope.set(({}, set()))
+
+    async def flush(self):
+        scope = self._scope.get()
+        self._scope.set(None)
+        if scope is None or not scope[1]:
+            return
+        records, dirty = scope
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for chat_id in dirty:
+                if records[chat_id]:
+                    pipe.set(self._key(chat_id), self.codec.encode(records[chat_id]), ex=self.ttl)
+                else:
+                    pipe.delete(self._key(chat_id))
+            await pipe.execute()
+
+    async def _read(self, chat_id: str) -> Optional[bytes]:
+        if self.ttl is None:
+            return await self.redis.get(self._key(chat_id))
+        return await self.redis.getex(self._key(chat_id), ex=self.ttl)
+
+    async def _get_record(self, chat_id: str) -> dict:
+        scope = self._scope.get()
+        if scope is not None and chat_id in scope[0]:
+            return scope[0][chat_id]
+        raw = await self._read(chat_id)
+        record = self.codec.decode(raw) if raw else {}
+        if scope is not None:
+            scope[0][chat_id] = record
+            if raw and self.codec.needs_migration(raw, record):
+                scope[1].add(chat_id)
+        return record
+
+    async def _set_record(self, chat_id: str, record: dict):
+        scope = self._scope.get()
+        if scope is not None:
+            scope[0][chat_id] = record
+            scope[1].add(chat_id)
+        elif record:
+            await self.redis.set(self._key(chat_id), self.codec.encode(record), ex=self.ttl)
+        else:
+            await self.redis.delete(self._key(chat_id))
+
+    async def _update(self, chat_id, update, *args) -> bool:
+        chat_id = str(chat_id)
+        record = await self._get_record(chat_id)
+        changed = update(record, *args)
+        if changed:
+            await self._set_record(chat_id, record)
+        return changed
+
+    async def set_state(self, chat_id, user_id, state):
+        return await self._update(chat_id, record_set_state, str(user_id), state)
+
+    async def delete_state(self, chat_id, user_id):
+        return await self._update(chat_id, record_delete_state, str(user_id), str(user_id) == str(chat_id))
+
+    async def get_state(self, chat_id, user_id):
+        return record_get_state(await self._get_record(str(chat_id)), str(user_id))
+
+    async def get_data(self, chat_id, user_id):
+        return record_get_data(await self._get_record(str(chat_id)), str(user_id))
+
+    async def set_data(self, chat_id, user_id, key, value):
+        return await self._update(chat_id, record_set_data, str(user_id), key, value)
+
+    async def reset_data(self, chat_id, user_id):
+        return await self._update(chat_id, record_save_data, str(user_id), {})
+
+    async def save(self, chat_id, user_id, data):
+        return await self._update(chat_id, record_save_data, str(user_id), data)
+
+    def get_interactive_data(self, chat_id, user_id):
+        return StateContext(self, chat_id, user_id)
+
+
+def setup_async_state_storage(storage_config: BotStateStorageConfig, state_groups: list[type[StatesGroup]]):
+    if storage_config.type == 'memory':
+        state_storage = StateMemoryStorage()
+    elif storage_config.type == 'pipelined_redis':
+        state_storage = AsyncPipelinedRedisStateStorage(
+            StateCodec(state_groups, storage_config.compact),
+            host=storage_config.redis.host,
+            port=storage_config.redis.port,
+            db=storage_config.redis.db,
+            password=storage_config.redis.password,
+            prefix=storage_config.redis.prefix,
+            ttl=storage_config.ttl,
+        )
+    else:
+        state_storage = StateRedisStorage(
+            host=storage_config.redis.host,
+            port=storage_config.redis.port,
+            db=storage_config.redis.db,
+            password=storage_config.redis.password,
+            prefix=storage_config.redis.prefix,
+        )
+
+    return state_storage
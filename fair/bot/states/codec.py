@@ -0,0 +1,83 @@
+import json
+import struct
+from typing import Optional
+
+from telebot.handler_backends import StatesGroup
+
+
+# Compact binary layout of a chat record {user_id: {'state': state, 'data': {...}}}:
+# version byte, then per user: user id (int64), state code (uint16), number of data items (uint8),
+# then per data item: key code (uint8) and value (int64).
+# State code is the group number in the high byte and the state number within the group in the low one,
+# thus new states and groups have to be appended to the end, otherwise the stored codes change meaning.
+# Records the layout can't hold (unknown state or data key, non-integer value) are stored as json,
+# json records written by telebot's StateRedisStorage are read as is, thus the existing keys keep working
+
+COMPACT_VERSION = 1
+NO_STATE = 0xFFFF
+# data keys of the handlers, new keys have to be appended to the end
+DATA_KEYS = ('current_player_id', 'recipient_player_id', 'password_retries')
+
+_HEADER = struct.Struct('>B')
+_USER = struct.Struct('>qHB')
+_ITEM = struct.Struct('>Bq')
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class StateCodec:
+    def __init__(self, state_groups: list[type[StatesGroup]], compact: bool = True):
+        self.compact = compact
+        self.state_codes: dict[str, int] = {}
+        for group_number, group in enumerate(state_groups):
+            for state_number, state in enumerate(group._state_list):
+                self.state_codes[state.name] = group_number << 8 | state_number
+        self.state_names = {code: name for name, code in self.state_codes.items()}
+        self.key_codes = {key: code for code, key in enumerate(DATA_KEYS)}
+
+    def _pack(self, record: dict) -> Optional[bytes]:
+        if len(record) > 255:
+            return None
+        parts = [_HEADER.pack(COMPACT_VERSION)]
+        for user_id, user_record in record.items():
+            state, data = user_record['state'], user_record['data']
+            state_code = NO_STATE if state is None else self.state_codes.get(state)
+            if state_code is None or len(data) > 255:
+                return None
+            parts.append(_USER.pack(int(user_id), state_code, len(data)))
+            for key, value in data.items():
+                key_code = self.key_codes.get(key)
+                if key_code is None or type(value) is not int or not _INT64_MIN <= value <= _INT64_MAX:
+                    return None
+                parts.append(_ITEM.pack(key_code, value))
+        return b''.join(parts)
+
+    def _unpack(self, raw: bytes) -> dict:
+        record = {}
+        offset = _HEADER.size
+        while offset < len(raw):
+            user_id, state_code, size = _USER.unpack_from(raw, offset)
+            offset += _USER.size
+            data = {}
+            for _ in range(size):
+                key_code, value = _ITEM.unpack_from(raw, offset)
+                offset += _ITEM.size
+                data[DATA_KEYS[key_code]] = value
+            state = None if state_code == NO_STATE else self.state_names[state_code]
+            record[str(user_id)] = {'state': state, 'data': data}
+        return record
+
+    def encode(self, record: dict) -> bytes:
+        raw = self._pack(record) if self.compact else None
+        return raw if raw is not None else json.dumps(record, separators=(',', ':')).encode()
+
+    def decode(self, raw: bytes) -> dict:
+        if self.is_json(raw):
+            return json.loads(raw)
+        return self._unpack(raw)
+
+    def is_json(self, raw: bytes) -> bool:
+        return raw[:1] == b'{'
+
+    def needs_migration(self, raw: bytes, record: dict) -> bool:
+        # json record, e.g. written by StateRedisStorage, is rewritten in the compact layout if it can hold it
+        return self.compact and self.is_json(raw) and self._pack(record) is not None
@@ -1,11 +1,181 @@
-from telebot.storage import StateMemoryStorage, StateRedisStorage
+import threading
+from typing import Optional
+
+from redis import Redis
+from telebot.storage import StateMemoryStorage, StateRedisStorage, StateStorageBase
+from telebot.storage.base_storage import StateContext
+from telebot.handler_backends import StatesGroup
 
 from fair.config import BotStateStorageConfig
 
+from fair.bot.states.codec import StateCodec
+
+
+# Records are kept in the same shape as telebot's StateRedisStorage does:
+# per chat {user_id: {'state': state, 'data': {...}}}, user ids are strings.
+# Records are stored as json or in the compact layout of the StateCodec.
+# Functions below operate on the loaded records and return whether the record was changed
+
+
+def record_set_state(record: dict, user_id: str, state) -> bool:
+    if hasattr(state, 'name'):
+        state = state.name
+    if user_id in record:
+        record[user_id]['state'] = state
+    else:
+        record[user_id] = {'state': state, 'data': {}}
+    return True
+
+
+def record_delete_state(record: dict, user_id: str, is_private: bool) -> bool:
+    if user_id not in record:
+        return False
+    del record[user_id]
+    if is_private:
+        # user id is the chat id, the whole record is dropped
+        record.clear()
+    return True
+
+
+def record_get_state(record: dict, user_id: str):
+    return record[user_id]['state'] if user_id in record else None
+
+
+def record_get_data(record: dict, user_id: str) -> Optional[dict]:
+    return record[user_id]['data'] if user_id in record else None
+
+
+def record_set_data(record: dict, user_id: str, key, value) -> bool:
+    if user_id not in record:
+        return False
+    record[user_id]['data'][key] = value
+    return True
+
+
+def record_save_data(record: dict, user_id: str, data: dict) -> bool:
+    if user_id not in record:
+        return False
+    record[user_id]['data'] = data
+    return True
+
+
+class PipelinedRedisStateStorage(StateStorageBase):
+    # Redis state storage with a per-update cache: within the update the record of a chat is read from Redis once,
+    # then the state filters and the handlers are served from the cache and all the writes are flushed at once
+    # by a single pipelined MULTI when the update is handled. The update scope is set by the RoutedTeleBot,
+    # outside of it (e.g. on startup) every call goes to Redis right away. Cache is thread local
+
+    def __init__(
+            self,
+            codec: StateCodec,
+            host: str,
+            port: int,
+            db: int = 0,
+            password: Optional[str] = None,
+            prefix: str = 'telebot_',
+            ttl: Optional[int] = None):
+        super().__init__()
+        self.codec = codec
+        # idle chats' records expire, reads prolong them
+        self.ttl = ttl
+        self.redis = Redis(host=host, port=port, db=db, password=password)
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _key(self, chat_id: str) -> str:
+        return self.prefix + chat_id
+
+    def begin(self):
+        self._local.records = {}
+        self._local.dirty = set()
 
-def setup_state_storage(storage_config: BotStateStorageConfig):
+    def flush(self):
+        records = getattr(self._local, 'records', None)
+        dirty = getattr(self._local, 'dirty', None)
+        self._local.records = self._local.dirty = None
+        if not dirty:
+            return
+        with self.redis.pipeline(transaction=True) as pipe:
+            for chat_id in dirty:
+                if records[chat_id]:
+                    pipe.set(self._key(chat_id), self.codec.encode(records[chat_id]), ex=self.ttl)
+                else:
+                    pipe.delete(self._key(chat_id))
+            pipe.execute()
+
+    def _read(self, chat_id: str) -> Optional[bytes]:
+        if self.ttl is None:
+            return self.redis.get(self._key(chat_id))
+        return self.redis.getex(self._key(chat_id), ex=self.ttl)
+
+    def _get_record(self, chat_id: str) -> dict:
+        records = getattr(self._local, 'records', None)
+        if records is not None and chat_id in records:
+            return records[chat_id]
+        raw = self._read(chat_id)
+        record = self.codec.decode(raw) if raw else {}
+        if records is not None:
+            records[chat_id] = record
+            if raw and self.codec.needs_migration(raw, record):
+                self._local.dirty.add(chat_id)
+        return record
+
+    def _set_record(self, chat_id: str, record: dict):
+        records = getattr(self._local, 'records', None)
+        if records is not None:
+            records[chat_id] = record
+            self._local.dirty.add(chat_id)
+        elif record:
+            self.redis.set(self._key(chat_id), self.codec.encode(record), ex=self.ttl)
+        else:
+            self.redis.delete(self._key(chat_id))
+
+    def _update(self, chat_id, update, *args) -> bool:
+        chat_id = str(chat_id)
+        record = self._get_record(chat_id)
+        changed = update(record, *args)
+        if changed:
+            self._set_record(chat_id, record)
+        return changed
+
+    def set_state(self, chat_id, user_id, state):
+        return self._update(chat_id, record_set_state, str(user_id), state)
+
+    def delete_state(self, chat_id, user_id):
+        return self._update(chat_id, record_delete_state, str(user_id), str(user_id) == str(chat_id))
+
+    def get_state(self, chat_id, user_id):
+        return record_get_state(self._get_record(str(chat_id)), str(user_id))
+
+    def get_data(self, chat_id, user_id):
+        return record_get_data(self._get_record(str(chat_id)), str(user_id))
+
+    def set_data(self, chat_id, user_id, key, value):
+        return self._update(chat_id, record_set_data, str(user_id), key, value)
+
+    def reset_data(self, chat_id, user_id):
+        return self._update(chat_id, record_save_data, str(user_id), {})
+
+    def save(self, chat_id, user_id, data):
+        return self._update(chat_id, record_save_data, str(user_id), data)
+
+    def get_interactive_data(self, chat_id, user_id):
+        return StateContext(self, chat_id, user_id)
+
+
+def setup_state_storage(storage_config: BotStateStorageConfig, state_groups: list[type[StatesGroup]]):
     if storage_config.type == 'memory':
         state_storage = StateMemoryStorage()
+    elif storage_config.type == 'pipelined_redis':
+        state_storage = PipelinedRedisStateStorage(
+            StateCodec(state_groups, storage_config.compact),
+            host=storage_config.redis.host,
+            port=storage_config.redis.port,
+            db=storage_config.redis.db,
+            password=storage_config.redis.password,
+            prefix=storage_config.redis.prefix,
+            ttl=storage_config.ttl,
+        )
     else:
         state_storage = StateRedisStorage(
             host=storage_config.redis.host,
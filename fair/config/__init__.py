@@ -6,7 +6,8 @@ from adaptix import Retort
 
 from fair.config.models import (
     Config, BotConfig, DBConfig, LoggerConfig, MessagesConfig, ButtonsConfig,
-    BotWebhookConfig, BotStateStorageConfig, RedisConfig
+    BotWebhookConfig, BotStateStorageConfig, BotRateLimiterConfig, BotOutboundConfig, BotDispatcherConfig,
+    RedisConfig, AdminConfig
 )
 
 
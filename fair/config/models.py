@@ -22,8 +22,33 @@ class RedisConfig:
 
 @dataclass
 class BotStateStorageConfig:
-    type: Literal['redis', 'memory']  # State storage type, I don't recommend using pickle, thus leave it out
+    type: Literal['redis', 'memory', 'pipelined_redis']  # State storage type, pickle is left out on purpose
     redis: Optional[RedisConfig] = None  # Redis config if any
+    compact: Optional[bool] = False  # Store states in the compact binary layout, pipelined_redis only
+    ttl: Optional[int] = None  # Seconds the states of idle chats are kept for if any, pipelined_redis only
+
+
+@dataclass
+class BotRateLimiterConfig:
+    type: Literal['redis', 'memory']  # Anti-flood limiter type, redis one is shared across the workers
+    redis: Optional[RedisConfig] = None  # Redis config if any
+    burst: Optional[int] = 1  # Number of actions allowed at once, then one action per actions_timeout
+    max_size: Optional[int] = 100000  # Max number of users tracked by the memory limiter
+
+
+@dataclass
+class BotDispatcherConfig:
+    workers: Optional[int] = 8  # Number of workers, updates are sharded onto them by the user id
+    queue_size: Optional[int] = 1000  # Max number of pending updates per worker
+
+
+@dataclass
+class BotOutboundConfig:
+    global_rate: Optional[float] = 30  # Max messages per second sent by the bot
+    chat_rate: Optional[float] = 1  # Max messages per second sent to a single chat
+    chat_burst: Optional[int] = 3  # Number of messages sent to a single chat at once, then chat_rate applies
+    workers: Optional[int] = 8  # Max number of messages being sent concurrently
+    queue_size: Optional[int] = 100000  # Max number of pending messages, the rest is dropped
 
 
 @dataclass
@@ -33,6 +58,7 @@ class BotWebhookConfig:
     cert_path: Optional[str] = None  # Path to the public key SSL certificate if self-signed
     ip_address: Optional[str] = None  # IP address to use instead of one resolved via DNS
     max_connections: Optional[int] = None  # Maximum allowed number of simultaneous HTTPS connections to the webhook
+    fast_ack: Optional[bool] = False  # Respond right away and handle the updates by the update dispatcher
 
 
 @dataclass
@@ -45,8 +71,19 @@ class BotConfig:
     actions_timeout: float  # Timeout between user's actions in seconds
     page_size: int  # Page size for pagination in inline keyboards
     logger: LoggerConfig  # Logger config for the bot
+    use_async: Optional[bool] = False  # Use AsyncTeleBot with async handlers and DB adapter, otherwise TeleBot
+    inline_cache_time: Optional[int] = 60  # Seconds inline query results are cached by Telegram and by the bot
+    inline_cache_size: Optional[int] = 1000  # Max number of inline queries with results cached by the bot
+    api_queue_workers: Optional[int] = 4  # Number of workers making the fire-and-forget Bot API calls
+    api_queue_size: Optional[int] = 10000  # Max number of pending fire-and-forget Bot API calls
     allowed_updates: Optional[Union[list[str], Literal['ALL']]] = None  # by default all except chat_member
+    # Queue positions players are notified at when the queue moves, 1 is the head, empty to disable.
+    # Notified positions are shared by the workers via db.queue_engine_redis, required with several workers
+    queue_notify_positions: Optional[tuple[int, ...]] = (1, 3)
     state_storage: Optional[BotStateStorageConfig] = None  # Bot state storage config if any
+    rate_limiter: Optional[BotRateLimiterConfig] = None  # Anti-flood limiter config, memory one by default
+    outbound: Optional[BotOutboundConfig] = None  # Outbound messages rate shaping config, defaults are used if None
+    dispatcher: Optional[BotDispatcherConfig] = None  # Update dispatcher config, used by polling and webhook if any
     webhook: Optional[BotWebhookConfig] = None  # Webhook config if any
     telegram_api_url: Optional[str] = None  # Custom Telegram API url for Local Bot API Server if any
 
@@ -59,6 +96,31 @@ class DBConfig:
     password: str  # DBMS user password
     database: str  # Database name
     logger: LoggerConfig  # Logger config for database
+    pool_size: Optional[int] = 5  # Number of connections kept open in the pool of each worker
+    max_overflow: Optional[int] = 10  # Number of connections allowed to be opened above the pool_size
+    pool_timeout: Optional[float] = 30  # Seconds to wait for a free connection before giving up
+    pool_pre_ping: Optional[bool] = False  # Test connections for liveness on every checkout
+    pool_recycle: Optional[int] = -1  # Reopen connections older than this number of seconds, -1 to disable
+    statement_timeout: Optional[int] = None  # Postgres statement_timeout in milliseconds if any
+    prepare_threshold: Optional[int] = 5  # Executions before psycopg prepares a statement, None to disable
+    identity_cache_size: Optional[int] = 10000  # Max number of identities cached by each worker, 0 to disable
+    identity_cache_ttl: Optional[float] = 300  # Seconds an identity is kept in the cache
+    identity_cache_redis: Optional[RedisConfig] = None  # Redis config of the identity cache shared by workers if any
+    page_cache_size: Optional[int] = 0  # Max number of collection pages cached by each worker, 0 to disable
+    page_cache_ttl: Optional[float] = 60  # Seconds a collection page is kept in the cache
+    # Redis config of the page cache and its table versions shared by workers, required with several workers
+    page_cache_redis: Optional[RedisConfig] = None
+    queue_engine: Optional[bool] = False  # Serve queue positions and ETAs from the queue engine instead of the DB
+    queue_engine_alpha: Optional[float] = 0.2  # Weight of the latest service time in the rolling one of a location
+    queue_engine_resync: Optional[float] = 3600  # Seconds the queue engine is rebuilt from the DB after
+    # Redis config of the queue engine shared by workers, required with several workers
+    queue_engine_redis: Optional[RedisConfig] = None
+
+
+@dataclass
+class AdminConfig:
+    path: str  # Path prefix of the admin endpoints
+    secret_token: str  # Secret token expected in the X-Admin-Secret-Token header
 
 
 @dataclass
@@ -82,7 +144,10 @@ class MessagesConfig:
     new_queue_location_cancelled: str
     queue_entry_added: str
     player_queue_location: str
+    player_queue_eta: str
     player_left_queue: str
+    queue_turn_approaching: str
+    player_called: str
     manager_registration_forbidden: str
     manager_registration_disabled: str
     get_manager_password: str
@@ -92,8 +157,11 @@ class MessagesConfig:
     manager_registered: str
     all_players: str
     all_players_cancelled: str
+    player_search_results: str
+    player_search_no_results: str
     all_locations: str
     all_locations_cancelled: str
+    inline_location_description: str
     choose_add_balance_recipient: str
     add_balance_cancelled: str
     choose_add_balance_amount: str
@@ -108,6 +176,12 @@ class MessagesConfig:
     purchase_cancelled: str
     choose_purchase_amount: str
     purchase_successful: str
+    select_players: str
+    select_players_cancelled: str
+    choose_reward_many_amount: str
+    reward_many_successful: str
+    choose_purchase_many_amount: str
+    purchase_many_successful: str
     choose_location: str
     choose_location_cancelled: str
     location_updated: str
@@ -115,6 +189,7 @@ class MessagesConfig:
     my_location_queue: str
     my_location_queue_cancelled: str
     location_player_chosen_options: str
+    manager_player_called: str
     location_paused: str
     location_unpaused: str
     manager_my_location: str
@@ -123,6 +198,8 @@ class MessagesConfig:
     player_not_found_error: str
     player_not_in_queue_error: str
     queue_entry_already_exists_error: str
+    no_player_to_call_error: str
+    no_players_selected_error: str
     money_transfer_recipient_not_chosen_error: str
     money_transfer_amount_invalid_error: str
     add_manager_error: str
@@ -156,6 +233,10 @@ class ButtonsConfig:
     purchase: str
     my_location: str
     my_location_queue: str
+    call_next: str
+    call_player: str
+    select_players: str
+    done: str
     leave_location: str
     pause_location: str
     unpause_location: str
@@ -173,3 +254,4 @@ class Config:
     logger: LoggerConfig  # Logger config for the app
     messages: MessagesConfig  # Messages text config
     buttons: ButtonsConfig  # Buttons text config
+    admin: Optional[AdminConfig] = None  # Admin endpoints config if any
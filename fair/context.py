@@ -0,0 +1,109 @@
+from fair.bot import setup_bot, setup_async_bot
+from fair.bot.api_queue import ApiQueue, AsyncApiQueue
+from fair.bot.dispatcher import UpdateDispatcher, AsyncUpdateDispatcher, uses_dispatcher
+from fair.bot.outbound import OutboundDispatcher, AsyncOutboundDispatcher
+from fair.bot.queue_notifier import QueueNotifier, AsyncQueueNotifier
+from fair.bot.rate_limiter import setup_rate_limiter, setup_async_rate_limiter
+from fair.config import Config, BotOutboundConfig, BotDispatcherConfig
+from fair.db import setup_adapter, setup_async_adapter
+from fair.logger import setup_logger
+
+
+# Bot and the services its handlers depend on, built the same way by both entry points:
+# the app (webhook or polling as a background task) and python -m fair (polling)
+
+
+def build_context(cfg: Config) -> dict:
+    db_logger = setup_logger(cfg.db.logger)
+    bot_logger = setup_logger(cfg.bot.logger)
+    outbound_config = cfg.bot.outbound if cfg.bot.outbound is not None else BotOutboundConfig()
+    if cfg.bot.use_async:
+        db_adapter = setup_async_adapter(cfg.db, db_logger)
+        rate_limiter = setup_async_rate_limiter(cfg.bot.rate_limiter, cfg.bot.actions_timeout, bot_logger)
+        api_queue = AsyncApiQueue(bot_logger, cfg.bot.api_queue_workers, cfg.bot.api_queue_size)
+        outbound = AsyncOutboundDispatcher(bot_logger, outbound_config)
+        # positions the players were notified at are shared by the workers via the Redis of the queue engine if any
+        queue_engine = db_adapter.queue_engine
+        queue_notifier = AsyncQueueNotifier(
+            cfg.bot.queue_notify_positions,
+            bot_logger,
+            redis=queue_engine.redis if queue_engine is not None else None,
+            prefix=queue_engine.prefix if queue_engine is not None else ''
+        )
+        bot = setup_async_bot(
+            cfg.bot,
+            db_adapter,
+            cfg.messages,
+            cfg.buttons,
+            bot_logger,
+            rate_limiter,
+            api_queue,
+            outbound,
+            queue_notifier
+        )
+    else:
+        db_adapter = setup_adapter(cfg.db, db_logger)
+        rate_limiter = setup_rate_limiter(cfg.bot.rate_limiter, cfg.bot.actions_timeout, bot_logger)
+        api_queue = ApiQueue(bot_logger, cfg.bot.api_queue_workers, cfg.bot.api_queue_size)
+        outbound = OutboundDispatcher(bot_logger, outbound_config)
+        # positions the players were notified at are shared by the workers via the Redis of the queue engine if any
+        queue_engine = db_adapter.queue_engine
+        queue_notifier = QueueNotifier(
+            cfg.bot.queue_notify_positions,
+            bot_logger,
+            redis=queue_engine.redis if queue_engine is not None else None,
+            prefix=queue_engine.prefix if queue_engine is not None else ''
+        )
+        bot = setup_bot(
+            cfg.bot,
+            db_adapter,
+            cfg.messages,
+            cfg.buttons,
+            bot_logger,
+            rate_limiter,
+            api_queue,
+            outbound,
+            queue_notifier
+        )
+    update_dispatcher = None
+    if uses_dispatcher(cfg.bot):
+        # the bot hands both the polled and the webhook updates over to the dispatcher's workers
+        dispatcher_config = cfg.bot.dispatcher if cfg.bot.dispatcher is not None else BotDispatcherConfig()
+        dispatcher_cls = AsyncUpdateDispatcher if cfg.bot.use_async else UpdateDispatcher
+        update_dispatcher = dispatcher_cls(bot, bot_logger, dispatcher_config)
+    return {
+        'bot_config': cfg.bot,
+        'bot_logger': bot_logger,
+        'bot': bot,
+        'db_adapter': db_adapter,
+        'rate_limiter': rate_limiter,
+        'api_queue': api_queue,
+        'outbound': outbound,
+        'queue_notifier': queue_notifier,
+        'update_dispatcher': update_dispatcher,
+    }
+
+
+def start_services(context: dict):
+    # background workers of the services, must be called from the running event loop if the bot is async
+    context['api_queue'].start()
+    # every handler reply is sent by the outbound dispatcher
+    context['outbound'].start()
+    if context['update_dispatcher'] is not None:
+        # workers are started before polling, as the polled updates are handed over to them
+        context['update_dispatcher'].start()
+
+
+def stop_services(context: dict):
+    # pending work is finished before the workers stop, pending updates go first as they make more calls
+    if context['update_dispatcher'] is not None:
+        context['update_dispatcher'].stop()
+    context['api_queue'].stop()
+    context['outbound'].stop()
+
+
+async def stop_async_services(context: dict):
+    if context['update_dispatcher'] is not None:
+        await context['update_dispatcher'].stop()
+    await context['api_queue'].stop()
+    await context['outbound'].stop()
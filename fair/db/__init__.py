@@ -1,24 +1,135 @@
 from logging import Logger
+from typing import Optional
 
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy import create_engine, URL
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
-from fair.config import DBConfig
+from fair.config import DBConfig, RedisConfig
 
-from fair.db.adapter import DBAdapter
+from fair.db.adapter import DBAdapter, AsyncDBAdapter
 from fair.db.exceptions import DBError
+from fair.db.pool import StatsQueuePool, StatsAsyncAdaptedQueuePool, get_pool_stats
+from fair.db.identity import Identity, IdentityCache, AsyncIdentityCache
+from fair.db.page_cache import PageCache, AsyncPageCache
+from fair.db.queue_engine import QueueEngine, AsyncQueueEngine, QueuePosition
 
 
-def setup_adapter(db_config: DBConfig, logger: Logger):
-    db_url = URL.create(
-        drivername="postgresql+psycopg",
+def create_db_url(db_config: DBConfig, drivername: str) -> URL:
+    return URL.create(
+        drivername=drivername,
         username=db_config.user,
         password=db_config.password,
         host=db_config.host,
         port=db_config.port,
         database=db_config.database
     )
-    db_engine = create_engine(db_url)
+
+
+def create_engine_kwargs(db_config: DBConfig) -> dict:
+    # both sync and async psycopg connections accept the same connect arguments
+    connect_args = {'prepare_threshold': db_config.prepare_threshold}
+    if db_config.statement_timeout is not None:
+        connect_args['options'] = f'-c statement_timeout={db_config.statement_timeout}'
+    return dict(
+        pool_size=db_config.pool_size,
+        max_overflow=db_config.max_overflow,
+        pool_timeout=db_config.pool_timeout,
+        pool_pre_ping=db_config.pool_pre_ping,
+        pool_recycle=db_config.pool_recycle,
+        connect_args=connect_args
+    )
+
+
+def _make_redis(redis_config: Optional[RedisConfig], use_async: bool) -> Optional[Redis | AsyncRedis]:
+    # client of the Redis shared by the workers, None if the component is kept in the process memory
+    if redis_config is None:
+        return None
+    redis_cls = AsyncRedis if use_async else Redis
+    return redis_cls(
+        host=redis_config.host,
+        port=redis_config.port,
+        db=redis_config.db,
+        password=redis_config.password
+    )
+
+
+def setup_identity_cache(db_config: DBConfig, logger: Logger, use_async: bool):
+    redis_config = db_config.identity_cache_redis
+    if not db_config.identity_cache_size and redis_config is None:
+        return None
+    cache_cls = AsyncIdentityCache if use_async else IdentityCache
+    redis = _make_redis(redis_config, use_async)
+    return cache_cls(
+        max_size=db_config.identity_cache_size,
+        ttl=db_config.identity_cache_ttl,
+        logger=logger,
+        redis=redis,
+        prefix=redis_config.prefix if redis_config is not None else ''
+    )
+
+
+def setup_page_cache(db_config: DBConfig, logger: Logger, use_async: bool):
+    redis_config = db_config.page_cache_redis
+    if not db_config.page_cache_size and redis_config is None:
+        return None
+    cache_cls = AsyncPageCache if use_async else PageCache
+    redis = _make_redis(redis_config, use_async)
+    return cache_cls(
+        max_size=db_config.page_cache_size,
+        ttl=db_config.page_cache_ttl,
+        logger=logger,
+        redis=redis,
+        prefix=redis_config.prefix if redis_config is not None else ''
+    )
+
+
+def setup_queue_engine(db_config: DBConfig, logger: Logger, use_async: bool):
+    redis_config = db_config.queue_engine_redis
+    if not db_config.queue_engine and redis_config is None:
+        return None
+    engine_cls = AsyncQueueEngine if use_async else QueueEngine
+    redis = _make_redis(redis_config, use_async)
+    return engine_cls(
+        alpha=db_config.queue_engine_alpha,
+        resync=db_config.queue_engine_resync,
+        logger=logger,
+        redis=redis,
+        prefix=redis_config.prefix if redis_config is not None else ''
+    )
+
+
+def setup_adapter(db_config: DBConfig, logger: Logger):
+    db_url = create_db_url(db_config, "postgresql+psycopg")
+    db_engine = create_engine(db_url, poolclass=StatsQueuePool, **create_engine_kwargs(db_config))
     db_session_maker = sessionmaker(bind=db_engine)
-    db_adapter = DBAdapter(session_maker=db_session_maker, logger=logger)
+    identity_cache = setup_identity_cache(db_config, logger, use_async=False)
+    page_cache = setup_page_cache(db_config, logger, use_async=False)
+    queue_engine = setup_queue_engine(db_config, logger, use_async=False)
+    db_adapter = DBAdapter(
+        session_maker=db_session_maker,
+        logger=logger,
+        identity_cache=identity_cache,
+        page_cache=page_cache,
+        queue_engine=queue_engine
+    )
+    return db_adapter
+
+
+def setup_async_adapter(db_config: DBConfig, logger: Logger):
+    db_url = create_db_url(db_config, "postgresql+psycopg_async")
+    db_engine = create_async_engine(db_url, poolclass=StatsAsyncAdaptedQueuePool, **create_engine_kwargs(db_config))
+    db_session_maker = async_sessionmaker(bind=db_engine)
+    identity_cache = setup_identity_cache(db_config, logger, use_async=True)
+    page_cache = setup_page_cache(db_config, logger, use_async=True)
+    queue_engine = setup_queue_engine(db_config, logger, use_async=True)
+    db_adapter = AsyncDBAdapter(
+        session_maker=db_session_maker,
+        logger=logger,
+        identity_cache=identity_cache,
+        page_cache=page_cache,
+        queue_engine=queue_engine
+    )
     return db_adapter
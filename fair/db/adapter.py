@@ -1,10 +1,16 @@
+import functools
 import logging
 from typing import Optional, Callable
 
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from fair.db.exceptions import DBError
+from fair.db.pool import get_pool_stats
+from fair.db.identity import Identity, IdentityCache, AsyncIdentityCache
+from fair.db.page_cache import PageCache, AsyncPageCache
+from fair.db.queue_engine import QueueEngine, AsyncQueueEngine, QueuePosition
 from fair.db.models import (
     TelegramAccount,
     User, Player, Manager,
@@ -23,9 +29,18 @@ from fair.db.operations import (
 
 
 class DBAdapter:
-    def __init__(self, session_maker: sessionmaker, logger: logging.Logger):
+    def __init__(
+            self,
+            session_maker: sessionmaker,
+            logger: logging.Logger,
+            identity_cache: Optional[IdentityCache] = None,
+            page_cache: Optional[PageCache] = None,
+            queue_engine: Optional[QueueEngine] = None):
         self.logger = logger
         self.session_maker = session_maker
+        self.identity_cache = identity_cache
+        self.page_cache = page_cache
+        self.queue_engine = queue_engine
 
     def _session_wrapper(self, method: Callable, *args, **kwargs):
         try:
@@ -46,6 +61,90 @@ class DBAdapter:
             self.logger.exception(e)
             raise DBError(f"Error occurred while {method.__name__}: {e}")
 
+    def get_pool_stats(self) -> dict:
+        return get_pool_stats(self.session_maker.kw['bind'].pool)
+
+    def _identity_wrapper(
+            self,
+            wrapper: Callable,
+            field: str,
+            method_by_id: Callable,
+            method_by_tg_id: Callable,
+            tg_user_id: int,
+            *args,
+            default=None):
+        # tg_user_id is resolved via the identity cache and the *_by_id operation is used instead of the joins,
+        # the *_by_tg_id operation is only used if the cache is disabled
+        if self.identity_cache is None:
+            return wrapper(method_by_tg_id, tg_user_id, *args)
+        identity = self.get_identity(tg_user_id)
+        entity_id = None if identity is None else getattr(identity, field)
+        if entity_id is None:
+            return default
+        return wrapper(method_by_id, entity_id, *args)
+
+    def _invalidate_identity(self, tg_user_id: int):
+        if self.identity_cache is not None:
+            self.identity_cache.invalidate(tg_user_id)
+
+    def get_identity(self, tg_user_id: int) -> Optional[Identity]:
+        if self.identity_cache is not None:
+            identity = self.identity_cache.get(tg_user_id)
+            if identity is not None:
+                return identity
+        identity = self._session_wrapper(user.get_identity_by_tg_id, tg_user_id)
+        # identity is cached only after the player or manager is registered, it never changes afterwards
+        registered = identity is not None and (identity.player_id is not None or identity.manager_id is not None)
+        if self.identity_cache is not None and registered:
+            self.identity_cache.set(tg_user_id, identity)
+        return identity
+
+    def get_identity_cache_stats(self) -> Optional[dict]:
+        return None if self.identity_cache is None else self.identity_cache.get_stats()
+
+    def _page_wrapper(self, page: str, method: Callable, *args):
+        # page is read through the page cache, the method name is a part of the key as pages share the tables
+        if self.page_cache is None:
+            return self._session_wrapper(method, *args)
+        return self.page_cache.get(page, (method.__name__, *args), lambda: self._session_wrapper(method, *args))
+
+    def _bump(self, written: bool, *tables: str) -> bool:
+        # pages of the tables are invalidated after the successful writes only
+        if written and self.page_cache is not None:
+            self.page_cache.bump(*tables)
+        return written
+
+    def get_page_cache_stats(self) -> Optional[dict]:
+        return None if self.page_cache is None else self.page_cache.get_stats()
+
+    def _enqueue(self, added, location_id: int) -> bool:
+        # added is (queue entry id, player id, location name) of the committed queue entry or False
+        if not added:
+            return False
+        if self.queue_engine is not None:
+            entry_id, player_id, location_name = added
+            self.queue_engine.add(entry_id, player_id, location_id, location_name)
+        return True
+
+    def _dequeue(self, deleted) -> bool:
+        # deleted is (player id, location id) of the deleted queue entry, None or False
+        if not deleted:
+            return False
+        if self.queue_engine is not None:
+            self.queue_engine.remove(deleted[0])
+        return True
+
+    @staticmethod
+    def _queue_position(position: Optional[tuple[int, str, int, int]]) -> Optional[QueuePosition]:
+        # position read from the DB has no ETA, service times are only measured by the queue engine
+        if position is None:
+            return None
+        location_id, location_name, ahead, size = position
+        return QueuePosition(location_id, location_name, ahead, size, eta=None)
+
+    def get_queue_engine_stats(self) -> Optional[dict]:
+        return None if self.queue_engine is None else self.queue_engine.get_stats()
+
     def add_role(self, name: str) -> bool:
         return self._commit_session_wrapper(role.add, name)
 
@@ -59,76 +158,118 @@ class DBAdapter:
         return self._session_wrapper(telegram_account.get, tg_user_id)
 
     def update_telegram_account_username(self, tg_user_id: int, tg_username: str) -> bool:
-        return self._commit_session_wrapper(telegram_account.add, tg_user_id, tg_username)
+        return self._commit_session_wrapper(telegram_account.update_username, tg_user_id, tg_username)
 
     def add_user(self, role_name: str, tg_user_id: int) -> bool:
-        return self._commit_session_wrapper(user.add, role_name, tg_user_id)
+        added = self._commit_session_wrapper(user.add, role_name, tg_user_id)
+        self._invalidate_identity(tg_user_id)
+        return added
 
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         return self._session_wrapper(user.get_by_id, user_id)
 
     def get_user_by_tg_id(self, tg_user_id: int) -> Optional[User]:
-        return self._session_wrapper(user.get_by_tg_id, tg_user_id)
+        return self._identity_wrapper(self._session_wrapper, 'user_id', user.get_by_id, user.get_by_tg_id, tg_user_id)
 
     def check_player_name_availability(self, name: str) -> bool:
         return self._session_wrapper(player.check_name_availability, name)
 
     def add_player(self, tg_user_id: int, name: str) -> bool:
-        return self._commit_session_wrapper(player.add, tg_user_id, name)
+        added = self._commit_session_wrapper(player.add, tg_user_id, name)
+        self._invalidate_identity(tg_user_id)
+        return self._bump(added, 'player')
 
     def get_player_by_id(self, player_id: int) -> Optional[Player]:
         return self._session_wrapper(player.get_by_id, player_id)
 
     def get_player_by_tg_id(self, tg_user_id: int) -> Optional[Player]:
-        return self._session_wrapper(player.get_by_tg_id, tg_user_id)
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            player.get_by_id,
+            player.get_by_tg_id,
+            tg_user_id
+        )
 
     def get_all_players(self, offset: int, limit: int) -> list[Player]:
         return self._session_wrapper(player.get_all, offset, limit)
 
+    def get_all_players_page(self, cursor: Optional[int], limit: int, backward: bool = False) -> list[Player]:
+        return self._page_wrapper('players', player.get_page, cursor, limit, backward)
+
+    def search_players_by_name(self, query: str, limit: int) -> list[Player]:
+        return self._session_wrapper(player.search_by_name, query, limit)
+
     def get_all_players_count(self) -> int:
-        return self._session_wrapper(player.get_all_count)
+        return self._page_wrapper('players_count', player.get_all_count)
 
     def update_player_balance_by_id(self, player_id: int, amount: int) -> bool:
-        return self._commit_session_wrapper(player.update_balance_by_id, player_id, amount)
+        updated = self._commit_session_wrapper(player.update_balance_by_id, player_id, amount)
+        return self._bump(updated, 'player')
 
     def update_player_balance_by_tg_id(self, tg_user_id: int, amount: int) -> bool:
-        return self._commit_session_wrapper(player.update_balance_by_tg_id, tg_user_id, amount)
+        updated = self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            player.update_balance_by_id,
+            player.update_balance_by_tg_id,
+            tg_user_id,
+            amount,
+            default=False
+        )
+        return self._bump(updated, 'player')
 
     def transfer_by_player_id(self, from_player_id: int, to_player_id: int, amount: int) -> bool:
         transferred = self._commit_session_wrapper(player.transfer_by_id, from_player_id, to_player_id, amount)
-        if transferred:
-            try:
-                self.add_transfer_record(from_player_id, to_player_id, amount)
-            except DBError:
-                pass  # suppress error
-        return transferred
+        return self._bump(transferred, 'player')
 
     def transfer_by_player_tg_id(self, from_user_tg_id: int, to_user_tg_id: int, amount: int) -> bool:
-        transferred = self._commit_session_wrapper(player.transfer_by_tg_id, from_user_tg_id, to_user_tg_id, amount)
-        if transferred:
-            try:
-                self.add_transfer_record(from_user_tg_id, to_user_tg_id, amount)
-            except DBError:
-                pass  # suppress error
-        return transferred
+        if self.identity_cache is None:
+            transferred = self._commit_session_wrapper(player.transfer_by_tg_id, from_user_tg_id, to_user_tg_id, amount)
+            return self._bump(transferred, 'player')
+        from_identity = self.get_identity(from_user_tg_id)
+        to_identity = self.get_identity(to_user_tg_id)
+        from_player_id = None if from_identity is None else from_identity.player_id
+        to_player_id = None if to_identity is None else to_identity.player_id
+        if from_player_id is None or to_player_id is None:
+            return False
+        return self.transfer_by_player_id(from_player_id, to_player_id, amount)
 
     def check_manager_name_availability(self, name: str) -> bool:
         return self._session_wrapper(manager.check_name_availability, name)
 
     def add_manager(self, tg_user_id: int, name: str) -> bool:
-        return self._commit_session_wrapper(manager.add, tg_user_id, name)
+        added = self._commit_session_wrapper(manager.add, tg_user_id, name)
+        self._invalidate_identity(tg_user_id)
+        return added
 
     def get_manager_by_id(self, manager_id: int) -> Optional[Manager]:
         return self._session_wrapper(manager.get_by_id, manager_id)
 
     def get_manager_by_tg_id(self, tg_user_id: int) -> Optional[Manager]:
-        return self._session_wrapper(manager.get_by_tg_id, tg_user_id)
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            manager.get_by_id,
+            manager.get_by_tg_id,
+            tg_user_id
+        )
 
     def update_manager_location_by_id(self, manager_id: int, new_location_id: Optional[int] = None) -> bool:
-        return self._commit_session_wrapper(manager.update_location_by_id, manager_id, new_location_id)
+        updated = self._commit_session_wrapper(manager.update_location_by_id, manager_id, new_location_id)
+        return self._bump(updated, 'manager')
 
     def update_manager_location_by_tg_id(self, tg_user_id: int, new_location_id: Optional[int] = None) -> bool:
-        return self._commit_session_wrapper(manager.update_location_by_tg_id, tg_user_id, new_location_id)
+        updated = self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            manager.update_location_by_id,
+            manager.update_location_by_tg_id,
+            tg_user_id,
+            new_location_id,
+            default=False
+        )
+        return self._bump(updated, 'manager')
 
     def add_managers_blacklist_record(self, tg_user_id: int) -> bool:
         return self._commit_session_wrapper(managers_blacklist_record.add, tg_user_id)
@@ -140,7 +281,8 @@ class DBAdapter:
         return self._commit_session_wrapper(managers_blacklist_record.delete_by_tg_id, tg_user_id)
 
     def add_location(self, name: str, max_reward: int, is_onetime: bool) -> bool:
-        return self._commit_session_wrapper(location.add, name, max_reward, is_onetime)
+        added = self._commit_session_wrapper(location.add, name, max_reward, is_onetime)
+        return self._bump(added, 'location')
 
     def get_location_by_id(self, location_id: int) -> Optional[Location]:
         return self._session_wrapper(location.get_by_id, location_id)
@@ -149,28 +291,62 @@ class DBAdapter:
         return self._session_wrapper(location.get_by_manager_id, manager_id)
 
     def get_location_by_manager_tg_id(self, tg_user_id: int) -> Optional[Location]:
-        return self._session_wrapper(location.get_by_manager_tg_id, tg_user_id)
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            location.get_by_manager_id,
+            location.get_by_manager_tg_id,
+            tg_user_id
+        )
 
     def get_all_locations(self, offset: int, limit: int) -> list[tuple[Location, int]]:
         return self._session_wrapper(location.get_all, offset, limit)
 
+    def get_all_locations_page(
+            self,
+            cursor: Optional[tuple[int, int]],
+            limit: int,
+            backward: bool = False) -> list[tuple[Location, int]]:
+        return self._page_wrapper('locations', location.get_page, cursor, limit, backward)
+
+    def search_locations_by_name(self, query: str, limit: int) -> list[tuple[Location, int]]:
+        return self._session_wrapper(location.search_by_name, query, limit)
+
     def get_all_locations_count(self) -> int:
         return self._session_wrapper(location.get_all_count)
 
     def get_all_active_locations(self, offset: int, limit: int) -> list[tuple[Location, int]]:
         return self._session_wrapper(location.get_all_active, offset, limit)
 
+    def get_all_active_locations_page(
+            self,
+            cursor: Optional[tuple[int, int]],
+            limit: int,
+            backward: bool = False) -> list[tuple[Location, int]]:
+        return self._page_wrapper('active_locations', location.get_active_page, cursor, limit, backward)
+
     def get_all_active_locations_count(self) -> int:
         return self._session_wrapper(location.get_all_active_count)
 
     def update_location_by_id(self, location_id: int, is_active: bool) -> bool:
-        return self._commit_session_wrapper(location.update_by_id, location_id, is_active)
+        updated = self._commit_session_wrapper(location.update_by_id, location_id, is_active)
+        return self._bump(updated, 'location')
 
     def update_location_by_manager_id(self, manager_id: int, is_active: bool) -> bool:
-        return self._commit_session_wrapper(location.update_by_manager_id, manager_id, is_active)
+        updated = self._commit_session_wrapper(location.update_by_manager_id, manager_id, is_active)
+        return self._bump(updated, 'location')
 
     def update_location_by_manager_tg_id(self, tg_user_id: int, is_active: bool) -> bool:
-        return self._commit_session_wrapper(location.update_by_manager_tg_id, tg_user_id, is_active)
+        updated = self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            location.update_by_manager_id,
+            location.update_by_manager_tg_id,
+            tg_user_id,
+            is_active,
+            default=False
+        )
+        return self._bump(updated, 'location')
 
     def add_shop(self, location_id: int, name: str) -> bool:
         return self._commit_session_wrapper(shop.add, location_id, name)
@@ -182,16 +358,32 @@ class DBAdapter:
         return self._session_wrapper(shop.get_by_location_id, location_id)
 
     def add_queue_entry_by_player_id(self, player_id: int, location_id: int) -> bool:
-        return self._commit_session_wrapper(queue_entry.add_by_player_id, player_id, location_id)
+        added = self._commit_session_wrapper(queue_entry.add_by_player_id, player_id, location_id)
+        return self._bump(self._enqueue(added, location_id), 'queue_entry')
 
     def add_queue_entry_by_player_tg_id(self, tg_user_id: int, location_id: int) -> bool:
-        return self._commit_session_wrapper(queue_entry.add_by_player_tg_id, tg_user_id, location_id)
+        added = self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            queue_entry.add_by_player_id,
+            queue_entry.add_by_player_tg_id,
+            tg_user_id,
+            location_id,
+            default=False
+        )
+        return self._bump(self._enqueue(added, location_id), 'queue_entry')
 
     def get_queue_entry_by_player_id(self, player_id: int) -> Optional[QueueEntry]:
         return self._session_wrapper(queue_entry.get_by_player_id, player_id)
 
     def get_queue_entry_by_player_tg_id(self, tg_user_id: int) -> Optional[QueueEntry]:
-        return self._session_wrapper(queue_entry.get_by_player_tg_id, tg_user_id)
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            queue_entry.get_by_player_id,
+            queue_entry.get_by_player_tg_id,
+            tg_user_id
+        )
 
     def get_queue_by_location_id(self, location_id: int, offset: int, limit: int) -> list[Player]:
         return self._session_wrapper(queue_entry.get_by_location_id, location_id, offset, limit)
@@ -200,7 +392,57 @@ class DBAdapter:
         return self._session_wrapper(queue_entry.get_by_manager_id, manager_id, offset, limit)
 
     def get_queue_by_manager_tg_id(self, tg_user_id: int, offset: int, limit: int) -> list[Player]:
-        return self._session_wrapper(queue_entry.get_by_manager_tg_id, tg_user_id, offset, limit)
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            queue_entry.get_by_manager_id,
+            queue_entry.get_by_manager_tg_id,
+            tg_user_id,
+            offset,
+            limit,
+            default=[]
+        )
+
+    def get_queue_page_by_location_id(
+            self,
+            location_id: int,
+            cursor: Optional[int],
+            limit: int,
+            backward: bool = False) -> list[tuple[Player, int]]:
+        return self._page_wrapper('queue', queue_entry.get_page_by_location_id, location_id, cursor, limit, backward)
+
+    def get_queue_page_by_manager_id(
+            self,
+            manager_id: int,
+            cursor: Optional[int],
+            limit: int,
+            backward: bool = False) -> list[tuple[Player, int]]:
+        return self._page_wrapper(
+            'queue_by_manager',
+            queue_entry.get_page_by_manager_id,
+            manager_id,
+            cursor,
+            limit,
+            backward
+        )
+
+    def get_queue_page_by_manager_tg_id(
+            self,
+            tg_user_id: int,
+            cursor: Optional[int],
+            limit: int,
+            backward: bool = False) -> list[tuple[Player, int]]:
+        return self._identity_wrapper(
+            functools.partial(self._page_wrapper, 'queue_by_manager'),
+            'manager_id',
+            queue_entry.get_page_by_manager_id,
+            queue_entry.get_page_by_manager_tg_id,
+            tg_user_id,
+            cursor,
+            limit,
+            backward,
+            default=[]
+        )
 
     def get_queue_count_by_location_id(self, location_id: int) -> int:
         return self._session_wrapper(queue_entry.get_count_by_location_id, location_id)
@@ -209,25 +451,137 @@ class DBAdapter:
         return self._session_wrapper(queue_entry.get_count_by_manager_id, manager_id)
 
     def get_queue_count_by_manager_tg_id(self, tg_user_id: int) -> int:
-        return self._session_wrapper(queue_entry.get_count_by_manager_tg_id, tg_user_id)
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            queue_entry.get_count_by_manager_id,
+            queue_entry.get_count_by_manager_tg_id,
+            tg_user_id,
+            default=0
+        )
+
+    def get_queue_position_by_player_id(self, player_id: int) -> Optional[QueuePosition]:
+        if self.queue_engine is None:
+            return self._queue_position(self._session_wrapper(queue_entry.get_position_by_player_id, player_id))
+        loaded, position = self.queue_engine.get_position(player_id)
+        if not loaded:
+            self.queue_engine.load(self._session_wrapper(queue_entry.get_all))
+            loaded, position = self.queue_engine.get_position(player_id)
+        if loaded:
+            return position
+        # queue engine is unavailable, e.g. Redis is down
+        return self._queue_position(self._session_wrapper(queue_entry.get_position_by_player_id, player_id))
+
+    def get_queue_position_by_player_tg_id(self, tg_user_id: int) -> Optional[QueuePosition]:
+        # queue engine and the identity cache serve the repeated lookups without the DB
+        if self.queue_engine is None:
+            position = self._identity_wrapper(
+                self._session_wrapper,
+                'player_id',
+                queue_entry.get_position_by_player_id,
+                queue_entry.get_position_by_player_tg_id,
+                tg_user_id
+            )
+            return self._queue_position(position)
+        identity = self.get_identity(tg_user_id)
+        if identity is None or identity.player_id is None:
+            return None
+        return self.get_queue_position_by_player_id(identity.player_id)
+
+    def get_queue_waiting_position_by_player_tg_id(self, tg_user_id: int) -> Optional[tuple[int, str, int]]:
+        # (location id, location name, number of the not called players ahead), read from the DB,
+        # as the queue engine doesn't know the called players
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            queue_entry.get_waiting_position_by_player_id,
+            queue_entry.get_waiting_position_by_player_tg_id,
+            tg_user_id
+        )
+
+    def get_queue_head_by_location_id(self, location_id: int, limit: int) -> list[int]:
+        return self._page_wrapper('queue_head', queue_entry.get_head_by_location_id, location_id, limit)
+
+    def call_queue_entry_by_manager_id(
+            self,
+            manager_id: int,
+            player_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = self._commit_session_wrapper(queue_entry.call_by_manager_id, manager_id, player_id)
+        self._bump(bool(called), 'queue_entry')
+        return called or None
+
+    def call_queue_entry_by_manager_tg_id(
+            self,
+            tg_user_id: int,
+            player_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            queue_entry.call_by_manager_id,
+            queue_entry.call_by_manager_tg_id,
+            tg_user_id,
+            player_id
+        )
+        self._bump(bool(called), 'queue_entry')
+        return called or None
+
+    def call_next_queue_entry_by_manager_id(self, manager_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = self._commit_session_wrapper(queue_entry.call_next_by_manager_id, manager_id)
+        self._bump(bool(called), 'queue_entry')
+        return called or None
+
+    def call_next_queue_entry_by_manager_tg_id(self, tg_user_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            queue_entry.call_next_by_manager_id,
+            queue_entry.call_next_by_manager_tg_id,
+            tg_user_id
+        )
+        self._bump(bool(called), 'queue_entry')
+        return called or None
 
     def delete_queue_entry_by_player_id(self, player_id: int) -> bool:
-        return self._commit_session_wrapper(queue_entry.delete_by_player_id, player_id)
+        deleted = self._commit_session_wrapper(queue_entry.delete_by_player_id, player_id)
+        return self._bump(self._dequeue(deleted), 'queue_entry')
 
     def delete_queue_entry_by_player_tg_id(self, tg_user_id: int) -> bool:
-        return self._commit_session_wrapper(queue_entry.delete_by_player_tg_id, tg_user_id)
+        deleted = self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            queue_entry.delete_by_player_id,
+            queue_entry.delete_by_player_tg_id,
+            tg_user_id,
+            default=False
+        )
+        return self._bump(self._dequeue(deleted), 'queue_entry')
 
     def add_finished_location_by_player_id(self, player_id: int, location_id: int) -> bool:
         return self._commit_session_wrapper(finished_location.add_by_player_id, player_id, location_id)
 
     def add_finished_location_by_player_tg_id(self, tg_user_id: int, location_id: int) -> bool:
-        return self._commit_session_wrapper(finished_location.add_by_player_tg_id, tg_user_id, location_id)
+        return self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            finished_location.add_by_player_id,
+            finished_location.add_by_player_tg_id,
+            tg_user_id,
+            location_id,
+            default=False
+        )
 
     def get_finished_locations_by_player_id(self, player_id: int) -> list[FinishedLocation]:
         return self._session_wrapper(finished_location.get_by_player_id, player_id)
 
     def get_finished_locations_by_player_tg_id(self, tg_user_id: int) -> list[FinishedLocation]:
-        return self._session_wrapper(finished_location.get_by_player_tg_id, tg_user_id)
+        return self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            finished_location.get_by_player_id,
+            finished_location.get_by_player_tg_id,
+            tg_user_id,
+            default=[]
+        )
 
     def add_transfer_record(self, from_player_id: int, to_player_id: int, amount: int) -> bool:
         return self._commit_session_wrapper(transfer_record.add, from_player_id, to_player_id, amount)
@@ -239,25 +593,637 @@ class DBAdapter:
         return self._commit_session_wrapper(purchase_record.add, player_id, shop_id, manager_id, amount)
 
     def purchase_by_player_id(self, player_id: int, manager_id: int, amount: int) -> bool:
-        balance_updated = self.update_player_balance_by_id(player_id, -amount)
-        if balance_updated:
-            try:
-                _location = self.get_location_by_manager_id(manager_id)
-                if _location:
-                    _shop = self.get_shop_by_location_id(_location.id)
-                    if _shop:
-                        self.add_purchase_record(player_id, _shop.id, manager_id, amount)
-            except DBError:
-                pass  # suppress error
-        return balance_updated
+        purchased = self._commit_session_wrapper(player.purchase_by_id, player_id, manager_id, amount)
+        return self._bump(purchased, 'player')
 
     def reward_by_player_id(self, player_id: int, manager_id: int, amount: int) -> bool:
-        balance_updated = self.update_player_balance_by_id(player_id, amount)
-        if balance_updated:
-            try:
-                _location = self.get_location_by_manager_id(manager_id)
-                if _location:
-                    self.add_reward_record(player_id, _location.id, manager_id, amount)
-            except DBError:
-                pass  # suppress error
-        return balance_updated
+        rewarded = self._commit_session_wrapper(player.reward_by_id, player_id, manager_id, amount)
+        return self._bump(rewarded, 'player')
+
+    def purchase_by_player_ids(self, player_ids: list[int], manager_id: int, amount: int) -> int:
+        # number of the charged players, the ones who can't afford the purchase are skipped
+        if not player_ids:
+            return 0
+        purchased = self._commit_session_wrapper(player.purchase_many_by_id, player_ids, manager_id, amount) or 0
+        self._bump(purchased != 0, 'player')
+        return purchased
+
+    def reward_by_player_ids(self, player_ids: list[int], manager_id: int, amount: int) -> int:
+        # number of the rewarded players
+        if not player_ids:
+            return 0
+        rewarded = self._commit_session_wrapper(player.reward_many_by_id, player_ids, manager_id, amount) or 0
+        self._bump(rewarded != 0, 'player')
+        return rewarded
+
+
+class AsyncDBAdapter:
+    # asyncio counterpart of the DBAdapter with the same method surface, every method is a coroutine.
+    # operations are shared with the DBAdapter and executed via AsyncSession.run_sync,
+    # so all the I/O goes through the async driver and never blocks the event loop
+
+    def __init__(
+            self,
+            session_maker: async_sessionmaker,
+            logger: logging.Logger,
+            identity_cache: Optional[AsyncIdentityCache] = None,
+            page_cache: Optional[AsyncPageCache] = None,
+            queue_engine: Optional[AsyncQueueEngine] = None):
+        self.logger = logger
+        self.session_maker = session_maker
+        self.identity_cache = identity_cache
+        self.page_cache = page_cache
+        self.queue_engine = queue_engine
+
+    async def _session_wrapper(self, method: Callable, *args, **kwargs):
+        try:
+            async with self.session_maker() as session:
+                return await session.run_sync(method, *args, **kwargs)
+        except SQLAlchemyError as e:
+            self.logger.exception(e)
+            raise DBError(f"Error occurred while {method.__name__}: {e}")
+
+    async def _commit_session_wrapper(self, method: Callable, *args, **kwargs):
+        try:
+            async with self.session_maker.begin() as session:
+                return await session.run_sync(method, *args, **kwargs)
+        except IntegrityError as e:
+            self.logger.debug(e)
+            return False
+        except SQLAlchemyError as e:
+            self.logger.exception(e)
+            raise DBError(f"Error occurred while {method.__name__}: {e}")
+
+    def get_pool_stats(self) -> dict:
+        # no I/O is involved, thus it is a plain method as in the DBAdapter
+        return get_pool_stats(self.session_maker.kw['bind'].pool)
+
+    async def _identity_wrapper(
+            self,
+            wrapper: Callable,
+            field: str,
+            method_by_id: Callable,
+            method_by_tg_id: Callable,
+            tg_user_id: int,
+            *args,
+            default=None):
+        if self.identity_cache is None:
+            return await wrapper(method_by_tg_id, tg_user_id, *args)
+        identity = await self.get_identity(tg_user_id)
+        entity_id = None if identity is None else getattr(identity, field)
+        if entity_id is None:
+            return default
+        return await wrapper(method_by_id, entity_id, *args)
+
+    async def _invalidate_identity(self, tg_user_id: int):
+        if self.identity_cache is not None:
+            await self.identity_cache.invalidate(tg_user_id)
+
+    async def get_identity(self, tg_user_id: int) -> Optional[Identity]:
+        if self.identity_cache is not None:
+            identity = await self.identity_cache.get(tg_user_id)
+            if identity is not None:
+                return identity
+        identity = await self._session_wrapper(user.get_identity_by_tg_id, tg_user_id)
+        registered = identity is not None and (identity.player_id is not None or identity.manager_id is not None)
+        if self.identity_cache is not None and registered:
+            await self.identity_cache.set(tg_user_id, identity)
+        return identity
+
+    def get_identity_cache_stats(self) -> Optional[dict]:
+        return None if self.identity_cache is None else self.identity_cache.get_stats()
+
+    async def _page_wrapper(self, page: str, method: Callable, *args):
+        if self.page_cache is None:
+            return await self._session_wrapper(method, *args)
+        return await self.page_cache.get(page, (method.__name__, *args), lambda: self._session_wrapper(method, *args))
+
+    async def _bump(self, written: bool, *tables: str) -> bool:
+        if written and self.page_cache is not None:
+            await self.page_cache.bump(*tables)
+        return written
+
+    def get_page_cache_stats(self) -> Optional[dict]:
+        return None if self.page_cache is None else self.page_cache.get_stats()
+
+    async def _enqueue(self, added, location_id: int) -> bool:
+        # added is (queue entry id, player id, location name) of the committed queue entry or False
+        if not added:
+            return False
+        if self.queue_engine is not None:
+            entry_id, player_id, location_name = added
+            await self.queue_engine.add(entry_id, player_id, location_id, location_name)
+        return True
+
+    async def _dequeue(self, deleted) -> bool:
+        # deleted is (player id, location id) of the deleted queue entry, None or False
+        if not deleted:
+            return False
+        if self.queue_engine is not None:
+            await self.queue_engine.remove(deleted[0])
+        return True
+
+    @staticmethod
+    def _queue_position(position: Optional[tuple[int, str, int, int]]) -> Optional[QueuePosition]:
+        # position read from the DB has no ETA, service times are only measured by the queue engine
+        if position is None:
+            return None
+        location_id, location_name, ahead, size = position
+        return QueuePosition(location_id, location_name, ahead, size, eta=None)
+
+    def get_queue_engine_stats(self) -> Optional[dict]:
+        return None if self.queue_engine is None else self.queue_engine.get_stats()
+
+    async def add_role(self, name: str) -> bool:
+        return await self._commit_session_wrapper(role.add, name)
+
+    async def delete_role_by_name(self, name: str) -> bool:
+        return await self._commit_session_wrapper(role.delete_by_name, name)
+
+    async def add_telegram_account(self, tg_user_id: int, tg_chat_id: int, tg_username: Optional[str] = None) -> bool:
+        return await self._commit_session_wrapper(telegram_account.add, tg_user_id, tg_chat_id, tg_username)
+
+    async def get_telegram_account(self, tg_user_id: int) -> Optional[TelegramAccount]:
+        return await self._session_wrapper(telegram_account.get, tg_user_id)
+
+    async def update_telegram_account_username(self, tg_user_id: int, tg_username: str) -> bool:
+        return await self._commit_session_wrapper(telegram_account.update_username, tg_user_id, tg_username)
+
+    async def add_user(self, role_name: str, tg_user_id: int) -> bool:
+        added = await self._commit_session_wrapper(user.add, role_name, tg_user_id)
+        await self._invalidate_identity(tg_user_id)
+        return added
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self._session_wrapper(user.get_by_id, user_id)
+
+    async def get_user_by_tg_id(self, tg_user_id: int) -> Optional[User]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'user_id',
+            user.get_by_id,
+            user.get_by_tg_id,
+            tg_user_id
+        )
+
+    async def check_player_name_availability(self, name: str) -> bool:
+        return await self._session_wrapper(player.check_name_availability, name)
+
+    async def add_player(self, tg_user_id: int, name: str) -> bool:
+        added = await self._commit_session_wrapper(player.add, tg_user_id, name)
+        await self._invalidate_identity(tg_user_id)
+        return await self._bump(added, 'player')
+
+    async def get_player_by_id(self, player_id: int) -> Optional[Player]:
+        return await self._session_wrapper(player.get_by_id, player_id)
+
+    async def get_player_by_tg_id(self, tg_user_id: int) -> Optional[Player]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            player.get_by_id,
+            player.get_by_tg_id,
+            tg_user_id
+        )
+
+    async def get_all_players(self, offset: int, limit: int) -> list[Player]:
+        return await self._session_wrapper(player.get_all, offset, limit)
+
+    async def get_all_players_page(self, cursor: Optional[int], limit: int, backward: bool = False) -> list[Player]:
+        return await self._page_wrapper('players', player.get_page, cursor, limit, backward)
+
+    async def search_players_by_name(self, query: str, limit: int) -> list[Player]:
+        return await self._session_wrapper(player.search_by_name, query, limit)
+
+    async def get_all_players_count(self) -> int:
+        return await self._page_wrapper('players_count', player.get_all_count)
+
+    async def update_player_balance_by_id(self, player_id: int, amount: int) -> bool:
+        updated = await self._commit_session_wrapper(player.update_balance_by_id, player_id, amount)
+        return await self._bump(updated, 'player')
+
+    async def update_player_balance_by_tg_id(self, tg_user_id: int, amount: int) -> bool:
+        updated = await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            player.update_balance_by_id,
+            player.update_balance_by_tg_id,
+            tg_user_id,
+            amount,
+            default=False
+        )
+        return await self._bump(updated, 'player')
+
+    async def transfer_by_player_id(self, from_player_id: int, to_player_id: int, amount: int) -> bool:
+        transferred = await self._commit_session_wrapper(player.transfer_by_id, from_player_id, to_player_id, amount)
+        return await self._bump(transferred, 'player')
+
+    async def transfer_by_player_tg_id(self, from_user_tg_id: int, to_user_tg_id: int, amount: int) -> bool:
+        if self.identity_cache is None:
+            transferred = await self._commit_session_wrapper(
+                player.transfer_by_tg_id,
+                from_user_tg_id,
+                to_user_tg_id,
+                amount
+            )
+            return await self._bump(transferred, 'player')
+        from_identity = await self.get_identity(from_user_tg_id)
+        to_identity = await self.get_identity(to_user_tg_id)
+        from_player_id = None if from_identity is None else from_identity.player_id
+        to_player_id = None if to_identity is None else to_identity.player_id
+        if from_player_id is None or to_player_id is None:
+            return False
+        return await self.transfer_by_player_id(from_player_id, to_player_id, amount)
+
+    async def check_manager_name_availability(self, name: str) -> bool:
+        return await self._session_wrapper(manager.check_name_availability, name)
+
+    async def add_manager(self, tg_user_id: int, name: str) -> bool:
+        added = await self._commit_session_wrapper(manager.add, tg_user_id, name)
+        await self._invalidate_identity(tg_user_id)
+        return added
+
+    async def get_manager_by_id(self, manager_id: int) -> Optional[Manager]:
+        return await self._session_wrapper(manager.get_by_id, manager_id)
+
+    async def get_manager_by_tg_id(self, tg_user_id: int) -> Optional[Manager]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            manager.get_by_id,
+            manager.get_by_tg_id,
+            tg_user_id
+        )
+
+    async def update_manager_location_by_id(self, manager_id: int, new_location_id: Optional[int] = None) -> bool:
+        updated = await self._commit_session_wrapper(manager.update_location_by_id, manager_id, new_location_id)
+        return await self._bump(updated, 'manager')
+
+    async def update_manager_location_by_tg_id(self, tg_user_id: int, new_location_id: Optional[int] = None) -> bool:
+        updated = await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            manager.update_location_by_id,
+            manager.update_location_by_tg_id,
+            tg_user_id,
+            new_location_id,
+            default=False
+        )
+        return await self._bump(updated, 'manager')
+
+    async def add_managers_blacklist_record(self, tg_user_id: int) -> bool:
+        return await self._commit_session_wrapper(managers_blacklist_record.add, tg_user_id)
+
+    async def get_managers_blacklist_record(self, tg_user_id: int) -> Optional[ManagersBlacklistRecord]:
+        return await self._session_wrapper(managers_blacklist_record.get_by_tg_id, tg_user_id)
+
+    async def delete_managers_blacklist_record(self, tg_user_id: int) -> bool:
+        return await self._commit_session_wrapper(managers_blacklist_record.delete_by_tg_id, tg_user_id)
+
+    async def add_location(self, name: str, max_reward: int, is_onetime: bool) -> bool:
+        added = await self._commit_session_wrapper(location.add, name, max_reward, is_onetime)
+        return await self._bump(added, 'location')
+
+    async def get_location_by_id(self, location_id: int) -> Optional[Location]:
+        return await self._session_wrapper(location.get_by_id, location_id)
+
+    async def get_location_by_manager_id(self, manager_id: int) -> Optional[Location]:
+        return await self._session_wrapper(location.get_by_manager_id, manager_id)
+
+    async def get_location_by_manager_tg_id(self, tg_user_id: int) -> Optional[Location]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            location.get_by_manager_id,
+            location.get_by_manager_tg_id,
+            tg_user_id
+        )
+
+    async def get_all_locations(self, offset: int, limit: int) -> list[tuple[Location, int]]:
+        return await self._session_wrapper(location.get_all, offset, limit)
+
+    async def get_all_locations_page(
+            self,
+            cursor: Optional[tuple[int, int]],
+            limit: int,
+            backward: bool = False) -> list[tuple[Location, int]]:
+        return await self._page_wrapper('locations', location.get_page, cursor, limit, backward)
+
+    async def search_locations_by_name(self, query: str, limit: int) -> list[tuple[Location, int]]:
+        return await self._session_wrapper(location.search_by_name, query, limit)
+
+    async def get_all_locations_count(self) -> int:
+        return await self._session_wrapper(location.get_all_count)
+
+    async def get_all_active_locations(self, offset: int, limit: int) -> list[tuple[Location, int]]:
+        return await self._session_wrapper(location.get_all_active, offset, limit)
+
+    async def get_all_active_locations_page(
+            self,
+            cursor: Optional[tuple[int, int]],
+            limit: int,
+            backward: bool = False) -> list[tuple[Location, int]]:
+        return await self._page_wrapper('active_locations', location.get_active_page, cursor, limit, backward)
+
+    async def get_all_active_locations_count(self) -> int:
+        return await self._session_wrapper(location.get_all_active_count)
+
+    async def update_location_by_id(self, location_id: int, is_active: bool) -> bool:
+        updated = await self._commit_session_wrapper(location.update_by_id, location_id, is_active)
+        return await self._bump(updated, 'location')
+
+    async def update_location_by_manager_id(self, manager_id: int, is_active: bool) -> bool:
+        updated = await self._commit_session_wrapper(location.update_by_manager_id, manager_id, is_active)
+        return await self._bump(updated, 'location')
+
+    async def update_location_by_manager_tg_id(self, tg_user_id: int, is_active: bool) -> bool:
+        updated = await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            location.update_by_manager_id,
+            location.update_by_manager_tg_id,
+            tg_user_id,
+            is_active,
+            default=False
+        )
+        return await self._bump(updated, 'location')
+
+    async def add_shop(self, location_id: int, name: str) -> bool:
+        return await self._commit_session_wrapper(shop.add, location_id, name)
+
+    async def get_shop_by_id(self, shop_id: int) -> Optional[Shop]:
+        return await self._session_wrapper(shop.get_by_id, shop_id)
+
+    async def get_shop_by_location_id(self, location_id: int) -> Optional[Shop]:
+        return await self._session_wrapper(shop.get_by_location_id, location_id)
+
+    async def add_queue_entry_by_player_id(self, player_id: int, location_id: int) -> bool:
+        added = await self._commit_session_wrapper(queue_entry.add_by_player_id, player_id, location_id)
+        return await self._bump(await self._enqueue(added, location_id), 'queue_entry')
+
+    async def add_queue_entry_by_player_tg_id(self, tg_user_id: int, location_id: int) -> bool:
+        added = await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            queue_entry.add_by_player_id,
+            queue_entry.add_by_player_tg_id,
+            tg_user_id,
+            location_id,
+            default=False
+        )
+        return await self._bump(await self._enqueue(added, location_id), 'queue_entry')
+
+    async def get_queue_entry_by_player_id(self, player_id: int) -> Optional[QueueEntry]:
+        return await self._session_wrapper(queue_entry.get_by_player_id, player_id)
+
+    async def get_queue_entry_by_player_tg_id(self, tg_user_id: int) -> Optional[QueueEntry]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            queue_entry.get_by_player_id,
+            queue_entry.get_by_player_tg_id,
+            tg_user_id
+        )
+
+    async def get_queue_by_location_id(self, location_id: int, offset: int, limit: int) -> list[Player]:
+        return await self._session_wrapper(queue_entry.get_by_location_id, location_id, offset, limit)
+
+    async def get_queue_by_manager_id(self, manager_id: int, offset: int, limit: int) -> list[Player]:
+        return await self._session_wrapper(queue_entry.get_by_manager_id, manager_id, offset, limit)
+
+    async def get_queue_by_manager_tg_id(self, tg_user_id: int, offset: int, limit: int) -> list[Player]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            queue_entry.get_by_manager_id,
+            queue_entry.get_by_manager_tg_id,
+            tg_user_id,
+            offset,
+            limit,
+            default=[]
+        )
+
+    async def get_queue_page_by_location_id(
+            self,
+            location_id: int,
+            cursor: Optional[int],
+            limit: int,
+            backward: bool = False) -> list[tuple[Player, int]]:
+        return await self._page_wrapper(
+            'queue',
+            queue_entry.get_page_by_location_id,
+            location_id,
+            cursor,
+            limit,
+            backward
+        )
+
+    async def get_queue_page_by_manager_id(
+            self,
+            manager_id: int,
+            cursor: Optional[int],
+            limit: int,
+            backward: bool = False) -> list[tuple[Player, int]]:
+        return await self._page_wrapper(
+            'queue_by_manager',
+            queue_entry.get_page_by_manager_id,
+            manager_id,
+            cursor,
+            limit,
+            backward
+        )
+
+    async def get_queue_page_by_manager_tg_id(
+            self,
+            tg_user_id: int,
+            cursor: Optional[int],
+            limit: int,
+            backward: bool = False) -> list[tuple[Player, int]]:
+        return await self._identity_wrapper(
+            functools.partial(self._page_wrapper, 'queue_by_manager'),
+            'manager_id',
+            queue_entry.get_page_by_manager_id,
+            queue_entry.get_page_by_manager_tg_id,
+            tg_user_id,
+            cursor,
+            limit,
+            backward,
+            default=[]
+        )
+
+    async def get_queue_count_by_location_id(self, location_id: int) -> int:
+        return await self._session_wrapper(queue_entry.get_count_by_location_id, location_id)
+
+    async def get_queue_count_by_manager_id(self, manager_id: int) -> int:
+        return await self._session_wrapper(queue_entry.get_count_by_manager_id, manager_id)
+
+    async def get_queue_count_by_manager_tg_id(self, tg_user_id: int) -> int:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'manager_id',
+            queue_entry.get_count_by_manager_id,
+            queue_entry.get_count_by_manager_tg_id,
+            tg_user_id,
+            default=0
+        )
+
+    async def get_queue_position_by_player_id(self, player_id: int) -> Optional[QueuePosition]:
+        if self.queue_engine is None:
+            return self._queue_position(await self._session_wrapper(queue_entry.get_position_by_player_id, player_id))
+        loaded, position = await self.queue_engine.get_position(player_id)
+        if not loaded:
+            await self.queue_engine.load(await self._session_wrapper(queue_entry.get_all))
+            loaded, position = await self.queue_engine.get_position(player_id)
+        if loaded:
+            return position
+        # queue engine is unavailable, e.g. Redis is down
+        return self._queue_position(await self._session_wrapper(queue_entry.get_position_by_player_id, player_id))
+
+    async def get_queue_position_by_player_tg_id(self, tg_user_id: int) -> Optional[QueuePosition]:
+        # queue engine and the identity cache serve the repeated lookups without the DB
+        if self.queue_engine is None:
+            position = await self._identity_wrapper(
+                self._session_wrapper,
+                'player_id',
+                queue_entry.get_position_by_player_id,
+                queue_entry.get_position_by_player_tg_id,
+                tg_user_id
+            )
+            return self._queue_position(position)
+        identity = await self.get_identity(tg_user_id)
+        if identity is None or identity.player_id is None:
+            return None
+        return await self.get_queue_position_by_player_id(identity.player_id)
+
+    async def get_queue_waiting_position_by_player_tg_id(self, tg_user_id: int) -> Optional[tuple[int, str, int]]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            queue_entry.get_waiting_position_by_player_id,
+            queue_entry.get_waiting_position_by_player_tg_id,
+            tg_user_id
+        )
+
+    async def get_queue_head_by_location_id(self, location_id: int, limit: int) -> list[int]:
+        return await self._page_wrapper('queue_head', queue_entry.get_head_by_location_id, location_id, limit)
+
+    async def call_queue_entry_by_manager_id(
+            self,
+            manager_id: int,
+            player_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = await self._commit_session_wrapper(queue_entry.call_by_manager_id, manager_id, player_id)
+        await self._bump(bool(called), 'queue_entry')
+        return called or None
+
+    async def call_queue_entry_by_manager_tg_id(
+            self,
+            tg_user_id: int,
+            player_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            queue_entry.call_by_manager_id,
+            queue_entry.call_by_manager_tg_id,
+            tg_user_id,
+            player_id
+        )
+        await self._bump(bool(called), 'queue_entry')
+        return called or None
+
+    async def call_next_queue_entry_by_manager_id(
+            self,
+            manager_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = await self._commit_session_wrapper(queue_entry.call_next_by_manager_id, manager_id)
+        await self._bump(bool(called), 'queue_entry')
+        return called or None
+
+    async def call_next_queue_entry_by_manager_tg_id(
+            self,
+            tg_user_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+        called = await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'manager_id',
+            queue_entry.call_next_by_manager_id,
+            queue_entry.call_next_by_manager_tg_id,
+            tg_user_id
+        )
+        await self._bump(bool(called), 'queue_entry')
+        return called or None
+
+    async def delete_queue_entry_by_player_id(self, player_id: int) -> bool:
+        deleted = await self._commit_session_wrapper(queue_entry.delete_by_player_id, player_id)
+        return await self._bump(await self._dequeue(deleted), 'queue_entry')
+
+    async def delete_queue_entry_by_player_tg_id(self, tg_user_id: int) -> bool:
+        deleted = await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            queue_entry.delete_by_player_id,
+            queue_entry.delete_by_player_tg_id,
+            tg_user_id,
+            default=False
+        )
+        return await self._bump(await self._dequeue(deleted), 'queue_entry')
+
+    async def add_finished_location_by_player_id(self, player_id: int, location_id: int) -> bool:
+        return await self._commit_session_wrapper(finished_location.add_by_player_id, player_id, location_id)
+
+    async def add_finished_location_by_player_tg_id(self, tg_user_id: int, location_id: int) -> bool:
+        return await self._identity_wrapper(
+            self._commit_session_wrapper,
+            'player_id',
+            finished_location.add_by_player_id,
+            finished_location.add_by_player_tg_id,
+            tg_user_id,
+            location_id,
+            default=False
+        )
+
+    async def get_finished_locations_by_player_id(self, player_id: int) -> list[FinishedLocation]:
+        return await self._session_wrapper(finished_location.get_by_player_id, player_id)
+
+    async def get_finished_locations_by_player_tg_id(self, tg_user_id: int) -> list[FinishedLocation]:
+        return await self._identity_wrapper(
+            self._session_wrapper,
+            'player_id',
+            finished_location.get_by_player_id,
+            finished_location.get_by_player_tg_id,
+            tg_user_id,
+            default=[]
+        )
+
+    async def add_transfer_record(self, from_player_id: int, to_player_id: int, amount: int) -> bool:
+        return await self._commit_session_wrapper(transfer_record.add, from_player_id, to_player_id, amount)
+
+    async def add_reward_record(self, player_id: int, location_id: int, manager_id: int, amount: int) -> bool:
+        return await self._commit_session_wrapper(reward_record.add, player_id, location_id, manager_id, amount)
+
+    async def add_purchase_record(self, player_id: int, shop_id: int, manager_id: int, amount: int) -> bool:
+        return await self._commit_session_wrapper(purchase_record.add, player_id, shop_id, manager_id, amount)
+
+    async def purchase_by_player_id(self, player_id: int, manager_id: int, amount: int) -> bool:
+        purchased = await self._commit_session_wrapper(player.purchase_by_id, player_id, manager_id, amount)
+        return await self._bump(purchased, 'player')
+
+    async def reward_by_player_id(self, player_id: int, manager_id: int, amount: int) -> bool:
+        rewarded = await self._commit_session_wrapper(player.reward_by_id, player_id, manager_id, amount)
+        return await self._bump(rewarded, 'player')
+
+    async def purchase_by_player_ids(self, player_ids: list[int], manager_id: int, amount: int) -> int:
+        if not player_ids:
+            return 0
+        purchased = await self._commit_session_wrapper(
+            player.purchase_many_by_id,
+            player_ids,
+            manager_id,
+            amount
+        ) or 0
+        await self._bump(purchased != 0, 'player')
+        return purchased
+
+    async def reward_by_player_ids(self, player_ids: list[int], manager_id: int, amount: int) -> int:
+        if not player_ids:
+            return 0
+        rewarded = await self._commit_session_wrapper(player.reward_many_by_id, player_ids, manager_id, amount) or 0
+        await self._bump(rewarded != 0, 'player')
+        return rewarded
@@ -0,0 +1,144 @@
+import json
+import logging
+import math
+from typing import NamedTuple, Optional
+
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+
+from fair.utils import LRUCache
+
+
+class Identity(NamedTuple):
+    user_id: int
+    role: str
+    player_id: Optional[int]
+    manager_id: Optional[int]
+    chat_id: int
+
+
+class BaseIdentityCache:
+    # tg_user_id -> Identity cache, in-process LRU is the first tier and the optional Redis is the second one,
+    # Redis tier is shared across the workers, thus an identity resolved by one worker is reused by the others.
+    # Redis errors are logged and never break the request, identity is resolved by the DB instead
+
+    def __init__(self, max_size: int, ttl: float, logger: logging.Logger, prefix: str = ''):
+        self.local = LRUCache(max_size, ttl)
+        self.logger = logger
+        self.prefix = prefix
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _key(self, tg_user_id: int) -> str:
+        return f'{self.prefix}identity:{tg_user_id}'
+
+    def _redis_ttl(self) -> int:
+        return max(1, math.ceil(self.local.ttl))
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            'size': len(self.local),
+            'max_size': self.local.max_size,
+            'hits': self.hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+
+class IdentityCache(BaseIdentityCache):
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            logger: logging.Logger,
+            redis: Optional[Redis] = None,
+            prefix: str = ''):
+        super().__init__(max_size, ttl, logger, prefix)
+        self.redis = redis
+
+    def get(self, tg_user_id: int) -> Optional[Identity]:
+        identity = self.local.get(tg_user_id)
+        if identity is not None:
+            self.hits += 1
+            return identity
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(self._key(tg_user_id))
+            except RedisError as e:
+                self.logger.warning(e)
+                raw = None
+            if raw is not None:
+                identity = Identity(*json.loads(raw))
+                self.local.set(tg_user_id, identity)
+                self.redis_hits += 1
+                return identity
+        self.misses += 1
+        return None
+
+    def set(self, tg_user_id: int, identity: Identity):
+        self.local.set(tg_user_id, identity)
+        if self.redis is not None:
+            try:
+                self.redis.set(self._key(tg_user_id), json.dumps(identity), ex=self._redis_ttl())
+            except RedisError as e:
+                self.logger.warning(e)
+
+    def invalidate(self, tg_user_id: int):
+        self.local.delete(tg_user_id)
+        if self.redis is not None:
+            try:
+                self.redis.delete(self._key(tg_user_id))
+            except RedisError as e:
+                self.logger.warning(e)
+
+
+class AsyncIdentityCache(BaseIdentityCache):
+    # asyncio counterpart of the IdentityCache, local tier is shared as it never blocks
+
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            logger: logging.Logger,
+            redis: Optional[AsyncRedis] = None,
+            prefix: str = ''):
+        super().__init__(max_size, ttl, logger, prefix)
+        self.redis = redis
+
+    async def get(self, tg_user_id: int) -> Optional[Identity]:
+        identity = self.local.get(tg_user_id)
+        if identity is not None:
+            self.hits += 1
+            return identity
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self._key(tg_user_id))
+            except RedisError as e:
+                self.logger.warning(e)
+                raw = None
+            if raw is not None:
+                identity = Identity(*json.loads(raw))
+                self.local.set(tg_user_id, identity)
+                self.redis_hits += 1
+                return identity
+        self.misses += 1
+        return None
+
+    async def set(self, tg_user_id: int, identity: Identity):
+        self.local.set(tg_user_id, identity)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._key(tg_user_id), json.dumps(identity), ex=self._redis_ttl())
+            except RedisError as e:
+                self.logger.warning(e)
+
+    async def invalidate(self, tg_user_id: int):
+        self.local.delete(tg_user_id)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self._key(tg_user_id))
+            except RedisError as e:
+                self.logger.warning(e)
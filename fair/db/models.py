@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Integer, BigInteger, String, Identity, ForeignKey, CheckConstraint
+from sqlalchemy import Boolean, Integer, BigInteger, String, Identity, ForeignKey, CheckConstraint, Index, func, false
 from sqlalchemy.orm import DeclarativeBase, mapped_column, relationship
 
 
@@ -57,6 +57,15 @@ class Player(BaseModel):
     queue_entry = relationship("QueueEntry")
     finished_locations = relationship("FinishedLocation")
 
+    __table_args__ = (
+        # case-insensitive name prefix search, text_pattern_ops makes LIKE 'prefix%' indexable in any collation
+        Index(
+            'ix_players_name_lower',
+            func.lower(name).label('name_lower'),
+            postgresql_ops={'name_lower': 'text_pattern_ops'}
+        ),
+    )
+
 
 class Manager(BaseModel):
     __tablename__ = 'managers'
@@ -96,10 +105,20 @@ class Location(BaseModel):
     max_reward = mapped_column(Integer,  CheckConstraint('max_reward >= 0'), default=100, nullable=False)
     is_onetime = mapped_column(Boolean, default=False, nullable=False)
     is_active = mapped_column(Boolean, default=False, nullable=False)
+    # Denormalized number of queue entries, maintained by the queue_entry operations
+    queue_size = mapped_column(
+        Integer, CheckConstraint('queue_size >= 0'),
+        default=0, server_default='0', nullable=False
+    )
 
     # Relationships
     queue = relationship("QueueEntry")
 
+    __table_args__ = (
+        Index('ix_locations_queue_size', queue_size.desc(), id),
+        Index('ix_locations_is_active_queue_size', is_active, queue_size.desc(), id),
+    )
+
 
 class Shop(BaseModel):
     __tablename__ = 'shops'
@@ -123,6 +142,14 @@ class QueueEntry(BaseModel):
     player_id = mapped_column(ForeignKey("players.id"), unique=True, nullable=False)
     location_id = mapped_column(ForeignKey("locations.id"), nullable=False)
 
+    # Data columns
+    # Called by the manager of the location, the entry is kept until the player leaves the queue
+    is_called = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_queues_location_id_id', location_id, id),
+    )
+
 
 class FinishedLocation(BaseModel):
     __tablename__ = 'finished_locations'
@@ -1,9 +1,9 @@
 from typing import Optional, Union
 
-from sqlalchemy import select, insert, update, func, ScalarSelect
+from sqlalchemy import select, insert, update, func, and_, or_, Select, ScalarSelect
 from sqlalchemy.orm import Session
 
-from fair.db.models import TelegramAccount, User, Manager, Location, QueueEntry
+from fair.db.models import TelegramAccount, User, Manager, Location
 
 
 def add(session: Session, name: str, max_reward: int, is_onetime: bool) -> bool:
@@ -44,16 +44,60 @@ def get_by_manager_tg_id(session: Session, tg_user_id: int) -> Optional[Location
 
 def get_all(session: Session, offset: int, limit: int) -> list[tuple[Location, int]]:
     locations = session.execute(
-        select(Location, func.count(QueueEntry.id))
-        .outerjoin(QueueEntry)
-        .group_by(Location.id)
-        .order_by(func.count(QueueEntry.id).desc())
+        select(Location, Location.queue_size)
+        .order_by(Location.queue_size.desc(), Location.id)
         .offset(offset)
         .limit(limit)
     ).all()
     return [(location_[0], location_[1]) for location_ in locations]
 
 
+def _page_query(cursor: Optional[tuple[int, int]], backward: bool) -> Select:
+    # keyset pagination by (queue_size DESC, id), cursor is the key of the last location of the current page,
+    # or the first one if the previous page is requested
+    query = select(Location, Location.queue_size)
+    if cursor is not None:
+        queue_size, location_id = cursor
+        if backward:
+            query = query.where(or_(
+                Location.queue_size > queue_size,
+                and_(Location.queue_size == queue_size, Location.id < location_id)
+            ))
+        else:
+            query = query.where(or_(
+                Location.queue_size < queue_size,
+                and_(Location.queue_size == queue_size, Location.id > location_id)
+            ))
+    if backward:
+        return query.order_by(Location.queue_size.asc(), Location.id.desc())
+    return query.order_by(Location.queue_size.desc(), Location.id.asc())
+
+
+def get_page(
+        session: Session,
+        cursor: Optional[tuple[int, int]],
+        limit: int,
+        backward: bool = False) -> list[tuple[Location, int]]:
+    locations = session.execute(
+        _page_query(cursor, backward)
+        .limit(limit)
+    ).all()
+    locations = [(location_[0], location_[1]) for location_ in locations]
+    return locations[::-1] if backward else locations
+
+
+def search_by_name(session: Session, query: str, limit: int) -> list[tuple[Location, int]]:
+    # see player.search_by_name, locations are few, thus no index is needed
+    pattern = query.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    locations = session.execute(
+        select(Location, Location.queue_size)
+        .where(func.lower(Location.name).like(pattern, escape='\\'))
+        .order_by(func.lower(Location.name).asc(), Location.id.asc())
+        .limit(limit)
+    ).all()
+    return [(location_[0], location_[1]) for location_ in locations]
+
+
 def get_all_count(session: Session) -> int:
     locations_cnt = session.execute(
         select(func.count(Location.id))
@@ -63,17 +107,29 @@ def get_all_count(session: Session) -> int:
 
 def get_all_active(session: Session, offset: int, limit: int) -> list[tuple[Location, int]]:
     locations = session.execute(
-        select(Location, func.count(QueueEntry.id))
-        .outerjoin(QueueEntry)
+        select(Location, Location.queue_size)
         .where(Location.is_active)
-        .group_by(Location.id)
-        .order_by(func.count(QueueEntry.id).desc())
+        .order_by(Location.queue_size.desc(), Location.id)
         .offset(offset)
         .limit(limit)
     ).all()
     return [(location_[0], location_[1]) for location_ in locations]
 
 
+def get_active_page(
+        session: Session,
+        cursor: Optional[tuple[int, int]],
+        limit: int,
+        backward: bool = False) -> list[tuple[Location, int]]:
+    locations = session.execute(
+        _page_query(cursor, backward)
+        .where(Location.is_active)
+        .limit(limit)
+    ).all()
+    locations = [(location_[0], location_[1]) for location_ in locations]
+    return locations[::-1] if backward else locations
+
+
 def get_all_active_count(session: Session) -> int:
     locations_cnt = session.execute(
         select(func.count(Location.id))
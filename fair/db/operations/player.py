@@ -1,9 +1,9 @@
 from typing import Optional, Union
 
-from sqlalchemy import select, insert, update, func, ScalarSelect
+from sqlalchemy import select, insert, update, func, literal, or_, values, column, Integer, ScalarSelect, CTE
 from sqlalchemy.orm import Session
 
-from fair.db.models import TelegramAccount, User, Player
+from fair.db.models import TelegramAccount, User, Player, Manager, Shop, TransferRecord, RewardRecord, PurchaseRecord
 
 
 def check_name_availability(session: Session, name: str) -> bool:
@@ -55,6 +55,35 @@ def get_all(session: Session, offset: int, limit: int) -> list[Player]:
     return [player_[0] for player_ in players]
 
 
+def get_page(session: Session, cursor: Optional[int], limit: int, backward: bool = False) -> list[Player]:
+    # keyset pagination by id, cursor is the id of the last player of the current page,
+    # or the first one if the previous page is requested
+    query = select(Player)
+    if backward:
+        if cursor is not None:
+            query = query.where(Player.id < cursor)
+        query = query.order_by(Player.id.desc())
+    else:
+        if cursor is not None:
+            query = query.where(Player.id > cursor)
+        query = query.order_by(Player.id.asc())
+    players = session.execute(query.limit(limit)).all()
+    players = [player_[0] for player_ in players]
+    return players[::-1] if backward else players
+
+
+def search_by_name(session: Session, query: str, limit: int) -> list[Player]:
+    # LIKE wildcards typed by the user are escaped, thus the query is always treated as a plain name prefix
+    pattern = query.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    players = session.execute(
+        select(Player)
+        .where(func.lower(Player.name).like(pattern, escape='\\'))
+        .order_by(func.lower(Player.name).asc(), Player.id.asc())
+        .limit(limit)
+    ).all()
+    return [player_[0] for player_ in players]
+
+
 def get_all_count(session: Session) -> int:
     players_cnt = session.execute(
         select(func.count(Player.id))
@@ -85,20 +114,38 @@ def transfer_by_id(session: Session,
                    from_player_id: Union[int, ScalarSelect],
                    to_player_id: Union[int, ScalarSelect],
                    amount: int) -> bool:
-    result = session.execute(
+    # single statement: both players are locked in the order of their ids, so concurrent transfers
+    # in opposite directions can't deadlock, then the sender is debited, the recipient is credited
+    # and the transfer record is inserted from the rows returned by both updates
+    locked = (
+        select(Player.id)
+        .where(or_(Player.id == from_player_id, Player.id == to_player_id))
+        .order_by(Player.id.asc())
+        .with_for_update()
+    ).cte('locked')
+    locked_cnt = select(func.count()).select_from(locked).scalar_subquery()
+    debited = (
         update(Player)
-        .where(Player.id == from_player_id)
+        .where(Player.id == from_player_id, Player.balance >= amount, locked_cnt == 2)
         .values(balance=Player.balance - amount)
-    ).rowcount
-    if result != 0:
-        result = session.execute(
-            update(Player)
-            .where(Player.id == to_player_id)
-            .values(balance=Player.balance + amount)
-        ).rowcount
-    if result == 0:
-        session.rollback()
-    return result != 0
+        .returning(Player.id)
+    ).cte('debited')
+    credited = (
+        update(Player)
+        .where(Player.id == to_player_id, debited.c.id.is_not(None))
+        .values(balance=Player.balance + amount)
+        .returning(Player.id)
+    ).cte('credited')
+    # rowcount of INSERT ... SELECT is not reported by every SQLAlchemy version, the inserted id is returned instead
+    result = session.execute(
+        insert(TransferRecord)
+        .from_select(
+            ['sender_player_id', 'receiver_player_id', 'amount'],
+            select(debited.c.id, credited.c.id, literal(amount))
+        )
+        .returning(TransferRecord.id)
+    ).first()
+    return result is not None
 
 
 def transfer_by_tg_id(session: Session, from_user_tg_id: int, to_user_tg_id: int, amount: int) -> bool:
@@ -115,3 +162,125 @@ def transfer_by_tg_id(session: Session, from_user_tg_id: int, to_user_tg_id: int
         .where(TelegramAccount.tg_user_id == to_user_tg_id)
     ).scalar_subquery()
     return transfer_by_id(session, from_player_id, to_player_id, amount)
+
+
+def purchase_by_id(session: Session, player_id: Union[int, ScalarSelect], manager_id: int, amount: int) -> bool:
+    # single statement: the balance is only charged if the manager's location has a shop and the player
+    # can afford the purchase, and the purchase record is inserted from the rows returned by the update
+    shop = (
+        select(Shop.id.label('shop_id'))
+        .join(Manager, Manager.location_id == Shop.location_id)
+        .where(Manager.id == manager_id)
+    ).cte('shop')
+    charged = (
+        update(Player)
+        .where(Player.id == player_id, Player.balance >= amount)
+        .where(shop.c.shop_id.is_not(None))
+        .values(balance=Player.balance - amount)
+        .returning(Player.id, shop.c.shop_id)
+    ).cte('charged')
+    # rowcount of INSERT ... SELECT is not reported by every SQLAlchemy version, the inserted id is returned instead
+    result = session.execute(
+        insert(PurchaseRecord)
+        .from_select(
+            ['customer_player_id', 'shop_id', 'conducted_by_manager_id', 'amount'],
+            select(charged.c.id, charged.c.shop_id, literal(manager_id), literal(amount))
+        )
+        .returning(PurchaseRecord.id)
+    ).first()
+    return result is not None
+
+
+def reward_by_id(session: Session, player_id: Union[int, ScalarSelect], manager_id: int, amount: int) -> bool:
+    # single statement: the balance is only rewarded if the manager is on a location,
+    # and the reward record is inserted from the rows returned by the update
+    location = (
+        select(Manager.location_id)
+        .where(Manager.id == manager_id, Manager.location_id.is_not(None))
+    ).cte('location')
+    rewarded = (
+        update(Player)
+        .where(Player.id == player_id)
+        .where(location.c.location_id.is_not(None))
+        .values(balance=Player.balance + amount)
+        .returning(Player.id, location.c.location_id)
+    ).cte('rewarded')
+    # rowcount of INSERT ... SELECT is not reported by every SQLAlchemy version, the inserted id is returned instead
+    result = session.execute(
+        insert(RewardRecord)
+        .from_select(
+            ['recipient_player_id', 'location_id', 'conducted_by_manager_id', 'amount'],
+            select(rewarded.c.id, rewarded.c.location_id, literal(manager_id), literal(amount))
+        )
+        .returning(RewardRecord.id)
+    ).first()
+    return result is not None
+
+
+def _lock_many(player_ids: list[int]) -> CTE:
+    # player ids are joined as a VALUES list, the players are locked in the order of their ids,
+    # thus concurrent bulk updates of overlapping groups can't deadlock
+    recipients = values(column('player_id', Integer), name='recipients').data(
+        [(player_id,) for player_id in sorted(set(player_ids))]
+    )
+    return (
+        select(Player.id)
+        .join(recipients, Player.id == recipients.c.player_id)
+        .order_by(Player.id.asc())
+        .with_for_update(of=Player)
+    ).cte('locked')
+
+
+def purchase_many_by_id(session: Session, player_ids: list[int], manager_id: int, amount: int) -> int:
+    # single statement: only the players who can afford the purchase are charged,
+    # the purchase records are inserted from the rows returned by the update in one multi-row insert.
+    # returns the number of the charged players
+    locked = _lock_many(player_ids)
+    shop = (
+        select(Shop.id.label('shop_id'))
+        .join(Manager, Manager.location_id == Shop.location_id)
+        .where(Manager.id == manager_id)
+    ).cte('shop')
+    charged = (
+        update(Player)
+        .where(Player.id == locked.c.id, Player.balance >= amount)
+        .where(shop.c.shop_id.is_not(None))
+        .values(balance=Player.balance - amount)
+        .returning(Player.id, shop.c.shop_id)
+    ).cte('charged')
+    # the inserted ids are counted, as rowcount of INSERT ... SELECT is not reported by every SQLAlchemy version
+    return len(session.execute(
+        insert(PurchaseRecord)
+        .from_select(
+            ['customer_player_id', 'shop_id', 'conducted_by_manager_id', 'amount'],
+            select(charged.c.id, charged.c.shop_id, literal(manager_id), literal(amount))
+        )
+        .returning(PurchaseRecord.id)
+    ).all())
+
+
+def reward_many_by_id(session: Session, player_ids: list[int], manager_id: int, amount: int) -> int:
+    # single statement: the players are only rewarded if the manager is on a location,
+    # the reward records are inserted from the rows returned by the update in one multi-row insert.
+    # returns the number of the rewarded players
+    locked = _lock_many(player_ids)
+    location = (
+        select(Manager.location_id)
+        .where(Manager.id == manager_id, Manager.location_id.is_not(None))
+    ).cte('location')
+    rewarded = (
+        update(Player)
+        .where(Player.id == locked.c.id)
+        .where(location.c.location_id.is_not(None))
+        .values(balance=Player.balance + amount)
+        .returning(Player.id, location.c.location_id)
+    ).cte('rewarded')
+    # the inserted ids are counted, as rowcount of INSERT ... SELECT is not reported by every SQLAlchemy version
+    return len(session.execute(
+        insert(RewardRecord)
+        .from_select(
+            ['recipient_player_id', 'location_id', 'conducted_by_manager_id', 'amount'],
+            select(rewarded.c.id, rewarded.c.location_id, literal(manager_id), literal(amount))
+        )
+        .returning(RewardRecord.id)
+    ).all())
@@ -1,20 +1,31 @@
 from typing import Optional, Union
 
-from sqlalchemy import select, insert, delete, func, ScalarSelect
+from sqlalchemy import select, insert, update, delete, func, ScalarSelect
 from sqlalchemy.orm import Session
 
-from fair.db.models import TelegramAccount, User, Player, Manager, QueueEntry
+from fair.db.models import TelegramAccount, User, Player, Manager, Location, QueueEntry
 
 
-def add_by_player_id(session: Session, player_id: Union[int, ScalarSelect], location_id: int) -> bool:
-    session.execute(
+def add_by_player_id(
+        session: Session,
+        player_id: Union[int, ScalarSelect],
+        location_id: int) -> tuple[int, int, str]:
+    # returns the queue entry id, the player id and the location name for the queue engine
+    entry_id, player_id = session.execute(
         insert(QueueEntry)
         .values(location_id=location_id, player_id=player_id)
-    )
-    return True
+        .returning(QueueEntry.id, QueueEntry.player_id)
+    ).one()
+    location_name = session.execute(
+        update(Location)
+        .where(Location.id == location_id)
+        .values(queue_size=Location.queue_size + 1)
+        .returning(Location.name)
+    ).scalar()
+    return entry_id, player_id, location_name
 
 
-def add_by_player_tg_id(session: Session, tg_user_id: int, location_id: int) -> bool:
+def add_by_player_tg_id(session: Session, tg_user_id: int, location_id: int) -> tuple[int, int, str]:
     player_id = (
         select(Player.id)
         .join(User)
@@ -43,6 +54,97 @@ def get_by_player_tg_id(session: Session, tg_user_id: int) -> Optional[QueueEntr
     return queue if queue is None else queue[0]
 
 
+def get_all(session: Session) -> list[tuple[int, int, int, str]]:
+    # (queue entry id, player id, location id, location name) in the order the players are served in
+    entries = session.execute(
+        select(QueueEntry.id, QueueEntry.player_id, QueueEntry.location_id, Location.name)
+        .join(Location)
+        .order_by(QueueEntry.id.asc())
+    ).all()
+    return [(entry_[0], entry_[1], entry_[2], entry_[3]) for entry_ in entries]
+
+
+def get_position_by_player_id(
+        session: Session,
+        player_id: Union[int, ScalarSelect]) -> Optional[tuple[int, str, int, int]]:
+    # (location id, location name, number of players ahead, queue size), the players ahead are counted
+    # by the (location_id, id) index
+    entry = (
+        select(QueueEntry.id, QueueEntry.location_id)
+        .where(QueueEntry.player_id == player_id)
+    ).cte('entry')
+    ahead = (
+        select(func.count())
+        .select_from(QueueEntry)
+        .where(QueueEntry.location_id == entry.c.location_id, QueueEntry.id < entry.c.id)
+    ).scalar_subquery()
+    position = session.execute(
+        select(Location.id, Location.name, ahead, Location.queue_size)
+        .join(entry, entry.c.location_id == Location.id)
+    ).first()
+    return position if position is None else (position[0], position[1], position[2], position[3])
+
+
+def get_position_by_player_tg_id(session: Session, tg_user_id: int) -> Optional[tuple[int, str, int, int]]:
+    player_id = (
+        select(Player.id)
+        .join(User)
+        .join(TelegramAccount)
+        .where(TelegramAccount.tg_user_id == tg_user_id)
+    ).scalar_subquery()
+    return get_position_by_player_id(session, player_id)
+
+
+def get_head_by_location_id(session: Session, location_id: int, limit: int) -> list[int]:
+    # player's tg chat ids of the first players in the queue who are not called yet,
+    # the called players wait for the manager and don't hold a position in the queue any more
+    head = session.execute(
+        select(TelegramAccount.tg_chat_id)
+        .join(User, User.tg_account_id == TelegramAccount.id)
+        .join(Player, Player.user_id == User.id)
+        .join(QueueEntry, QueueEntry.player_id == Player.id)
+        .where(QueueEntry.location_id == location_id, QueueEntry.is_called.is_(False))
+        .order_by(QueueEntry.id.asc())
+        .limit(limit)
+    ).all()
+    return [entry_[0] for entry_ in head]
+
+
+def get_waiting_position_by_player_id(
+        session: Session,
+        player_id: Union[int, ScalarSelect]) -> Optional[tuple[int, str, int]]:
+    # (location id, location name, number of the not called players ahead),
+    # None if the player is not in a queue or is already called
+    entry = (
+        select(QueueEntry.id, QueueEntry.location_id)
+        .where(QueueEntry.player_id == player_id, QueueEntry.is_called.is_(False))
+    ).cte('entry')
+    ahead = (
+        select(func.count())
+        .select_from(QueueEntry)
+        .where(
+            QueueEntry.location_id == entry.c.location_id,
+            QueueEntry.id < entry.c.id,
+            QueueEntry.is_called.is_(False)
+        )
+    ).scalar_subquery()
+    position = session.execute(
+        select(Location.id, Location.name, ahead)
+        .join(entry, entry.c.location_id == Location.id)
+    ).first()
+    return position if position is None else (position[0], position[1], position[2])
+
+
+def get_waiting_position_by_player_tg_id(session: Session, tg_user_id: int) -> Optional[tuple[int, str, int]]:
+    player_id = (
+        select(Player.id)
+        .join(User)
+        .join(TelegramAccount)
+        .where(TelegramAccount.tg_user_id == tg_user_id)
+    ).scalar_subquery()
+    return get_waiting_position_by_player_id(session, player_id)
+
+
 def get_by_location_id(
         session: Session,
         location_id: Union[int, ScalarSelect],
@@ -77,12 +179,66 @@ def get_by_manager_tg_id(session: Session, tg_user_id: int, offset: int, limit:
     return get_by_location_id(session, location_id, offset, limit)
 
 
+def get_page_by_location_id(
+        session: Session,
+        location_id: Union[int, ScalarSelect],
+        cursor: Optional[int],
+        limit: int,
+        backward: bool = False) -> list[tuple[Player, int]]:
+    # keyset pagination by queue entry id, cursor is the queue entry id of the last player of the current page,
+    # or the first one if the previous page is requested
+    query = (
+        select(Player, QueueEntry.id)
+        .join(QueueEntry)
+        .where(QueueEntry.location_id == location_id)
+    )
+    if backward:
+        if cursor is not None:
+            query = query.where(QueueEntry.id < cursor)
+        query = query.order_by(QueueEntry.id.desc())
+    else:
+        if cursor is not None:
+            query = query.where(QueueEntry.id > cursor)
+        query = query.order_by(QueueEntry.id.asc())
+    queue_players = session.execute(query.limit(limit)).all()
+    queue_players = [(player_[0], player_[1]) for player_ in queue_players]
+    return queue_players[::-1] if backward else queue_players
+
+
+def get_page_by_manager_id(
+        session: Session,
+        manager_id: int,
+        cursor: Optional[int],
+        limit: int,
+        backward: bool = False) -> list[tuple[Player, int]]:
+    location_id = (
+        select(Manager.location_id)
+        .where(Manager.id == manager_id)
+    ).scalar_subquery()
+    return get_page_by_location_id(session, location_id, cursor, limit, backward)
+
+
+def get_page_by_manager_tg_id(
+        session: Session,
+        tg_user_id: int,
+        cursor: Optional[int],
+        limit: int,
+        backward: bool = False) -> list[tuple[Player, int]]:
+    location_id = (
+        select(Manager.location_id)
+        .join(User)
+        .join(TelegramAccount)
+        .where(TelegramAccount.tg_user_id == tg_user_id)
+    ).scalar_subquery()
+    return get_page_by_location_id(session, location_id, cursor, limit, backward)
+
+
 def get_count_by_location_id(session: Session, location_id: Union[int, ScalarSelect]) -> int:
     queue_cnt = session.execute(
-        select(func.count(QueueEntry.id))
-        .where(QueueEntry.location_id == location_id)
+        select(Location.queue_size)
+        .where(Location.id == location_id)
     ).first()
-    return queue_cnt[0]
+    return 0 if queue_cnt is None else queue_cnt[0]
 
 
 def get_count_by_manager_id(session: Session, manager_id: int) -> int:
@@ -103,15 +259,116 @@ def get_count_by_manager_tg_id(session: Session, tg_user_id: int) -> int:
     return get_count_by_location_id(session, location_id)
 
 
-def delete_by_player_id(session: Session, player_id: Union[int, ScalarSelect]) -> bool:
-    result = session.execute(
+def _get_called(session: Session, player_id: int, location_id: int) -> tuple[int, str, int, int, str, int]:
+    # (player id, player name, player's tg chat id, location id, location name, number of the not called players
+    # ahead) of the called player, the not called players behind it move up in the queue
+    entry_id = (
+        select(QueueEntry.id)
+        .where(QueueEntry.player_id == player_id)
+    ).scalar_subquery()
+    ahead = (
+        select(func.count())
+        .select_from(QueueEntry)
+        .where(
+            QueueEntry.location_id == location_id,
+            QueueEntry.id < entry_id,
+            QueueEntry.is_called.is_(False)
+        )
+    ).scalar_subquery()
+    called = session.execute(
+        select(Player.name, TelegramAccount.tg_chat_id, Location.name, ahead)
+        .join(User, User.id == Player.user_id)
+        .join(TelegramAccount, TelegramAccount.id == User.tg_account_id)
+        .join(Location, Location.id == location_id)
+        .where(Player.id == player_id)
+    ).one()
+    return player_id, called[0], called[1], location_id, called[2], called[3]
+
+
+def call_by_manager_id(
+        session: Session,
+        manager_id: Union[int, ScalarSelect],
+        player_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+    # the player is only called if it is in the queue to the manager's location
+    location_id = (
+        select(Manager.location_id)
+        .where(Manager.id == manager_id)
+    ).scalar_subquery()
+    location_id = session.execute(
+        update(QueueEntry)
+        .where(QueueEntry.player_id == player_id, QueueEntry.location_id == location_id)
+        .values(is_called=True)
+        .returning(QueueEntry.location_id)
+    ).scalar()
+    return None if location_id is None else _get_called(session, player_id, location_id)
+
+
+def call_by_manager_tg_id(
+        session: Session,
+        tg_user_id: int,
+        player_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+    manager_id = (
+        select(Manager.id)
+        .join(User)
+        .join(TelegramAccount)
+        .where(TelegramAccount.tg_user_id == tg_user_id)
+    ).scalar_subquery()
+    return call_by_manager_id(session, manager_id, player_id)
+
+
+def call_next_by_manager_id(
+        session: Session,
+        manager_id: Union[int, ScalarSelect]) -> Optional[tuple[int, str, int, int, str, int]]:
+    # the first player in the queue to the manager's location who is not called yet,
+    # the entry is locked with skip locked, thus two managers of a location never call the same player
+    location_id = (
+        select(Manager.location_id)
+        .where(Manager.id == manager_id)
+    ).scalar_subquery()
+    next_entry_id = (
+        select(QueueEntry.id)
+        .where(QueueEntry.location_id == location_id, QueueEntry.is_called.is_(False))
+        .order_by(QueueEntry.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_subquery()
+    called = session.execute(
+        update(QueueEntry)
+        .where(QueueEntry.id == next_entry_id)
+        .values(is_called=True)
+        .returning(QueueEntry.player_id, QueueEntry.location_id)
+    ).first()
+    return None if called is None else _get_called(session, called[0], called[1])
+
+
+def call_next_by_manager_tg_id(session: Session, tg_user_id: int) -> Optional[tuple[int, str, int, int, str, int]]:
+    manager_id = (
+        select(Manager.id)
+        .join(User)
+        .join(TelegramAccount)
+        .where(TelegramAccount.tg_user_id == tg_user_id)
+    ).scalar_subquery()
+    return call_next_by_manager_id(session, manager_id)
+
+
+def delete_by_player_id(session: Session, player_id: Union[int, ScalarSelect]) -> Optional[tuple[int, int]]:
+    # returns the player id and the location id for the queue engine, None if the player is not in a queue
+    deleted = session.execute(
         delete(QueueEntry)
         .where(QueueEntry.player_id == player_id)
-    ).rowcount
-    return result != 0
+        .returning(QueueEntry.player_id, QueueEntry.location_id)
+    ).first()
+    if deleted is None:
+        return None
+    session.execute(
+        update(Location)
+        .where(Location.id == deleted[1])
+        .values(queue_size=Location.queue_size - 1)
+    )
+    return deleted[0], deleted[1]
 
 
-def delete_by_player_tg_id(session: Session, tg_user_id: int) -> bool:
+def delete_by_player_tg_id(session: Session, tg_user_id: int) -> Optional[tuple[int, int]]:
     player_id = (
         select(Player.id)
         .join(User)
@@ -3,7 +3,8 @@ from typing import Optional
 from sqlalchemy import select, insert
 from sqlalchemy.orm import Session
 
-from fair.db.models import Role, TelegramAccount, User
+from fair.db.models import Role, TelegramAccount, User, Player, Manager
+from fair.db.identity import Identity
 
 
 def add(session: Session, role_name: str, tg_user_id: int) -> bool:
@@ -37,3 +38,15 @@ def get_by_tg_id(session: Session, tg_user_id: int) -> Optional[User]:
         .where(TelegramAccount.tg_user_id == tg_user_id)
     ).first()
     return user if user is None else user[0]
+
+
+def get_identity_by_tg_id(session: Session, tg_user_id: int) -> Optional[Identity]:
+    identity = session.execute(
+        select(User.id, Role.name, Player.id, Manager.id, TelegramAccount.tg_chat_id)
+        .join(Role)
+        .join(TelegramAccount)
+        .outerjoin(Player, Player.user_id == User.id)
+        .outerjoin(Manager, Manager.user_id == User.id)
+        .where(TelegramAccount.tg_user_id == tg_user_id)
+    ).first()
+    return identity if identity is None else Identity(*identity)
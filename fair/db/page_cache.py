@@ -0,0 +1,205 @@
+import logging
+import math
+import pickle
+import threading
+from typing import Awaitable, Callable, Optional
+
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+
+from fair.utils import LRUCache
+
+
+# Read-through cache of the collection pages, in-process LRU is the first tier and the optional Redis is the second one.
+# Each table has a version counter bumped by every write to it, the versions of the tables a page is read from
+# are part of its key, thus a page written before the change is never served after it, it just ages out.
+# Versions are kept in Redis if it is set, thus a write made by one worker is seen by the others right away,
+# otherwise they are per worker and the cache must only be used with a single worker.
+# Redis errors are logged and never break the request, the page is read from the DB instead
+
+# page -> tables it is read from
+PAGE_TABLES = {
+    'players': ('player',),
+    'players_count': ('player',),
+    'locations': ('location', 'queue_entry'),
+    'active_locations': ('location', 'queue_entry'),
+    'queue': ('queue_entry', 'player'),
+    'queue_by_manager': ('queue_entry', 'player', 'manager'),
+    'queue_head': ('queue_entry',),
+}
+
+
+class BasePageCache:
+    def __init__(self, max_size: int, ttl: float, logger: logging.Logger, prefix: str = ''):
+        self.local = LRUCache(max_size, ttl)
+        self.logger = logger
+        self.prefix = prefix
+        self.versions: dict[str, int] = {}
+        self._versions_lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _version_key(self, table: str) -> str:
+        return f'{self.prefix}page_version:{table}'
+
+    def _page_key(self, key: tuple) -> str:
+        return f'{self.prefix}page:{key!r}'
+
+    def _redis_ttl(self) -> int:
+        return max(1, math.ceil(self.local.ttl))
+
+    def _local_versions(self, tables: tuple[str, ...]) -> tuple[int, ...]:
+        return tuple(self.versions.get(table, 0) for table in tables)
+
+    def _bump_local(self, tables: tuple[str, ...]):
+        with self._versions_lock:
+            for table in tables:
+                self.versions[table] = self.versions.get(table, 0) + 1
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            'size': len(self.local),
+            'max_size': self.local.max_size,
+            'hits': self.hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+
+class PageCache(BasePageCache):
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            logger: logging.Logger,
+            redis: Optional[Redis] = None,
+            prefix: str = ''):
+        super().__init__(max_size, ttl, logger, prefix)
+        self.redis = redis
+
+    def _get_versions(self, tables: tuple[str, ...]) -> Optional[tuple[int, ...]]:
+        if self.redis is None:
+            return self._local_versions(tables)
+        try:
+            versions = self.redis.mget([self._version_key(table) for table in tables])
+        except RedisError as e:
+            self.logger.warning(e)
+            return None
+        return tuple(int(version or 0) for version in versions)
+
+    def get(self, page: str, args: tuple, load: Callable):
+        # load reads the page from the DB
+        versions = self._get_versions(PAGE_TABLES[page])
+        if versions is None:
+            self.misses += 1
+            return load()
+        key = (page, versions, args)
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(self._page_key(key))
+            except RedisError as e:
+                self.logger.warning(e)
+                raw = None
+            if raw is not None:
+                value = pickle.loads(raw)
+                self.local.set(key, value)
+                self.redis_hits += 1
+                return value
+        self.misses += 1
+        value = load()
+        self.local.set(key, value)
+        if self.redis is not None:
+            try:
+                self.redis.set(self._page_key(key), pickle.dumps(value), ex=self._redis_ttl())
+            except RedisError as e:
+                self.logger.warning(e)
+        return value
+
+    def bump(self, *tables: str):
+        if self.redis is None:
+            self._bump_local(tables)
+            return
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                for table in tables:
+                    pipe.incr(self._version_key(table))
+                pipe.execute()
+        except RedisError as e:
+            # pages of the other workers may be stale until they expire
+            self.logger.warning(e)
+
+
+class AsyncPageCache(BasePageCache):
+    # asyncio counterpart of the PageCache, local tier is shared as it never blocks
+
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            logger: logging.Logger,
+            redis: Optional[AsyncRedis] = None,
+            prefix: str = ''):
+        super().__init__(max_size, ttl, logger, prefix)
+        self.redis = redis
+
+    async def _get_versions(self, tables: tuple[str, ...]) -> Optional[tuple[int, ...]]:
+        if self.redis is None:
+            return self._local_versions(tables)
+        try:
+            versions = await self.redis.mget([self._version_key(table) for table in tables])
+        except RedisError as e:
+            self.logger.warning(e)
+            return None
+        return tuple(int(version or 0) for version in versions)
+
+    async def get(self, page: str, args: tuple, load: Callable[[], Awaitable]):
+        # load reads the page from the DB
+        versions = await self._get_versions(PAGE_TABLES[page])
+        if versions is None:
+            self.misses += 1
+            return await load()
+        key = (page, versions, args)
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self._page_key(key))
+            except RedisError as e:
+                self.logger.warning(e)
+                raw = None
+            if raw is not None:
+                value = pickle.loads(raw)
+                self.local.set(key, value)
+                self.redis_hits += 1
+                return value
+        self.misses += 1
+        value = await load()
+        self.local.set(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._page_key(key), pickle.dumps(value), ex=self._redis_ttl())
+            except RedisError as e:
+                self.logger.warning(e)
+        return value
+
+    async def bump(self, *tables: str):
+        if self.redis is None:
+            self._bump_local(tables)
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for table in tables:
+                    pipe.incr(self._version_key(table))
+                await pipe.execute()
+        except RedisError as e:
+            # pages of the other workers may be stale until they expire
+            self.logger.warning(e)
@@ -0,0 +1,47 @@
+import time
+
+from sqlalchemy.pool import Pool, QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolStatsMixin:
+    # QueuePool doesn't track how long the connection checkout waits for a free connection,
+    # thus _do_get is wrapped to measure it, all the other stats are taken from the pool itself
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait_time = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+
+class StatsQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class StatsAsyncAdaptedQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_pool_stats(pool: Pool) -> dict:
+    stats = {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+    }
+    if isinstance(pool, PoolStatsMixin):
+        stats['checkouts'] = pool.checkouts
+        stats['wait_time_total'] = pool.wait_time_total
+        stats['wait_time_avg'] = pool.wait_time_total / pool.checkouts if pool.checkouts else 0.0
+        stats['wait_time_max'] = pool.wait_time_max
+    return stats
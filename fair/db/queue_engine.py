@@ -0,0 +1,426 @@
+import bisect
+import logging
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+
+
+# Queue engine keeps the per-location queues ordered by the queue entry id, thus the position of a player is found
+# by a binary search (or ZRANK of the Redis sorted set) instead of a query, Postgres stays the durable store.
+# Engine is fed by the adapter after the queue entry writes are committed and is rebuilt from the DB lazily:
+# on the first lookup and once in a resync period, thus a write missed by the engine doesn't last.
+# Rolling service time of a location is measured as the time the head of its queue stays there,
+# the ETA of a player is the rest of the head's service time plus a service time per player ahead.
+# Queues are kept in Redis if it is set, thus they are shared by the workers, otherwise they are per worker
+# and the engine must only be used with a single worker. Redis errors are logged and the position is read from the DB
+
+
+class QueuePosition(NamedTuple):
+    location_id: int
+    location_name: str
+    position: int  # number of players ahead
+    size: int
+    eta: Optional[float]  # seconds, None until a service time of the location is measured
+
+
+class LocationQueue:
+    __slots__ = ('name', 'entry_ids', 'head_since', 'service_time')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.entry_ids: list[int] = []  # ascending, i.e. in the order the players are served in
+        self.head_since: Optional[float] = None
+        self.service_time: Optional[float] = None
+
+
+def get_eta(
+        position: int,
+        head_since: Optional[float],
+        service_time: Optional[float],
+        now: float) -> Optional[float]:
+    if service_time is None:
+        return None
+    head_left = service_time if head_since is None else max(service_time - (now - head_since), 0.0)
+    return head_left + position * service_time
+
+
+# players: hash player id -> location id; names: hash location id -> location name;
+# per location: sorted set of player ids scored by the queue entry ids and hash of the service time
+# and the time the head of the queue got there. Scripts return -1 if the queues are not loaded
+_REDIS_ADD = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return -1 end
+local queue = ARGV[1] .. 'queue:' .. ARGV[4]
+if redis.call('ZCARD', queue) == 0 then
+    redis.call('HSET', ARGV[1] .. 'queue_service:' .. ARGV[4], 'head_since', ARGV[6])
+end
+redis.call('ZADD', queue, ARGV[2], ARGV[3])
+redis.call('HSET', KEYS[2], ARGV[3], ARGV[4])
+redis.call('HSET', KEYS[3], ARGV[4], ARGV[5])
+return 1
+"""
+_REDIS_REMOVE = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return -1 end
+local location = redis.call('HGET', KEYS[2], ARGV[2])
+if not location then return 0 end
+local queue = ARGV[1] .. 'queue:' .. location
+local service = ARGV[1] .. 'queue_service:' .. location
+local rank = redis.call('ZRANK', queue, ARGV[2])
+redis.call('ZREM', queue, ARGV[2])
+redis.call('HDEL', KEYS[2], ARGV[2])
+if rank == 0 then
+    local now = tonumber(ARGV[3])
+    local head_since = tonumber(redis.call('HGET', service, 'head_since'))
+    if head_since then
+        local sample = now - head_since
+        local service_time = tonumber(redis.call('HGET', service, 'service_time'))
+        if service_time then
+            local alpha = tonumber(ARGV[4])
+            sample = alpha * sample + (1 - alpha) * service_time
+        end
+        redis.call('HSET', service, 'service_time', tostring(sample))
+    end
+    redis.call('HSET', service, 'head_since', ARGV[3])
+end
+if redis.call('ZCARD', queue) == 0 then redis.call('HDEL', service, 'head_since') end
+return 1
+"""
+_REDIS_POSITION = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return -1 end
+local location = redis.call('HGET', KEYS[2], ARGV[2])
+if not location then return 0 end
+local queue = ARGV[1] .. 'queue:' .. location
+local rank = redis.call('ZRANK', queue, ARGV[2])
+if not rank then return 0 end
+local service = redis.call('HMGET', ARGV[1] .. 'queue_service:' .. location, 'head_since', 'service_time')
+return {
+    location,
+    redis.call('HGET', KEYS[3], location) or '',
+    rank,
+    redis.call('ZCARD', queue),
+    service[1] or '',
+    service[2] or ''
+}
+"""
+
+
+class BaseQueueEngine:
+    def __init__(self, alpha: float, resync: float, logger: logging.Logger, prefix: str = ''):
+        self.alpha = alpha  # weight of the latest service time in the rolling one
+        self.resync = resync
+        self.logger = logger
+        self.prefix = prefix
+        self.queues: dict[int, LocationQueue] = {}
+        self.players: dict[int, tuple[int, int]] = {}  # player id -> (location id, queue entry id)
+        self.loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def _loaded_key(self) -> str:
+        return f'{self.prefix}queue_loaded'
+
+    def _players_key(self) -> str:
+        return f'{self.prefix}queue_players'
+
+    def _names_key(self) -> str:
+        return f'{self.prefix}queue_names'
+
+    def _queue_key(self, location_id: int) -> str:
+        return f'{self.prefix}queue:{location_id}'
+
+    def _service_key(self, location_id: int) -> str:
+        return f'{self.prefix}queue_service:{location_id}'
+
+    def _is_loaded_local(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.resync
+
+    def _load_local(self, entries: list[tuple[int, int, int, str]]):
+        # measured service times survive the resync
+        now = time.time()
+        with self._lock:
+            queues = {}
+            for entry_id, player_id, location_id, location_name in entries:
+                queue = queues.get(location_id)
+                if queue is None:
+                    queue = queues[location_id] = LocationQueue(location_name)
+                    previous = self.queues.get(location_id)
+                    queue.service_time = None if previous is None else previous.service_time
+                    queue.head_since = now if previous is None or previous.head_since is None else previous.head_since
+                queue.entry_ids.append(entry_id)
+            for location_id, previous in self.queues.items():
+                if location_id not in queues and previous.service_time is not None:
+                    queue = queues[location_id] = LocationQueue(previous.name)
+                    queue.service_time = previous.service_time
+            self.queues = queues
+            self.players = {player_id: (location_id, entry_id) for entry_id, player_id, location_id, _ in entries}
+            self.loaded_at = time.monotonic()
+            self.loads += 1
+
+    def _add_local(self, entry_id: int, player_id: int, location_id: int, location_name: str):
+        with self._lock:
+            if self.loaded_at is None:
+                return
+            queue = self.queues.get(location_id)
+            if queue is None:
+                queue = self.queues[location_id] = LocationQueue(location_name)
+            if not queue.entry_ids:
+                queue.head_since = time.time()
+            # entry ids grow, thus it is an append unless the concurrent writes interleave
+            bisect.insort(queue.entry_ids, entry_id)
+            self.players[player_id] = (location_id, entry_id)
+
+    def _remove_local(self, player_id: int):
+        with self._lock:
+            location_id, entry_id = self.players.pop(player_id, (None, None))
+            queue = self.queues.get(location_id)
+            if queue is None:
+                return
+            index = bisect.bisect_left(queue.entry_ids, entry_id)
+            if index == len(queue.entry_ids) or queue.entry_ids[index] != entry_id:
+                return
+            del queue.entry_ids[index]
+            if index != 0:
+                return
+            # the head left the queue, i.e. it was served
+            now = time.time()
+            if queue.head_since is not None:
+                sample = now - queue.head_since
+                if queue.service_time is not None:
+                    sample = self.alpha * sample + (1 - self.alpha) * queue.service_time
+                queue.service_time = sample
+            queue.head_since = now if queue.entry_ids else None
+
+    def _get_position_local(self, player_id: int) -> Optional[QueuePosition]:
+        with self._lock:
+            location_id, entry_id = self.players.get(player_id, (None, None))
+            if location_id is None:
+                return None
+            queue = self.queues[location_id]
+            position = bisect.bisect_left(queue.entry_ids, entry_id)
+            return QueuePosition(
+                location_id=location_id,
+                location_name=queue.name,
+                position=position,
+                size=len(queue.entry_ids),
+                eta=get_eta(position, queue.head_since, queue.service_time, time.time())
+            )
+
+    def _decode_position(self, raw: list) -> QueuePosition:
+        location_id, location_name, position, size, head_since, service_time = raw
+        return QueuePosition(
+            location_id=int(location_id),
+            location_name=location_name.decode(),
+            position=int(position),
+            size=int(size),
+            eta=get_eta(
+                int(position),
+                float(head_since) if head_since else None,
+                float(service_time) if service_time else None,
+                time.time()
+            )
+        )
+
+    def _redis_keys(self) -> list[str]:
+        return [self._loaded_key(), self._players_key(), self._names_key()]
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        with self._lock:
+            queues = {
+                location_id: {
+                    'size': len(queue.entry_ids),
+                    'service_time': queue.service_time,
+                }
+                for location_id, queue in self.queues.items()
+            }
+        # queues are only listed if they are local
+        return {
+            'queues': queues,
+            'loads': self.loads,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class QueueEngine(BaseQueueEngine):
+    def __init__(
+            self,
+            alpha: float,
+            resync: float,
+            logger: logging.Logger,
+            redis: Optional[Redis] = None,
+            prefix: str = ''):
+        super().__init__(alpha, resync, logger, prefix)
+        self.redis = redis
+        if redis is not None:
+            self._add_script = redis.register_script(_REDIS_ADD)
+            self._remove_script = redis.register_script(_REDIS_REMOVE)
+            self._position_script = redis.register_script(_REDIS_POSITION)
+
+    def load(self, entries: list[tuple[int, int, int, str]]):
+        # entries are (queue entry id, player id, location id, location name) of all the queues
+        if self.redis is None:
+            self._load_local(entries)
+            return
+        try:
+            stale = [self._queue_key(int(location_id)) for location_id in self.redis.hkeys(self._names_key())]
+            with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(self._players_key(), *stale)
+                for entry_id, player_id, location_id, location_name in entries:
+                    pipe.zadd(self._queue_key(location_id), {player_id: entry_id})
+                    pipe.hset(self._players_key(), player_id, location_id)
+                    pipe.hset(self._names_key(), location_id, location_name)
+                    pipe.hsetnx(self._service_key(location_id), 'head_since', time.time())
+                pipe.set(self._loaded_key(), 1, ex=max(1, int(self.resync)))
+                pipe.execute()
+            self.loads += 1
+        except RedisError as e:
+            self.logger.warning(e)
+
+    def add(self, entry_id: int, player_id: int, location_id: int, location_name: str):
+        if self.redis is None:
+            self._add_local(entry_id, player_id, location_id, location_name)
+            return
+        try:
+            self._add_script(
+                keys=self._redis_keys(),
+                args=[self.prefix, entry_id, player_id, location_id, location_name, time.time()]
+            )
+        except RedisError as e:
+            # queues are rebuilt from the DB on the next lookup
+            self.logger.warning(e)
+            self.invalidate()
+
+    def remove(self, player_id: int):
+        if self.redis is None:
+            self._remove_local(player_id)
+            return
+        try:
+            self._remove_script(keys=self._redis_keys(), args=[self.prefix, player_id, time.time(), self.alpha])
+        except RedisError as e:
+            self.logger.warning(e)
+            self.invalidate()
+
+    def get_position(self, player_id: int) -> tuple[bool, Optional[QueuePosition]]:
+        # (whether the queues are loaded, position of the player or None if the player is not in a queue)
+        if self.redis is None:
+            if not self._is_loaded_local():
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, self._get_position_local(player_id)
+        try:
+            raw = self._position_script(keys=self._redis_keys(), args=[self.prefix, player_id])
+        except RedisError as e:
+            self.logger.warning(e)
+            raw = -1
+        if raw == -1:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, None if raw == 0 else self._decode_position(raw)
+
+    def invalidate(self):
+        if self.redis is None:
+            self.loaded_at = None
+            return
+        try:
+            self.redis.delete(self._loaded_key())
+        except RedisError as e:
+            self.logger.warning(e)
+
+
+class AsyncQueueEngine(BaseQueueEngine):
+    # asyncio counterpart of the QueueEngine, local queues are shared as they never block
+
+    def __init__(
+            self,
+            alpha: float,
+            resync: float,
+            logger: logging.Logger,
+            redis: Optional[AsyncRedis] = None,
+            prefix: str = ''):
+        super().__init__(alpha, resync, logger, prefix)
+        self.redis = redis
+        if redis is not None:
+            self._add_script = redis.register_script(_REDIS_ADD)
+            self._remove_script = redis.register_script(_REDIS_REMOVE)
+            self._position_script = redis.register_script(_REDIS_POSITION)
+
+    async def load(self, entries: list[tuple[int, int, int, str]]):
+        # entries are (queue entry id, player id, location id, location name) of all the queues
+        if self.redis is None:
+            self._load_local(entries)
+            return
+        try:
+            location_ids = await self.redis.hkeys(self._names_key())
+            stale = [self._queue_key(int(location_id)) for location_id in location_ids]
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(self._players_key(), *stale)
+                for entry_id, player_id, location_id, location_name in entries:
+                    pipe.zadd(self._queue_key(location_id), {player_id: entry_id})
+                    pipe.hset(self._players_key(), player_id, location_id)
+                    pipe.hset(self._names_key(), location_id, location_name)
+                    pipe.hsetnx(self._service_key(location_id), 'head_since', time.time())
+                pipe.set(self._loaded_key(), 1, ex=max(1, int(self.resync)))
+                await pipe.execute()
+            self.loads += 1
+        except RedisError as e:
+            self.logger.warning(e)
+
+    async def add(self, entry_id: int, player_id: int, location_id: int, location_name: str):
+        if self.redis is None:
+            self._add_local(entry_id, player_id, location_id, location_name)
+            return
+        try:
+            await self._add_script(
+                keys=self._redis_keys(),
+                args=[self.prefix, entry_id, player_id, location_id, location_name, time.time()]
+            )
+        except RedisError as e:
+            # queues are rebuilt from the DB on the next lookup
+            self.logger.warning(e)
+            await self.invalidate()
+
+    async def remove(self, player_id: int):
+        if self.redis is None:
+            self._remove_local(player_id)
+            return
+        try:
+            await self._remove_script(keys=self._redis_keys(), args=[self.prefix, player_id, time.time(), self.alpha])
+        except RedisError as e:
+            self.logger.warning(e)
+            await self.invalidate()
+
+    async def get_position(self, player_id: int) -> tuple[bool, Optional[QueuePosition]]:
+        # (whether the queues are loaded, position of the player or None if the player is not in a queue)
+        if self.redis is None:
+            if not self._is_loaded_local():
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, self._get_position_local(player_id)
+        try:
+            raw = await self._position_script(keys=self._redis_keys(), args=[self.prefix, player_id])
+        except RedisError as e:
+            self.logger.warning(e)
+            raw = -1
+        if raw == -1:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, None if raw == 0 else self._decode_position(raw)
+
+    async def invalidate(self):
+        if self.redis is None:
+            self.loaded_at = None
+            return
+        try:
+            await self.redis.delete(self._loaded_key())
+        except RedisError as e:
+            self.logger.warning(e)
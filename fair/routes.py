@@ -1,20 +1,124 @@
+import functools
+import hmac
+from typing import Callable
+
 from sanic import Sanic, Request
-from sanic.response import text
+from sanic.response import text, json
 from telebot.types import Update
 
+from fair.bot.ingestion import decode_update
+
 
 # TODO: move it to the separate file / module
 async def handle_telegram_update(request: Request):
     secret_token = request.app.ctx['bot_config'].webhook.secret_token
     if secret_token != request.headers.get('X-Telegram-Bot-Api-Secret-Token'):
         return text('Forbidden', status=403)
-    body_json = await request.json()
+    raw_update = decode_update(request.body)
+    if not request.app.ctx['update_filter'].is_handled(raw_update):
+        # no handler can match the update, thus the Update object is never built
+        return text('OK')
+    update_dispatcher = request.app.ctx['update_dispatcher']
+    if update_dispatcher is not None:
+        # the update is handled later by the dispatcher, Telegram redelivers it if the dispatcher is full
+        if not update_dispatcher.submit(raw_update):
+            return text('Too Many Requests', status=429)
+        return text('OK')
     bot = request.app.ctx['bot']
-    bot.process_new_updates([Update.de_json(body_json)])
+    if request.app.ctx['bot_config'].use_async:
+        await bot.process_new_updates([Update.de_json(raw_update)])
+    else:
+        bot.process_new_updates([Update.de_json(raw_update)])
     return text('OK')
 
 
+def admin_only(handler: Callable) -> Callable:
+    # admin endpoints require the admin secret token, it is compared in constant time
+    @functools.wraps(handler)
+    async def checked(request: Request):
+        secret_token = request.app.ctx['admin_config'].secret_token
+        request_token = request.headers.get('X-Admin-Secret-Token', '')
+        if not hmac.compare_digest(secret_token.encode(), request_token.encode()):
+            return text('Forbidden', status=403)
+        return await handler(request)
+    return checked
+
+
+@admin_only
+async def handle_db_pool_stats(request: Request):
+    db_adapter = request.app.ctx['db_adapter']
+    return json(db_adapter.get_pool_stats())
+
+
+@admin_only
+async def handle_identity_cache_stats(request: Request):
+    db_adapter = request.app.ctx['db_adapter']
+    return json(db_adapter.get_identity_cache_stats())
+
+
+@admin_only
+async def handle_page_cache_stats(request: Request):
+    db_adapter = request.app.ctx['db_adapter']
+    return json(db_adapter.get_page_cache_stats())
+
+
+@admin_only
+async def handle_queue_engine_stats(request: Request):
+    db_adapter = request.app.ctx['db_adapter']
+    return json(db_adapter.get_queue_engine_stats())
+
+
+@admin_only
+async def handle_rate_limiter_stats(request: Request):
+    rate_limiter = request.app.ctx['rate_limiter']
+    return json(rate_limiter.get_stats())
+
+
+@admin_only
+async def handle_api_queue_stats(request: Request):
+    api_queue = request.app.ctx['api_queue']
+    return json(api_queue.get_stats())
+
+
+@admin_only
+async def handle_outbound_stats(request: Request):
+    outbound = request.app.ctx['outbound']
+    return json(outbound.get_stats())
+
+
+@admin_only
+async def handle_queue_notifier_stats(request: Request):
+    queue_notifier = request.app.ctx['queue_notifier']
+    return json(queue_notifier.get_stats())
+
+
+@admin_only
+async def handle_update_dispatcher_stats(request: Request):
+    update_dispatcher = request.app.ctx['update_dispatcher']
+    return json(update_dispatcher.get_stats() if update_dispatcher is not None else None)
+
+
+@admin_only
+async def handle_update_filter_stats(request: Request):
+    update_filter = request.app.ctx['update_filter']
+    return json(update_filter.get_stats())
+
+
 def setup_routes(app: Sanic):
     webhook_url = app.ctx['bot_config'].webhook.url
     webhook_path = webhook_url.split('/', maxsplit=1)[-1]
     app.add_route(handle_telegram_update, webhook_path, methods=['POST'])
+
+    admin_config = app.ctx['admin_config']
+    if admin_config is not None:
+        # admin endpoints are only exposed if the admin section is present in the config
+        app.add_route(handle_db_pool_stats, f'{admin_config.path}/db_pool', methods=['GET'])
+        app.add_route(handle_identity_cache_stats, f'{admin_config.path}/identity_cache', methods=['GET'])
+        app.add_route(handle_page_cache_stats, f'{admin_config.path}/page_cache', methods=['GET'])
+        app.add_route(handle_queue_engine_stats, f'{admin_config.path}/queue_engine', methods=['GET'])
+        app.add_route(handle_rate_limiter_stats, f'{admin_config.path}/rate_limiter', methods=['GET'])
+        app.add_route(handle_api_queue_stats, f'{admin_config.path}/api_queue', methods=['GET'])
+        app.add_route(handle_outbound_stats, f'{admin_config.path}/outbound', methods=['GET'])
+        app.add_route(handle_queue_notifier_stats, f'{admin_config.path}/queue_notifier', methods=['GET'])
+        app.add_route(handle_update_dispatcher_stats, f'{admin_config.path}/update_dispatcher', methods=['GET'])
+        app.add_route(handle_update_filter_stats, f'{admin_config.path}/update_filter', methods=['GET'])
@@ -1,3 +1,8 @@
+import threading
+import time
+from collections import OrderedDict
+
+
 lower_ru_letters = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
 upper_ru_letters = lower_ru_letters.upper()
 ru_letters = lower_ru_letters + upper_ru_letters
@@ -5,3 +10,42 @@ ru_letters = lower_ru_letters + upper_ru_letters
 
 def dummy_true(*args, **kwargs):
     return True
+
+
+class LRUCache:
+    # lock is needed as TeleBot runs handlers in a thread pool,
+    # in asyncio mode it is never contended and costs next to nothing
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
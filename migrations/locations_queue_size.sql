@@ -0,0 +1,16 @@
+-- Denormalized queue size of the locations, kept by the queue_entry operations.
+-- create_all skips the existing tables, thus a database created before the column has to be upgraded once.
+-- The sizes are backfilled from the queues, which are locked against the writes meanwhile,
+-- thus the bot may keep running, its queue joins and leaves wait for the upgrade to commit.
+BEGIN;
+
+ALTER TABLE locations ADD COLUMN IF NOT EXISTS queue_size INTEGER NOT NULL DEFAULT 0 CHECK (queue_size >= 0);
+
+LOCK TABLE queues IN SHARE MODE;
+UPDATE locations
+SET queue_size = (SELECT count(*) FROM queues WHERE queues.location_id = locations.id);
+
+CREATE INDEX IF NOT EXISTS ix_locations_queue_size ON locations (queue_size DESC, id);
+CREATE INDEX IF NOT EXISTS ix_locations_is_active_queue_size ON locations (is_active, queue_size DESC, id);
+
+COMMIT;
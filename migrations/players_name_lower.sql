@@ -0,0 +1,7 @@
+-- Case-insensitive name prefix search of the recipients, text_pattern_ops makes LIKE 'prefix%' indexable
+-- in any collation
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS ix_players_name_lower ON players (lower(name) text_pattern_ops);
+
+COMMIT;
@@ -0,0 +1,9 @@
+-- Called flag of the queue entries set by the call-next workflow, the entries queued before it are not called.
+-- The (location_id, id) index serves the queue pages, the queue heads and the players ahead counts
+BEGIN;
+
+ALTER TABLE queues ADD COLUMN IF NOT EXISTS is_called BOOLEAN NOT NULL DEFAULT false;
+
+CREATE INDEX IF NOT EXISTS ix_queues_location_id_id ON queues (location_id, id);
+
+COMMIT;